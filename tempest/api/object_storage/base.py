@@ -36,6 +36,7 @@ class BaseObjectTest(tempest.test.BaseTestCase):
             raise cls.skipException(skip_msg)
         cls.isolated_creds = isolated_creds.IsolatedCreds(
             cls.__name__, network_resources=cls.network_resources)
+        cls.isolated_creds.prepare_credentials(['primary', 'admin', 'alt'])
         # Get isolated creds for normal user
         cls.os = clients.Manager(cls.isolated_creds.get_primary_creds())
         # Get isolated creds for admin user
@@ -92,9 +93,8 @@ class BaseObjectTest(tempest.test.BaseTestCase):
             object_client = cls.object_client
         for cont in containers:
             try:
-                objlist = container_client.list_all_container_objects(cont)
-                # delete every object in the container
-                for obj in objlist:
+                # delete every object in the container, as it is listed
+                for obj in container_client.iter_container_objects(cont):
                     try:
                         object_client.delete_object(cont, obj['name'])
                     except exceptions.NotFound:
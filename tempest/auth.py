@@ -22,6 +22,7 @@ import urlparse
 
 import six
 
+from tempest.common import token_cache
 from tempest import config
 from tempest.openstack.common import log as logging
 from tempest.services.identity.json import identity_client as json_id
@@ -33,6 +34,10 @@ from tempest.services.identity.xml import identity_client as xml_id
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Filters which select a base URL out of the catalog
+ENDPOINT_FILTERS = ('service', 'region', 'endpoint_type', 'api_version',
+                    'skip_path')
+
 
 @six.add_metaclass(abc.ABCMeta)
 class AuthProvider(object):
@@ -207,6 +212,8 @@ class KeystoneAuthProvider(AuthProvider):
     def __init__(self, credentials, interface=None):
         super(KeystoneAuthProvider, self).__init__(credentials, interface)
         self.auth_client = self._auth_client()
+        self._endpoints = {}
+        self._endpoints_auth_data = None
 
     def _decorate_request(self, filters, method, url, headers=None, body=None,
                           auth_data=None):
@@ -229,6 +236,31 @@ class KeystoneAuthProvider(AuthProvider):
         # no change to method or body
         return str(_url), _headers, body
 
+    def base_url(self, filters, auth_data=None):
+        """
+        Extracts the base_url based on provided filters.
+        Base URLs are indexed by filters for the auth data of the provider,
+        the index is discarded whenever the auth data changes.
+        """
+        if auth_data is None:
+            auth_data = self.auth_data
+        if auth_data is not self.cache:
+            # Alternative auth data, e.g. for negative tests
+            return self._base_url(filters, auth_data)
+        if self._endpoints_auth_data is not auth_data:
+            self._endpoints = {}
+            self._endpoints_auth_data = auth_data
+        key = tuple(filters.get(f) for f in ENDPOINT_FILTERS)
+        base_url = self._endpoints.get(key)
+        if base_url is None:
+            base_url = self._base_url(filters, auth_data)
+            self._endpoints[key] = base_url
+        return base_url
+
+    @abc.abstractmethod
+    def _base_url(self, filters, auth_data):
+        return
+
     @abc.abstractmethod
     def _auth_client(self):
         return
@@ -238,7 +270,18 @@ class KeystoneAuthProvider(AuthProvider):
         return
 
     def _get_auth(self):
-        # Bypasses the cache
+        # Bypasses the cache of the provider
+        if CONF.auth.token_cache:
+            key = token_cache.TokenCache.get_key(
+                self.__class__.__name__,
+                getattr(self.auth_client, 'auth_url', None),
+                self._auth_params())
+            return token_cache.get_token_cache().get_auth(
+                key, self._authenticate, self.is_expired,
+                self._needs_refresh)
+        return self._authenticate()
+
+    def _authenticate(self):
         auth_func = getattr(self.auth_client, 'get_token')
         auth_params = self._auth_params()
 
@@ -249,6 +292,20 @@ class KeystoneAuthProvider(AuthProvider):
     def get_token(self):
         return self.auth_data[0]
 
+    @abc.abstractmethod
+    def _get_expiry(self, auth_data):
+        return
+
+    def is_expired(self, auth_data):
+        return self._get_expiry(auth_data) - self.token_expiry_threshold <= \
+            datetime.datetime.utcnow()
+
+    def _needs_refresh(self, auth_data):
+        refresh_time = datetime.timedelta(
+            seconds=CONF.auth.token_cache_refresh_time)
+        return self._get_expiry(auth_data) - refresh_time <= \
+            datetime.datetime.utcnow()
+
 
 class KeystoneV2AuthProvider(KeystoneAuthProvider):
 
@@ -279,7 +336,7 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
         if self.credentials.user_id is None:
             self.credentials.user_id = user['id']
 
-    def base_url(self, filters, auth_data=None):
+    def _base_url(self, filters, auth_data):
         """
         Filters can be:
         - service: compute, image, etc
@@ -288,8 +345,6 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
         - api_version: replace catalog version with this
         - skip_path: take just the base URL
         """
-        if auth_data is None:
-            auth_data = self.auth_data
         token, _auth_data = auth_data
         service = filters.get('service')
         region = filters.get('region')
@@ -323,12 +378,10 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
 
         return _base_url
 
-    def is_expired(self, auth_data):
+    def _get_expiry(self, auth_data):
         _, access = auth_data
-        expiry = datetime.datetime.strptime(access['token']['expires'],
-                                            self.EXPIRY_DATE_FORMAT)
-        return expiry - self.token_expiry_threshold <= \
-            datetime.datetime.utcnow()
+        return datetime.datetime.strptime(access['token']['expires'],
+                                          self.EXPIRY_DATE_FORMAT)
 
 
 class KeystoneV3AuthProvider(KeystoneAuthProvider):
@@ -382,7 +435,7 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
         if self.credentials.user_domain_name is None:
             self.credentials.user_domain_name = user['domain']['name']
 
-    def base_url(self, filters, auth_data=None):
+    def _base_url(self, filters, auth_data):
         """
         Filters can be:
         - service: compute, image, etc
@@ -391,8 +444,6 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
         - api_version: replace catalog version with this
         - skip_path: take just the base URL
         """
-        if auth_data is None:
-            auth_data = self.auth_data
         token, _auth_data = auth_data
         service = filters.get('service')
         region = filters.get('region')
@@ -441,12 +492,10 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
 
         return _base_url
 
-    def is_expired(self, auth_data):
+    def _get_expiry(self, auth_data):
         _, access = auth_data
-        expiry = datetime.datetime.strptime(access['expires_at'],
-                                            self.EXPIRY_DATE_FORMAT)
-        return expiry - self.token_expiry_threshold <= \
-            datetime.datetime.utcnow()
+        return datetime.datetime.strptime(access['expires_at'],
+                                          self.EXPIRY_DATE_FORMAT)
 
 
 def get_default_credentials(credential_type, fill_in=True):
@@ -14,214 +14,372 @@
 #    under the License.
 
 from tempest import auth
-from tempest.common import rest_client
 from tempest import config
 from tempest import exceptions
 from tempest import manager
+from tempest.openstack.common import importutils
 from tempest.openstack.common import log as logging
-from tempest.services.baremetal.v1.client_json import BaremetalClientJSON
-from tempest.services import botoclients
-from tempest.services.compute.json.agents_client import \
-    AgentsClientJSON
-from tempest.services.compute.json.aggregates_client import \
-    AggregatesClientJSON
-from tempest.services.compute.json.availability_zone_client import \
-    AvailabilityZoneClientJSON
-from tempest.services.compute.json.certificates_client import \
-    CertificatesClientJSON
-from tempest.services.compute.json.extensions_client import \
-    ExtensionsClientJSON
-from tempest.services.compute.json.fixed_ips_client import FixedIPsClientJSON
-from tempest.services.compute.json.flavors_client import FlavorsClientJSON
-from tempest.services.compute.json.floating_ips_client import \
-    FloatingIPsClientJSON
-from tempest.services.compute.json.hosts_client import HostsClientJSON
-from tempest.services.compute.json.hypervisor_client import \
-    HypervisorClientJSON
-from tempest.services.compute.json.images_client import ImagesClientJSON
-from tempest.services.compute.json.instance_usage_audit_log_client import \
-    InstanceUsagesAuditLogClientJSON
-from tempest.services.compute.json.interfaces_client import \
-    InterfacesClientJSON
-from tempest.services.compute.json.keypairs_client import KeyPairsClientJSON
-from tempest.services.compute.json.limits_client import LimitsClientJSON
-from tempest.services.compute.json.migrations_client import \
-    MigrationsClientJSON
-from tempest.services.compute.json.networks_client import NetworksClientJSON
-from tempest.services.compute.json.quotas_client import QuotaClassesClientJSON
-from tempest.services.compute.json.quotas_client import QuotasClientJSON
-from tempest.services.compute.json.security_group_default_rules_client import \
-    SecurityGroupDefaultRulesClientJSON
-from tempest.services.compute.json.security_groups_client import \
-    SecurityGroupsClientJSON
-from tempest.services.compute.json.servers_client import ServersClientJSON
-from tempest.services.compute.json.services_client import ServicesClientJSON
-from tempest.services.compute.json.tenant_usages_client import \
-    TenantUsagesClientJSON
-from tempest.services.compute.json.volumes_extensions_client import \
-    VolumesExtensionsClientJSON
-from tempest.services.compute.v3.json.agents_client import AgentsV3ClientJSON
-from tempest.services.compute.v3.json.aggregates_client import \
-    AggregatesV3ClientJSON
-from tempest.services.compute.v3.json.availability_zone_client import \
-    AvailabilityZoneV3ClientJSON
-from tempest.services.compute.v3.json.certificates_client import \
-    CertificatesV3ClientJSON
-from tempest.services.compute.v3.json.extensions_client import \
-    ExtensionsV3ClientJSON
-from tempest.services.compute.v3.json.flavors_client import FlavorsV3ClientJSON
-from tempest.services.compute.v3.json.hosts_client import HostsV3ClientJSON
-from tempest.services.compute.v3.json.hypervisor_client import \
-    HypervisorV3ClientJSON
-from tempest.services.compute.v3.json.interfaces_client import \
-    InterfacesV3ClientJSON
-from tempest.services.compute.v3.json.keypairs_client import \
-    KeyPairsV3ClientJSON
-from tempest.services.compute.v3.json.migration_client import \
-    MigrationsV3ClientJSON
-from tempest.services.compute.v3.json.quotas_client import \
-    QuotasV3ClientJSON
-from tempest.services.compute.v3.json.servers_client import \
-    ServersV3ClientJSON
-from tempest.services.compute.v3.json.services_client import \
-    ServicesV3ClientJSON
-from tempest.services.compute.v3.json.version_client import \
-    VersionV3ClientJSON
-from tempest.services.compute.xml.aggregates_client import AggregatesClientXML
-from tempest.services.compute.xml.availability_zone_client import \
-    AvailabilityZoneClientXML
-from tempest.services.compute.xml.certificates_client import \
-    CertificatesClientXML
-from tempest.services.compute.xml.extensions_client import ExtensionsClientXML
-from tempest.services.compute.xml.fixed_ips_client import FixedIPsClientXML
-from tempest.services.compute.xml.flavors_client import FlavorsClientXML
-from tempest.services.compute.xml.floating_ips_client import \
-    FloatingIPsClientXML
-from tempest.services.compute.xml.hosts_client import HostsClientXML
-from tempest.services.compute.xml.hypervisor_client import HypervisorClientXML
-from tempest.services.compute.xml.images_client import ImagesClientXML
-from tempest.services.compute.xml.instance_usage_audit_log_client import \
-    InstanceUsagesAuditLogClientXML
-from tempest.services.compute.xml.interfaces_client import \
-    InterfacesClientXML
-from tempest.services.compute.xml.keypairs_client import KeyPairsClientXML
-from tempest.services.compute.xml.limits_client import LimitsClientXML
-from tempest.services.compute.xml.quotas_client import QuotaClassesClientXML
-from tempest.services.compute.xml.quotas_client import QuotasClientXML
-from tempest.services.compute.xml.security_groups_client \
-    import SecurityGroupsClientXML
-from tempest.services.compute.xml.servers_client import ServersClientXML
-from tempest.services.compute.xml.services_client import ServicesClientXML
-from tempest.services.compute.xml.tenant_usages_client import \
-    TenantUsagesClientXML
-from tempest.services.compute.xml.volumes_extensions_client import \
-    VolumesExtensionsClientXML
-from tempest.services.data_processing.v1_1.client import DataProcessingClient
-from tempest.services.database.json.flavors_client import \
-    DatabaseFlavorsClientJSON
-from tempest.services.database.json.versions_client import \
-    DatabaseVersionsClientJSON
-from tempest.services.identity.json.identity_client import IdentityClientJSON
-from tempest.services.identity.json.identity_client import TokenClientJSON
-from tempest.services.identity.v3.json.credentials_client import \
-    CredentialsClientJSON
-from tempest.services.identity.v3.json.endpoints_client import \
-    EndPointClientJSON
-from tempest.services.identity.v3.json.identity_client import \
-    IdentityV3ClientJSON
-from tempest.services.identity.v3.json.identity_client import V3TokenClientJSON
-from tempest.services.identity.v3.json.policy_client import PolicyClientJSON
-from tempest.services.identity.v3.json.region_client import RegionClientJSON
-from tempest.services.identity.v3.json.service_client import \
-    ServiceClientJSON
-from tempest.services.identity.v3.xml.credentials_client import \
-    CredentialsClientXML
-from tempest.services.identity.v3.xml.endpoints_client import EndPointClientXML
-from tempest.services.identity.v3.xml.identity_client import \
-    IdentityV3ClientXML
-from tempest.services.identity.v3.xml.identity_client import V3TokenClientXML
-from tempest.services.identity.v3.xml.policy_client import PolicyClientXML
-from tempest.services.identity.v3.xml.region_client import RegionClientXML
-from tempest.services.identity.v3.xml.service_client import \
-    ServiceClientXML
-from tempest.services.identity.xml.identity_client import IdentityClientXML
-from tempest.services.identity.xml.identity_client import TokenClientXML
-from tempest.services.image.v1.json.image_client import ImageClientJSON
-from tempest.services.image.v2.json.image_client import ImageClientV2JSON
-from tempest.services.messaging.json.messaging_client import \
-    MessagingClientJSON
-from tempest.services.network.json.network_client import NetworkClientJSON
-from tempest.services.network.xml.network_client import NetworkClientXML
-from tempest.services.object_storage.account_client import AccountClient
-from tempest.services.object_storage.account_client import \
-    AccountClientCustomizedHeader
-from tempest.services.object_storage.container_client import ContainerClient
-from tempest.services.object_storage.object_client import ObjectClient
-from tempest.services.object_storage.object_client import \
-    ObjectClientCustomizedHeader
-from tempest.services.orchestration.json.orchestration_client import \
-    OrchestrationClient
-from tempest.services.telemetry.json.telemetry_client import \
-    TelemetryClientJSON
-from tempest.services.telemetry.xml.telemetry_client import \
-    TelemetryClientXML
-from tempest.services.volume.json.admin.volume_hosts_client import \
-    VolumeHostsClientJSON
-from tempest.services.volume.json.admin.volume_quotas_client import \
-    VolumeQuotasClientJSON
-from tempest.services.volume.json.admin.volume_services_client import \
-    VolumesServicesClientJSON
-from tempest.services.volume.json.admin.volume_types_client import \
-    VolumeTypesClientJSON
-from tempest.services.volume.json.availability_zone_client import \
-    VolumeAvailabilityZoneClientJSON
-from tempest.services.volume.json.backups_client import BackupsClientJSON
-from tempest.services.volume.json.extensions_client import \
-    ExtensionsClientJSON as VolumeExtensionClientJSON
-from tempest.services.volume.json.qos_client import QosSpecsClientJSON
-from tempest.services.volume.json.snapshots_client import SnapshotsClientJSON
-from tempest.services.volume.json.volumes_client import VolumesClientJSON
-from tempest.services.volume.v2.json.admin.volume_types_client import \
-    VolumeTypesV2ClientJSON
-from tempest.services.volume.v2.json.availability_zone_client import \
-    VolumeV2AvailabilityZoneClientJSON
-from tempest.services.volume.v2.json.extensions_client import \
-    ExtensionsV2ClientJSON as VolumeV2ExtensionClientJSON
-from tempest.services.volume.v2.json.qos_client import QosSpecsV2ClientJSON
-from tempest.services.volume.v2.json.snapshots_client import \
-    SnapshotsV2ClientJSON
-from tempest.services.volume.v2.json.volumes_client import VolumesV2ClientJSON
-from tempest.services.volume.v2.xml.availability_zone_client import \
-    VolumeV2AvailabilityZoneClientXML
-from tempest.services.volume.v2.xml.extensions_client import \
-    ExtensionsV2ClientXML as VolumeV2ExtensionClientXML
-from tempest.services.volume.v2.xml.snapshots_client import \
-    SnapshotsV2ClientXML
-from tempest.services.volume.v2.xml.volumes_client import VolumesV2ClientXML
-from tempest.services.volume.xml.admin.volume_hosts_client import \
-    VolumeHostsClientXML
-from tempest.services.volume.xml.admin.volume_quotas_client import \
-    VolumeQuotasClientXML
-from tempest.services.volume.xml.admin.volume_services_client import \
-    VolumesServicesClientXML
-from tempest.services.volume.xml.admin.volume_types_client import \
-    VolumeTypesClientXML
-from tempest.services.volume.xml.availability_zone_client import \
-    VolumeAvailabilityZoneClientXML
-from tempest.services.volume.xml.backups_client import BackupsClientXML
-from tempest.services.volume.xml.extensions_client import \
-    ExtensionsClientXML as VolumeExtensionClientXML
-from tempest.services.volume.xml.snapshots_client import SnapshotsClientXML
-from tempest.services.volume.xml.volumes_client import VolumesClientXML
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+# Service clients created on first access to the Manager attribute of the
+# same name, by interface: attribute -> (module, class name). Modules are
+# only imported when one of their clients is first created. All the clients
+# take the auth provider of the Manager.
+XML_CLIENTS = {
+    'certificates_client': ('tempest.services.compute.xml.certificates_client',
+                            'CertificatesClientXML'),
+    'servers_client': ('tempest.services.compute.xml.servers_client',
+                       'ServersClientXML'),
+    'limits_client': ('tempest.services.compute.xml.limits_client',
+                      'LimitsClientXML'),
+    'images_client': ('tempest.services.compute.xml.images_client',
+                      'ImagesClientXML'),
+    'keypairs_client': ('tempest.services.compute.xml.keypairs_client',
+                        'KeyPairsClientXML'),
+    'quotas_client': ('tempest.services.compute.xml.quotas_client',
+                      'QuotasClientXML'),
+    'quota_classes_client': ('tempest.services.compute.xml.quotas_client',
+                             'QuotaClassesClientXML'),
+    'flavors_client': ('tempest.services.compute.xml.flavors_client',
+                       'FlavorsClientXML'),
+    'extensions_client': ('tempest.services.compute.xml.extensions_client',
+                          'ExtensionsClientXML'),
+    'volumes_extensions_client': (
+        'tempest.services.compute.xml.volumes_extensions_client',
+        'VolumesExtensionsClientXML'),
+    'floating_ips_client': ('tempest.services.compute.xml.floating_ips_client',
+                            'FloatingIPsClientXML'),
+    'backups_client': ('tempest.services.volume.xml.backups_client',
+                       'BackupsClientXML'),
+    'snapshots_client': ('tempest.services.volume.xml.snapshots_client',
+                         'SnapshotsClientXML'),
+    'snapshots_v2_client': ('tempest.services.volume.v2.xml.snapshots_client',
+                            'SnapshotsV2ClientXML'),
+    'volumes_client': ('tempest.services.volume.xml.volumes_client',
+                       'VolumesClientXML'),
+    'volumes_v2_client': ('tempest.services.volume.v2.xml.volumes_client',
+                          'VolumesV2ClientXML'),
+    'volume_types_client': (
+        'tempest.services.volume.xml.admin.volume_types_client',
+        'VolumeTypesClientXML'),
+    'identity_client': ('tempest.services.identity.xml.identity_client',
+                        'IdentityClientXML'),
+    'identity_v3_client': ('tempest.services.identity.v3.xml.identity_client',
+                           'IdentityV3ClientXML'),
+    'security_groups_client': (
+        'tempest.services.compute.xml.security_groups_client',
+        'SecurityGroupsClientXML'),
+    'interfaces_client': ('tempest.services.compute.xml.interfaces_client',
+                          'InterfacesClientXML'),
+    'endpoints_client': ('tempest.services.identity.v3.xml.endpoints_client',
+                         'EndPointClientXML'),
+    'fixed_ips_client': ('tempest.services.compute.xml.fixed_ips_client',
+                         'FixedIPsClientXML'),
+    'availability_zone_client': (
+        'tempest.services.compute.xml.availability_zone_client',
+        'AvailabilityZoneClientXML'),
+    'service_client': ('tempest.services.identity.v3.xml.service_client',
+                       'ServiceClientXML'),
+    'volume_services_client': (
+        'tempest.services.volume.xml.admin.volume_services_client',
+        'VolumesServicesClientXML'),
+    'aggregates_client': ('tempest.services.compute.xml.aggregates_client',
+                          'AggregatesClientXML'),
+    'services_client': ('tempest.services.compute.xml.services_client',
+                        'ServicesClientXML'),
+    'tenant_usages_client': (
+        'tempest.services.compute.xml.tenant_usages_client',
+        'TenantUsagesClientXML'),
+    'policy_client': ('tempest.services.identity.v3.xml.policy_client',
+                      'PolicyClientXML'),
+    'region_client': ('tempest.services.identity.v3.xml.region_client',
+                      'RegionClientXML'),
+    'hosts_client': ('tempest.services.compute.xml.hosts_client',
+                     'HostsClientXML'),
+    'hypervisor_client': ('tempest.services.compute.xml.hypervisor_client',
+                          'HypervisorClientXML'),
+    'network_client': ('tempest.services.network.xml.network_client',
+                       'NetworkClientXML'),
+    'credentials_client': (
+        'tempest.services.identity.v3.xml.credentials_client',
+        'CredentialsClientXML'),
+    'instance_usages_audit_log_client': (
+        'tempest.services.compute.xml.instance_usage_audit_log_client',
+        'InstanceUsagesAuditLogClientXML'),
+    'volume_hosts_client': (
+        'tempest.services.volume.xml.admin.volume_hosts_client',
+        'VolumeHostsClientXML'),
+    'volume_quotas_client': (
+        'tempest.services.volume.xml.admin.volume_quotas_client',
+        'VolumeQuotasClientXML'),
+    'volumes_extension_client': (
+        'tempest.services.volume.xml.extensions_client',
+        'ExtensionsClientXML'),
+    'volumes_v2_extension_client': (
+        'tempest.services.volume.v2.xml.extensions_client',
+        'ExtensionsV2ClientXML'),
+    'telemetry_client': ('tempest.services.telemetry.xml.telemetry_client',
+                         'TelemetryClientXML'),
+    'volume_availability_zone_client': (
+        'tempest.services.volume.xml.availability_zone_client',
+        'VolumeAvailabilityZoneClientXML'),
+    'volume_v2_availability_zone_client': (
+        'tempest.services.volume.v2.xml.availability_zone_client',
+        'VolumeV2AvailabilityZoneClientXML'),
+}
+
+JSON_CLIENTS = {
+    'certificates_client': (
+        'tempest.services.compute.json.certificates_client',
+        'CertificatesClientJSON'),
+    'certificates_v3_client': (
+        'tempest.services.compute.v3.json.certificates_client',
+        'CertificatesV3ClientJSON'),
+    'baremetal_client': ('tempest.services.baremetal.v1.client_json',
+                         'BaremetalClientJSON'),
+    'servers_client': ('tempest.services.compute.json.servers_client',
+                       'ServersClientJSON'),
+    'servers_v3_client': ('tempest.services.compute.v3.json.servers_client',
+                          'ServersV3ClientJSON'),
+    'limits_client': ('tempest.services.compute.json.limits_client',
+                      'LimitsClientJSON'),
+    'images_client': ('tempest.services.compute.json.images_client',
+                      'ImagesClientJSON'),
+    'keypairs_client': ('tempest.services.compute.json.keypairs_client',
+                        'KeyPairsClientJSON'),
+    'keypairs_v3_client': ('tempest.services.compute.v3.json.keypairs_client',
+                           'KeyPairsV3ClientJSON'),
+    'quotas_client': ('tempest.services.compute.json.quotas_client',
+                      'QuotasClientJSON'),
+    'quota_classes_client': ('tempest.services.compute.json.quotas_client',
+                             'QuotaClassesClientJSON'),
+    'quotas_v3_client': ('tempest.services.compute.v3.json.quotas_client',
+                         'QuotasV3ClientJSON'),
+    'flavors_client': ('tempest.services.compute.json.flavors_client',
+                       'FlavorsClientJSON'),
+    'flavors_v3_client': ('tempest.services.compute.v3.json.flavors_client',
+                          'FlavorsV3ClientJSON'),
+    'extensions_v3_client': (
+        'tempest.services.compute.v3.json.extensions_client',
+        'ExtensionsV3ClientJSON'),
+    'extensions_client': ('tempest.services.compute.json.extensions_client',
+                          'ExtensionsClientJSON'),
+    'volumes_extensions_client': (
+        'tempest.services.compute.json.volumes_extensions_client',
+        'VolumesExtensionsClientJSON'),
+    'floating_ips_client': (
+        'tempest.services.compute.json.floating_ips_client',
+        'FloatingIPsClientJSON'),
+    'backups_client': ('tempest.services.volume.json.backups_client',
+                       'BackupsClientJSON'),
+    'snapshots_client': ('tempest.services.volume.json.snapshots_client',
+                         'SnapshotsClientJSON'),
+    'snapshots_v2_client': ('tempest.services.volume.v2.json.snapshots_client',
+                            'SnapshotsV2ClientJSON'),
+    'volumes_client': ('tempest.services.volume.json.volumes_client',
+                       'VolumesClientJSON'),
+    'volumes_v2_client': ('tempest.services.volume.v2.json.volumes_client',
+                          'VolumesV2ClientJSON'),
+    'volume_types_client': (
+        'tempest.services.volume.json.admin.volume_types_client',
+        'VolumeTypesClientJSON'),
+    'volume_types_v2_client': (
+        'tempest.services.volume.v2.json.admin.volume_types_client',
+        'VolumeTypesV2ClientJSON'),
+    'identity_client': ('tempest.services.identity.json.identity_client',
+                        'IdentityClientJSON'),
+    'identity_v3_client': ('tempest.services.identity.v3.json.identity_client',
+                           'IdentityV3ClientJSON'),
+    'security_groups_client': (
+        'tempest.services.compute.json.security_groups_client',
+        'SecurityGroupsClientJSON'),
+    'interfaces_v3_client': (
+        'tempest.services.compute.v3.json.interfaces_client',
+        'InterfacesV3ClientJSON'),
+    'interfaces_client': ('tempest.services.compute.json.interfaces_client',
+                          'InterfacesClientJSON'),
+    'endpoints_client': ('tempest.services.identity.v3.json.endpoints_client',
+                         'EndPointClientJSON'),
+    'fixed_ips_client': ('tempest.services.compute.json.fixed_ips_client',
+                         'FixedIPsClientJSON'),
+    'availability_zone_v3_client': (
+        'tempest.services.compute.v3.json.availability_zone_client',
+        'AvailabilityZoneV3ClientJSON'),
+    'availability_zone_client': (
+        'tempest.services.compute.json.availability_zone_client',
+        'AvailabilityZoneClientJSON'),
+    'services_v3_client': ('tempest.services.compute.v3.json.services_client',
+                           'ServicesV3ClientJSON'),
+    'service_client': ('tempest.services.identity.v3.json.service_client',
+                       'ServiceClientJSON'),
+    'volume_services_client': (
+        'tempest.services.volume.json.admin.volume_services_client',
+        'VolumesServicesClientJSON'),
+    'agents_v3_client': ('tempest.services.compute.v3.json.agents_client',
+                         'AgentsV3ClientJSON'),
+    'aggregates_v3_client': (
+        'tempest.services.compute.v3.json.aggregates_client',
+        'AggregatesV3ClientJSON'),
+    'aggregates_client': ('tempest.services.compute.json.aggregates_client',
+                          'AggregatesClientJSON'),
+    'services_client': ('tempest.services.compute.json.services_client',
+                        'ServicesClientJSON'),
+    'tenant_usages_client': (
+        'tempest.services.compute.json.tenant_usages_client',
+        'TenantUsagesClientJSON'),
+    'version_v3_client': ('tempest.services.compute.v3.json.version_client',
+                          'VersionV3ClientJSON'),
+    'migrations_v3_client': (
+        'tempest.services.compute.v3.json.migration_client',
+        'MigrationsV3ClientJSON'),
+    'policy_client': ('tempest.services.identity.v3.json.policy_client',
+                      'PolicyClientJSON'),
+    'region_client': ('tempest.services.identity.v3.json.region_client',
+                      'RegionClientJSON'),
+    'hosts_client': ('tempest.services.compute.json.hosts_client',
+                     'HostsClientJSON'),
+    'hypervisor_v3_client': (
+        'tempest.services.compute.v3.json.hypervisor_client',
+        'HypervisorV3ClientJSON'),
+    'hypervisor_client': ('tempest.services.compute.json.hypervisor_client',
+                          'HypervisorClientJSON'),
+    'network_client': ('tempest.services.network.json.network_client',
+                       'NetworkClientJSON'),
+    'credentials_client': (
+        'tempest.services.identity.v3.json.credentials_client',
+        'CredentialsClientJSON'),
+    'instance_usages_audit_log_client': (
+        'tempest.services.compute.json.instance_usage_audit_log_client',
+        'InstanceUsagesAuditLogClientJSON'),
+    'volume_hosts_client': (
+        'tempest.services.volume.json.admin.volume_hosts_client',
+        'VolumeHostsClientJSON'),
+    'volume_quotas_client': (
+        'tempest.services.volume.json.admin.volume_quotas_client',
+        'VolumeQuotasClientJSON'),
+    'volumes_extension_client': (
+        'tempest.services.volume.json.extensions_client',
+        'ExtensionsClientJSON'),
+    'volumes_v2_extension_client': (
+        'tempest.services.volume.v2.json.extensions_client',
+        'ExtensionsV2ClientJSON'),
+    'hosts_v3_client': ('tempest.services.compute.v3.json.hosts_client',
+                        'HostsV3ClientJSON'),
+    'database_flavors_client': (
+        'tempest.services.database.json.flavors_client',
+        'DatabaseFlavorsClientJSON'),
+    'database_versions_client': (
+        'tempest.services.database.json.versions_client',
+        'DatabaseVersionsClientJSON'),
+    'messaging_client': ('tempest.services.messaging.json.messaging_client',
+                         'MessagingClientJSON'),
+    'telemetry_client': ('tempest.services.telemetry.json.telemetry_client',
+                         'TelemetryClientJSON'),
+    'negative_client': ('tempest.common.rest_client',
+                        'NegativeRestClient'),
+    'volume_availability_zone_client': (
+        'tempest.services.volume.json.availability_zone_client',
+        'VolumeAvailabilityZoneClientJSON'),
+    'volume_v2_availability_zone_client': (
+        'tempest.services.volume.v2.json.availability_zone_client',
+        'VolumeV2AvailabilityZoneClientJSON'),
+}
+
+COMMON_CLIENTS = {
+    'account_client': ('tempest.services.object_storage.account_client',
+                       'AccountClient'),
+    'agents_client': ('tempest.services.compute.json.agents_client',
+                      'AgentsClientJSON'),
+    'image_client': ('tempest.services.image.v1.json.image_client',
+                     'ImageClientJSON'),
+    'image_client_v2': ('tempest.services.image.v2.json.image_client',
+                        'ImageClientV2JSON'),
+    'container_client': ('tempest.services.object_storage.container_client',
+                         'ContainerClient'),
+    'object_client': ('tempest.services.object_storage.object_client',
+                      'ObjectClient'),
+    'orchestration_client': (
+        'tempest.services.orchestration.json.orchestration_client',
+        'OrchestrationClient'),
+    'custom_object_client': ('tempest.services.object_storage.object_client',
+                             'ObjectClientCustomizedHeader'),
+    'custom_account_client': ('tempest.services.object_storage.account_client',
+                              'AccountClientCustomizedHeader'),
+    'data_processing_client': ('tempest.services.data_processing.v1_1.client',
+                               'DataProcessingClient'),
+    'migrations_client': ('tempest.services.compute.json.migrations_client',
+                          'MigrationsClientJSON'),
+    'security_group_default_rules_client': (
+        'tempest.services.compute.json.security_group_default_rules_client',
+        'SecurityGroupDefaultRulesClientJSON'),
+    'networks_client': ('tempest.services.compute.json.networks_client',
+                        'NetworksClientJSON'),
+    # NOTE : As XML clients are not implemented for Qos-specs.
+    # So, setting the qos_client here. Once client are implemented,
+    # qos_client would be moved to its respective interface.
+    # Bug : 1312553
+    'volume_qos_client': ('tempest.services.volume.json.qos_client',
+                          'QosSpecsClientJSON'),
+    'volume_qos_v2_client': ('tempest.services.volume.v2.json.qos_client',
+                             'QosSpecsV2ClientJSON'),
+}
+
+# Token clients do not use an auth provider
+TOKEN_CLIENTS = {
+    'xml': {
+        'token_client': ('tempest.services.identity.xml.identity_client',
+                         'TokenClientXML'),
+        'token_v3_client': ('tempest.services.identity.v3.xml.identity_client',
+                            'V3TokenClientXML'),
+    },
+    'json': {
+        'token_client': ('tempest.services.identity.json.identity_client',
+                         'TokenClientJSON'),
+        'token_v3_client': (
+            'tempest.services.identity.v3.json.identity_client',
+            'V3TokenClientJSON'),
+    },
+}
+
+# TODO(andreaf) EC2 client still do their auth, v2 only
+EC2_CLIENTS = {
+    'ec2api_client': ('tempest.services.botoclients',
+                      'APIClientEC2'),
+    's3_client': ('tempest.services.botoclients',
+                  'ObjectClientS3'),
+}
+
+# Clients only available when their service is
+CLIENT_SERVICES = {
+    'telemetry_client': 'ceilometer',
+    'image_client': 'glance',
+    'image_client_v2': 'glance',
+}
+
+
+def import_client(module, class_name):
+    """Returns the client class, importing its module if needed"""
+    return importutils.import_class('%s.%s' % (module, class_name))
+
+
+def client_modules():
+    """Returns the names of all the service client modules"""
+    tables = [XML_CLIENTS, JSON_CLIENTS, COMMON_CLIENTS, EC2_CLIENTS]
+    tables.extend(TOKEN_CLIENTS.values())
+    return sorted(set(module for table in tables
+                      for module, _ in table.values()))
+
+
 class Manager(manager.Manager):
 
     """
     Top level manager for OpenStack tempest clients
+
+    Service clients are created on first access, so that only the clients
+    used by a test are ever built.
     """
 
     def __init__(self, credentials=None, interface='json', service=None):
@@ -229,222 +387,61 @@ class Manager(manager.Manager):
         self.interface = interface
         # super cares for credentials validation
         super(Manager, self).__init__(credentials=credentials)
-
         if self.interface == 'xml':
-            self.certificates_client = CertificatesClientXML(
-                self.auth_provider)
-            self.servers_client = ServersClientXML(self.auth_provider)
-            self.limits_client = LimitsClientXML(self.auth_provider)
-            self.images_client = ImagesClientXML(self.auth_provider)
-            self.keypairs_client = KeyPairsClientXML(self.auth_provider)
-            self.quotas_client = QuotasClientXML(self.auth_provider)
-            self.quota_classes_client = QuotaClassesClientXML(
-                self.auth_provider)
-            self.flavors_client = FlavorsClientXML(self.auth_provider)
-            self.extensions_client = ExtensionsClientXML(self.auth_provider)
-            self.volumes_extensions_client = VolumesExtensionsClientXML(
-                self.auth_provider)
-            self.floating_ips_client = FloatingIPsClientXML(
-                self.auth_provider)
-            self.backups_client = BackupsClientXML(self.auth_provider)
-            self.snapshots_client = SnapshotsClientXML(self.auth_provider)
-            self.snapshots_v2_client = SnapshotsV2ClientXML(self.auth_provider)
-            self.volumes_client = VolumesClientXML(self.auth_provider)
-            self.volumes_v2_client = VolumesV2ClientXML(self.auth_provider)
-            self.volume_types_client = VolumeTypesClientXML(
-                self.auth_provider)
-            self.identity_client = IdentityClientXML(self.auth_provider)
-            self.identity_v3_client = IdentityV3ClientXML(
-                self.auth_provider)
-            self.security_groups_client = SecurityGroupsClientXML(
-                self.auth_provider)
-            self.interfaces_client = InterfacesClientXML(self.auth_provider)
-            self.endpoints_client = EndPointClientXML(self.auth_provider)
-            self.fixed_ips_client = FixedIPsClientXML(self.auth_provider)
-            self.availability_zone_client = AvailabilityZoneClientXML(
-                self.auth_provider)
-            self.service_client = ServiceClientXML(self.auth_provider)
-            self.volume_services_client = VolumesServicesClientXML(
-                self.auth_provider)
-            self.aggregates_client = AggregatesClientXML(self.auth_provider)
-            self.services_client = ServicesClientXML(self.auth_provider)
-            self.tenant_usages_client = TenantUsagesClientXML(
-                self.auth_provider)
-            self.policy_client = PolicyClientXML(self.auth_provider)
-            self.region_client = RegionClientXML(self.auth_provider)
-            self.hosts_client = HostsClientXML(self.auth_provider)
-            self.hypervisor_client = HypervisorClientXML(self.auth_provider)
-            self.network_client = NetworkClientXML(self.auth_provider)
-            self.credentials_client = CredentialsClientXML(
-                self.auth_provider)
-            self.instance_usages_audit_log_client = \
-                InstanceUsagesAuditLogClientXML(self.auth_provider)
-            self.volume_hosts_client = VolumeHostsClientXML(
-                self.auth_provider)
-            self.volume_quotas_client = VolumeQuotasClientXML(
-                self.auth_provider)
-            self.volumes_extension_client = VolumeExtensionClientXML(
-                self.auth_provider)
-            self.volumes_v2_extension_client = VolumeV2ExtensionClientXML(
-                self.auth_provider)
-            if CONF.service_available.ceilometer:
-                self.telemetry_client = TelemetryClientXML(
-                    self.auth_provider)
-            self.token_client = TokenClientXML()
-            self.token_v3_client = V3TokenClientXML()
-            self.volume_availability_zone_client = \
-                VolumeAvailabilityZoneClientXML(self.auth_provider)
-            self.volume_v2_availability_zone_client = \
-                VolumeV2AvailabilityZoneClientXML(self.auth_provider)
-
+            self._clients = XML_CLIENTS
         elif self.interface == 'json':
-            self.certificates_client = CertificatesClientJSON(
-                self.auth_provider)
-            self.certificates_v3_client = CertificatesV3ClientJSON(
-                self.auth_provider)
-            self.baremetal_client = BaremetalClientJSON(self.auth_provider)
-            self.servers_client = ServersClientJSON(self.auth_provider)
-            self.servers_v3_client = ServersV3ClientJSON(self.auth_provider)
-            self.limits_client = LimitsClientJSON(self.auth_provider)
-            self.images_client = ImagesClientJSON(self.auth_provider)
-            self.keypairs_v3_client = KeyPairsV3ClientJSON(
-                self.auth_provider)
-            self.keypairs_client = KeyPairsClientJSON(self.auth_provider)
-            self.keypairs_v3_client = KeyPairsV3ClientJSON(
-                self.auth_provider)
-            self.quotas_client = QuotasClientJSON(self.auth_provider)
-            self.quota_classes_client = QuotaClassesClientJSON(
-                self.auth_provider)
-            self.quotas_v3_client = QuotasV3ClientJSON(self.auth_provider)
-            self.flavors_client = FlavorsClientJSON(self.auth_provider)
-            self.flavors_v3_client = FlavorsV3ClientJSON(self.auth_provider)
-            self.extensions_v3_client = ExtensionsV3ClientJSON(
-                self.auth_provider)
-            self.extensions_client = ExtensionsClientJSON(
-                self.auth_provider)
-            self.volumes_extensions_client = VolumesExtensionsClientJSON(
-                self.auth_provider)
-            self.floating_ips_client = FloatingIPsClientJSON(
-                self.auth_provider)
-            self.backups_client = BackupsClientJSON(self.auth_provider)
-            self.snapshots_client = SnapshotsClientJSON(self.auth_provider)
-            self.snapshots_v2_client = SnapshotsV2ClientJSON(
-                self.auth_provider)
-            self.volumes_client = VolumesClientJSON(self.auth_provider)
-            self.volumes_v2_client = VolumesV2ClientJSON(self.auth_provider)
-            self.volume_types_client = VolumeTypesClientJSON(
-                self.auth_provider)
-            self.volume_types_v2_client = VolumeTypesV2ClientJSON(
-                self.auth_provider)
-            self.identity_client = IdentityClientJSON(self.auth_provider)
-            self.identity_v3_client = IdentityV3ClientJSON(
-                self.auth_provider)
-            self.security_groups_client = SecurityGroupsClientJSON(
-                self.auth_provider)
-            self.interfaces_v3_client = InterfacesV3ClientJSON(
-                self.auth_provider)
-            self.interfaces_client = InterfacesClientJSON(
-                self.auth_provider)
-            self.endpoints_client = EndPointClientJSON(self.auth_provider)
-            self.fixed_ips_client = FixedIPsClientJSON(self.auth_provider)
-            self.availability_zone_v3_client = AvailabilityZoneV3ClientJSON(
-                self.auth_provider)
-            self.availability_zone_client = AvailabilityZoneClientJSON(
-                self.auth_provider)
-            self.services_v3_client = ServicesV3ClientJSON(
-                self.auth_provider)
-            self.service_client = ServiceClientJSON(self.auth_provider)
-            self.volume_services_client = VolumesServicesClientJSON(
-                self.auth_provider)
-            self.agents_v3_client = AgentsV3ClientJSON(self.auth_provider)
-            self.aggregates_v3_client = AggregatesV3ClientJSON(
-                self.auth_provider)
-            self.aggregates_client = AggregatesClientJSON(
-                self.auth_provider)
-            self.services_client = ServicesClientJSON(self.auth_provider)
-            self.tenant_usages_client = TenantUsagesClientJSON(
-                self.auth_provider)
-            self.version_v3_client = VersionV3ClientJSON(self.auth_provider)
-            self.migrations_v3_client = MigrationsV3ClientJSON(
-                self.auth_provider)
-            self.policy_client = PolicyClientJSON(self.auth_provider)
-            self.region_client = RegionClientJSON(self.auth_provider)
-            self.hosts_client = HostsClientJSON(self.auth_provider)
-            self.hypervisor_v3_client = HypervisorV3ClientJSON(
-                self.auth_provider)
-            self.hypervisor_client = HypervisorClientJSON(
-                self.auth_provider)
-            self.network_client = NetworkClientJSON(self.auth_provider)
-            self.credentials_client = CredentialsClientJSON(
-                self.auth_provider)
-            self.instance_usages_audit_log_client = \
-                InstanceUsagesAuditLogClientJSON(self.auth_provider)
-            self.volume_hosts_client = VolumeHostsClientJSON(
-                self.auth_provider)
-            self.volume_quotas_client = VolumeQuotasClientJSON(
-                self.auth_provider)
-            self.volumes_extension_client = VolumeExtensionClientJSON(
-                self.auth_provider)
-            self.volumes_v2_extension_client = VolumeV2ExtensionClientJSON(
-                self.auth_provider)
-            self.hosts_v3_client = HostsV3ClientJSON(self.auth_provider)
-            self.database_flavors_client = DatabaseFlavorsClientJSON(
-                self.auth_provider)
-            self.database_versions_client = DatabaseVersionsClientJSON(
-                self.auth_provider)
-            self.messaging_client = MessagingClientJSON(self.auth_provider)
-            if CONF.service_available.ceilometer:
-                self.telemetry_client = TelemetryClientJSON(
-                    self.auth_provider)
-            self.token_client = TokenClientJSON()
-            self.token_v3_client = V3TokenClientJSON()
-            self.negative_client = rest_client.NegativeRestClient(
-                self.auth_provider)
-            self.negative_client.service = service
-            self.volume_availability_zone_client = \
-                VolumeAvailabilityZoneClientJSON(self.auth_provider)
-            self.volume_v2_availability_zone_client = \
-                VolumeV2AvailabilityZoneClientJSON(self.auth_provider)
-
+            self._clients = JSON_CLIENTS
         else:
             msg = "Unsupported interface type `%s'" % interface
             raise exceptions.InvalidConfiguration(msg)
+        self._service = service
+
+    def _get_client_path(self, name):
+        service = CLIENT_SERVICES.get(name)
+        if service is not None and not getattr(CONF.service_available,
+                                               service):
+            return None
+        return (self._clients.get(name) or COMMON_CLIENTS.get(name) or
+                TOKEN_CLIENTS[self.interface].get(name) or
+                EC2_CLIENTS.get(name))
+
+    def _create_client(self, name):
+        client_path = self._get_client_path(name)
+        if client_path is None:
+            return None
+        client_class = import_client(*client_path)
+        if name in TOKEN_CLIENTS[self.interface]:
+            return client_class()
+        if name in EC2_CLIENTS:
+            return client_class(self.credentials.username,
+                                self.credentials.password,
+                                CONF.identity.uri,
+                                self.credentials.tenant_name)
+        client = client_class(self.auth_provider)
+        if name == 'negative_client':
+            client.service = self._service
+        if self.http_pool is not None:
+            # Share the keep-alive connection pool among the clients
+            client.http_pool = self.http_pool
+        return client
+
+    def __getattr__(self, name):
+        # Only called for attributes not set yet
+        if name.startswith('_') or '_clients' not in vars(self):
+            raise AttributeError(name)
+        client = self._create_client(name)
+        if client is None:
+            raise AttributeError(name)
+        setattr(self, name, client)
+        return client
 
-        # TODO(andreaf) EC2 client still do their auth, v2 only
-        ec2_client_args = (self.credentials.username,
-                           self.credentials.password,
-                           CONF.identity.uri,
-                           self.credentials.tenant_name)
-
-        # common clients
-        self.account_client = AccountClient(self.auth_provider)
-        self.agents_client = AgentsClientJSON(self.auth_provider)
-        if CONF.service_available.glance:
-            self.image_client = ImageClientJSON(self.auth_provider)
-            self.image_client_v2 = ImageClientV2JSON(self.auth_provider)
-        self.container_client = ContainerClient(self.auth_provider)
-        self.object_client = ObjectClient(self.auth_provider)
-        self.orchestration_client = OrchestrationClient(
-            self.auth_provider)
-        self.ec2api_client = botoclients.APIClientEC2(*ec2_client_args)
-        self.s3_client = botoclients.ObjectClientS3(*ec2_client_args)
-        self.custom_object_client = ObjectClientCustomizedHeader(
-            self.auth_provider)
-        self.custom_account_client = \
-            AccountClientCustomizedHeader(self.auth_provider)
-        self.data_processing_client = DataProcessingClient(
-            self.auth_provider)
-        self.migrations_client = MigrationsClientJSON(self.auth_provider)
-        self.security_group_default_rules_client = (
-            SecurityGroupDefaultRulesClientJSON(self.auth_provider))
-        self.networks_client = NetworksClientJSON(self.auth_provider)
-        # NOTE : As XML clients are not implemented for Qos-specs.
-        # So, setting the qos_client here. Once client are implemented,
-        # qos_client would be moved to its respective if/else.
-        # Bug : 1312553
-        self.volume_qos_client = QosSpecsClientJSON(self.auth_provider)
-        self.volume_qos_v2_client = QosSpecsV2ClientJSON(
-            self.auth_provider)
+    @property
+    def client_names(self):
+        """Names of the clients available from this manager"""
+        names = (set(self._clients) | set(COMMON_CLIENTS) |
+                 set(TOKEN_CLIENTS[self.interface]) | set(EC2_CLIENTS))
+        return sorted(name for name in names
+                      if self._get_client_path(name) is not None)
 
 
 class AltManager(Manager):
@@ -80,6 +80,7 @@ class Cleanup(object):
         self._init_admin_ids()
 
         self.admin_role_added = []
+        self.engine = cleanup_service.DeletionEngine(self.options.max_workers)
 
         # available services
         self.tenant_services = cleanup_service.get_tenant_cleanup_services()
@@ -127,9 +128,8 @@ class Cleanup(object):
                   'saved_state_json': self.json_data,
                   'is_preserve': is_preserve,
                   'is_save_state': is_save_state}
-        for service in self.global_services:
-            svc = service(admin_mgr, **kwargs)
-            svc.run()
+        self.engine.run([service(admin_mgr, **kwargs)
+                         for service in self.global_services])
 
         if is_dry_run:
             f.write(json.dumps(self.dry_run_data, sort_keys=True,
@@ -137,6 +137,9 @@ class Cleanup(object):
             f.close()
 
         self._remove_admin_user_roles()
+        self.engine.shutdown()
+        if not is_dry_run:
+            LOG.info("Cleanup: %s" % self.engine.stats)
 
     def _remove_admin_user_roles(self):
         tenant_ids = self.admin_role_added
@@ -166,10 +169,10 @@ class Cleanup(object):
                   'saved_state_json': None,
                   'is_preserve': is_preserve,
                   'is_save_state': False,
-                  'tenant_id': tenant_id}
-        for service in self.tenant_services:
-            svc = service(mgr, **kwargs)
-            svc.run()
+                  'tenant_id': tenant_id,
+                  'prefix': self.options.prefix}
+        self.engine.run([service(mgr, **kwargs)
+                         for service in self.tenant_services])
 
     def _init_admin_ids(self):
         id_cl = self.admin_mgr.identity_client
@@ -217,6 +220,15 @@ class Cleanup(object):
                             help="Generate JSON file:" + DRY_RUN_JSON +
                             ", that reports the objects that would have "
                             "been deleted had a full cleanup been run.")
+        parser.add_argument('--max-workers', type=int, dest='max_workers',
+                            default=16,
+                            help="Maximum number of concurrent deletions. "
+                            "The services run in dependency order, "
+                            "deleting their resources concurrently.")
+        parser.add_argument('--prefix', dest='prefix', default=None,
+                            help="Only clean up the tenant resources whose "
+                            "name starts with this prefix. Resources "
+                            "without a name are not filtered out.")
 
         self.options = parser.parse_args()
 
@@ -14,6 +14,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import re
+import threading
+import time
+
+from tempest.common import async_client
+from tempest.common import polling
 from tempest import config
 from tempest.openstack.common import log as logging
 from tempest import test
@@ -73,31 +79,121 @@ def init_conf():
 
 
 class BaseService(object):
+    # Names of the services whose resources must be deleted first
+    depends_on = ()
+    # Maximum number of concurrent deletions of this service resources
+    max_concurrency = 8
+    # Whether the resources are still listed for a while once deleted
+    async_delete = False
+    # Number of resources listed per request by the paginated listings
+    page_size = 500
+
     def __init__(self, kwargs):
         self.client = None
+        self.tenant_id = None
+        self.prefix = None
         for key, value in kwargs.items():
             setattr(self, key, value)
 
-    def _filter_by_tenant_id(self, item_list):
-        if (item_list is None
-                or len(item_list) == 0
-                or not hasattr(self, 'tenant_id')
-                or self.tenant_id is None
-                or 'tenant_id' not in item_list[0]):
-            return item_list
-
-        _filtered_list = []
-        for item in item_list:
-            if item['tenant_id'] == self.tenant_id:
-                _filtered_list.append(item)
-        return _filtered_list
+    def _filters(self):
+        """Filters passed to the API listing the resources"""
+        if self.tenant_id is None:
+            return {}
+        return {'tenant_id': self.tenant_id}
+
+    def _list_page(self, list_method, key, filters, marker=None):
+        params = dict(filters, limit=self.page_size)
+        if marker is not None:
+            params['marker'] = marker
+        _, body = list_method(**params)
+        LOG.debug("Listed a page of %s %s" % (len(body[key]), key))
+        return body[key]
+
+    def _list_pages(self, list_method, key, **filters):
+        """Yields the resources listed one page at a time
+
+        Pages are requested with marker and limit, so that only a couple of
+        pages are held in memory and the resources can be deleted while the
+        listing goes on. An API not paginating returns all the resources at
+        once.
+        """
+        filters = dict(self._filters(), **filters)
+        page = self._list_page(list_method, key, filters)
+        previous_ids = set()
+        while page is not None:
+            page_ids = set(item['id'] for item in page)
+            next_page = None
+            # A page repeating the previous one if the marker is ignored
+            if (len(page) >= self.page_size and
+                    not page_ids & previous_ids):
+                # Requested before the resources of this page are deleted,
+                # as the marker has to exist
+                next_page = self._list_page(list_method, key, filters,
+                                            page[-1]['id'])
+            for item in page:
+                if item['id'] not in previous_ids:
+                    yield item
+            previous_ids = page_ids
+            page = next_page
+
+    def _filter(self, items):
+        """Yields the resources of the tenant whose name has the prefix
+
+        Also done on the resources listed with server side filters, in case
+        the API ignored them.
+        """
+        for item in items:
+            if (self.tenant_id is not None and
+                    item.get('tenant_id', self.tenant_id) != self.tenant_id):
+                continue
+            name = self.item_name(item)
+            if (self.prefix and name is not None and
+                    not name.startswith(self.prefix)):
+                continue
+            yield item
 
     def list(self):
         pass
 
-    def delete(self):
+    def item_id(self, item):
+        return item['id']
+
+    def item_name(self, item):
+        return item.get('name', item.get('display_name'))
+
+    def delete_item(self, item):
         pass
 
+    def delete(self):
+        for item in self.list():
+            try:
+                self.delete_item(item)
+            except Exception as e:
+                LOG.exception("Delete %s exception: %s" %
+                              (self.__class__.__name__, e))
+
+    def wait_for_deletion(self, items):
+        """Waits for the deleted items to be no longer listed
+
+        All the items are checked with a single list call per poll.
+        Returns the ids of the items still listed at the timeout.
+        """
+        ids = set(self.item_id(item) for item in items)
+        if not self.async_delete or not ids:
+            return []
+        poller = polling.Poller(self.client.build_interval,
+                                self.client.build_timeout,
+                                self.__class__.__name__, 'DELETED')
+        while True:
+            ids &= set(self.item_id(item) for item in self.list())
+            if not ids:
+                poller.done()
+                return []
+            if poller.timed_out():
+                poller.done(success=False)
+                return list(ids)
+            poller.sleep()
+
     def dry_run(self):
         pass
 
@@ -114,6 +210,7 @@ class BaseService(object):
 
 
 class SnapshotService(BaseService):
+    async_delete = True
 
     def __init__(self, manager, **kwargs):
         super(SnapshotService, self).__init__(kwargs)
@@ -122,75 +219,69 @@ class SnapshotService(BaseService):
     def list(self):
         client = self.client
         __, snaps = client.list_snapshots()
+        snaps = list(self._filter(snaps))
         LOG.debug("List count, %s Snapshots" % len(snaps))
         return snaps
 
-    def delete(self):
-        snaps = self.list()
-        client = self.client
-        for snap in snaps:
-            try:
-                client.delete_snapshot(snap['id'])
-            except Exception as e:
-                LOG.exception("Delete Snapshot exception: %s" % e)
-                pass
+    def delete_item(self, snap):
+        self.client.delete_snapshot(snap['id'])
 
     def dry_run(self):
-        snaps = self.list()
+        snaps = list(self.list())
         self.data['snapshots'] = snaps
 
 
 class ServerService(BaseService):
+    max_concurrency = 16
+    async_delete = True
+
     def __init__(self, manager, **kwargs):
         super(ServerService, self).__init__(kwargs)
         self.client = manager.servers_client
 
+    def _filters(self):
+        # The servers of the tenant only are listed
+        if self.prefix:
+            return {'name': '^%s' % re.escape(self.prefix)}
+        return {}
+
     def list(self):
         client = self.client
-        _, servers_body = client.list_servers()
-        servers = servers_body['servers']
-        LOG.debug("List count, %s Servers" % len(servers))
-        return servers
+        servers = self._list_pages(
+            lambda **params: client.list_servers(params), 'servers')
+        return self._filter(servers)
 
-    def delete(self):
-        client = self.client
-        servers = self.list()
-        for server in servers:
-            try:
-                client.delete_server(server['id'])
-            except Exception as e:
-                LOG.exception("Delete Server exception: %s" % e)
-                pass
+    def delete_item(self, server):
+        self.client.delete_server(server['id'])
 
     def dry_run(self):
-        servers = self.list()
+        servers = list(self.list())
         self.data['servers'] = servers
 
 
 class ServerGroupService(ServerService):
+    depends_on = ('ServerService',)
+    async_delete = False
 
     def list(self):
         client = self.client
         _, sgs = client.list_server_groups()
+        sgs = list(self._filter(sgs))
         LOG.debug("List count, %s Server Groups" % len(sgs))
         return sgs
 
-    def delete(self):
-        client = self.client
-        sgs = self.list()
-        for sg in sgs:
-            try:
-                client.delete_server_group(sg['id'])
-            except Exception as e:
-                LOG.exception("Delete Server Group exception: %s" % e)
-                pass
+    def delete_item(self, sg):
+        self.client.delete_server_group(sg['id'])
 
     def dry_run(self):
-        sgs = self.list()
+        sgs = list(self.list())
         self.data['server_groups'] = sgs
 
 
 class StackService(BaseService):
+    max_concurrency = 4
+    async_delete = True
+
     def __init__(self, manager, **kwargs):
         super(StackService, self).__init__(kwargs)
         self.client = manager.orchestration_client
@@ -198,21 +289,18 @@ class StackService(BaseService):
     def list(self):
         client = self.client
         _, stacks = client.list_stacks()
+        stacks = list(self._filter(stacks))
         LOG.debug("List count, %s Stacks" % len(stacks))
         return stacks
 
-    def delete(self):
-        client = self.client
-        stacks = self.list()
-        for stack in stacks:
-            try:
-                client.delete_stack(stack['id'])
-            except Exception as e:
-                LOG.exception("Delete Stack exception: %s " % e)
-                pass
+    def item_name(self, item):
+        return item['stack_name']
+
+    def delete_item(self, stack):
+        self.client.delete_stack(stack['id'])
 
     def dry_run(self):
-        stacks = self.list()
+        stacks = list(self.list())
         self.data['stacks'] = stacks
 
 
@@ -224,26 +312,27 @@ class KeyPairService(BaseService):
     def list(self):
         client = self.client
         _, keypairs = client.list_keypairs()
+        keypairs = list(self._filter(keypairs))
         LOG.debug("List count, %s Keypairs" % len(keypairs))
         return keypairs
 
-    def delete(self):
-        client = self.client
-        keypairs = self.list()
-        for k in keypairs:
-            try:
-                name = k['keypair']['name']
-                client.delete_keypair(name)
-            except Exception as e:
-                LOG.exception("Delete Keypairs exception: %s" % e)
-                pass
+    def item_id(self, item):
+        return item['keypair']['name']
+
+    def item_name(self, item):
+        return item['keypair']['name']
+
+    def delete_item(self, k):
+        self.client.delete_keypair(k['keypair']['name'])
 
     def dry_run(self):
-        keypairs = self.list()
+        keypairs = list(self.list())
         self.data['keypairs'] = keypairs
 
 
 class SecurityGroupService(BaseService):
+    depends_on = ('ServerService',)
+
     def __init__(self, manager, **kwargs):
         super(SecurityGroupService, self).__init__(kwargs)
         self.client = manager.security_groups_client
@@ -251,21 +340,16 @@ class SecurityGroupService(BaseService):
     def list(self):
         client = self.client
         _, secgrps = client.list_security_groups()
-        secgrp_del = [grp for grp in secgrps if grp['name'] != 'default']
+        secgrp_del = [grp for grp in self._filter(secgrps)
+                      if grp['name'] != 'default']
         LOG.debug("List count, %s Security Groups" % len(secgrp_del))
         return secgrp_del
 
-    def delete(self):
-        client = self.client
-        secgrp_del = self.list()
-        for g in secgrp_del:
-            try:
-                client.delete_security_group(g['id'])
-            except Exception as e:
-                LOG.exception("Delete Security Groups exception: %s" % e)
+    def delete_item(self, g):
+        self.client.delete_security_group(g['id'])
 
     def dry_run(self):
-        secgrp_del = self.list()
+        secgrp_del = list(self.list())
         self.data['security_groups'] = secgrp_del
 
 
@@ -280,22 +364,18 @@ class FloatingIpService(BaseService):
         LOG.debug("List count, %s Floating IPs" % len(floating_ips))
         return floating_ips
 
-    def delete(self):
-        client = self.client
-        floating_ips = self.list()
-        for f in floating_ips:
-            try:
-                client.delete_floating_ip(f['id'])
-            except Exception as e:
-                LOG.exception("Delete Floating IPs exception: %s" % e)
-                pass
+    def delete_item(self, f):
+        self.client.delete_floating_ip(f['id'])
 
     def dry_run(self):
-        floating_ips = self.list()
+        floating_ips = list(self.list())
         self.data['floating_ips'] = floating_ips
 
 
 class VolumeService(BaseService):
+    depends_on = ('SnapshotService', 'ServerService')
+    async_delete = True
+
     def __init__(self, manager, **kwargs):
         super(VolumeService, self).__init__(kwargs)
         self.client = manager.volumes_client
@@ -303,439 +383,286 @@ class VolumeService(BaseService):
     def list(self):
         client = self.client
         _, vols = client.list_volumes()
+        vols = list(self._filter(vols))
         LOG.debug("List count, %s Volumes" % len(vols))
         return vols
 
-    def delete(self):
-        client = self.client
-        vols = self.list()
-        for v in vols:
-            try:
-                client.delete_volume(v['id'])
-            except Exception as e:
-                LOG.exception("Delete Volume exception: %s" % e)
-                pass
+    def delete_item(self, v):
+        self.client.delete_volume(v['id'])
 
     def dry_run(self):
-        vols = self.list()
+        vols = list(self.list())
         self.data['volumes'] = vols
 
 
 # Begin network service classes
 class NetworkService(BaseService):
+    depends_on = ('NetworkSubnetService', 'NetworkPortService')
+
     def __init__(self, manager, **kwargs):
         super(NetworkService, self).__init__(kwargs)
         self.client = manager.network_client
 
     def list(self):
-        client = self.client
-        _, networks = client.list_networks()
-        networks = self._filter_by_tenant_id(networks['networks'])
+        networks = self._list_pages(self.client.list_networks, 'networks')
+        networks = self._filter(networks)
         # filter out networks declared in tempest.conf
         if self.is_preserve:
-            networks = [network for network in networks
+            networks = (network for network in networks
                         if (network['name'] != CONF_PRIV_NETWORK_NAME
-                            and network['id'] != CONF_PUB_NETWORK)]
-        LOG.debug("List count, %s Networks" % networks)
+                            and network['id'] != CONF_PUB_NETWORK))
         return networks
 
-    def delete(self):
-        client = self.client
-        networks = self.list()
-        for n in networks:
-            try:
-                client.delete_network(n['id'])
-            except Exception as e:
-                LOG.exception("Delete Network exception: %s" % e)
-                pass
+    def delete_item(self, n):
+        self.client.delete_network(n['id'])
 
     def dry_run(self):
-        networks = self.list()
+        networks = list(self.list())
         self.data['networks'] = networks
 
 
 class NetworkIpSecPolicyService(NetworkService):
+    depends_on = ('NetworkVpnServiceService',)
 
     def list(self):
-        client = self.client
-        _, ipsecpols = client.list_ipsecpolicies()
-        ipsecpols = ipsecpols['ipsecpolicies']
-        ipsecpols = self._filter_by_tenant_id(ipsecpols)
-        LOG.debug("List count, %s IP Security Policies" % len(ipsecpols))
-        return ipsecpols
+        items = self._list_pages(self.client.list_ipsecpolicies,
+                                 'ipsecpolicies')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        ipsecpols = self.list()
-        for ipsecpol in ipsecpols:
-            try:
-                client.delete_ipsecpolicy(ipsecpol['id'])
-            except Exception as e:
-                LOG.exception("Delete IP Securty Policy exception: %s" % e)
-                pass
+    def delete_item(self, ipsecpol):
+        self.client.delete_ipsecpolicy(ipsecpol['id'])
 
     def dry_run(self):
-        ipsecpols = self.list()
+        ipsecpols = list(self.list())
         self.data['ip_security_policies'] = ipsecpols
 
 
 class NetworkFwPolicyService(NetworkService):
+    depends_on = ()
 
     def list(self):
-        client = self.client
-        _, fwpols = client.list_firewall_policies()
-        fwpols = fwpols['firewall_policies']
-        fwpols = self._filter_by_tenant_id(fwpols)
-        LOG.debug("List count, %s Firewall Policies" % len(fwpols))
-        return fwpols
+        items = self._list_pages(self.client.list_firewall_policies,
+                                 'firewall_policies')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        fwpols = self.list()
-        for fwpol in fwpols:
-            try:
-                client.delete_firewall_policy(fwpol['id'])
-            except Exception as e:
-                LOG.exception("Delete Firewall Policy exception: %s" % e)
-                pass
+    def delete_item(self, fwpol):
+        self.client.delete_firewall_policy(fwpol['id'])
 
     def dry_run(self):
-        fwpols = self.list()
+        fwpols = list(self.list())
         self.data['firewall_policies'] = fwpols
 
 
 class NetworkFwRulesService(NetworkService):
+    depends_on = ('NetworkFwPolicyService',)
 
     def list(self):
-        client = self.client
-        _, fwrules = client.list_firewall_rules()
-        fwrules = fwrules['firewall_rules']
-        fwrules = self._filter_by_tenant_id(fwrules)
-        LOG.debug("List count, %s Firewall Rules" % len(fwrules))
-        return fwrules
+        items = self._list_pages(self.client.list_firewall_rules,
+                                 'firewall_rules')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        fwrules = self.list()
-        for fwrule in fwrules:
-            try:
-                client.delete_firewall_rule(fwrule['id'])
-            except Exception as e:
-                LOG.exception("Delete Firewall Rule exception: %s" % e)
-                pass
+    def delete_item(self, fwrule):
+        self.client.delete_firewall_rule(fwrule['id'])
 
     def dry_run(self):
-        fwrules = self.list()
+        fwrules = list(self.list())
         self.data['firewall_rules'] = fwrules
 
 
 class NetworkIkePolicyService(NetworkService):
+    depends_on = ('NetworkVpnServiceService',)
 
     def list(self):
-        client = self.client
-        _, ikepols = client.list_ikepolicies()
-        ikepols = ikepols['ikepolicies']
-        ikepols = self._filter_by_tenant_id(ikepols)
-        LOG.debug("List count, %s IKE Policies" % len(ikepols))
-        return ikepols
+        items = self._list_pages(self.client.list_ikepolicies, 'ikepolicies')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        ikepols = self.list()
-        for ikepol in ikepols:
-            try:
-                client.delete_firewall_rule(ikepol['id'])
-            except Exception as e:
-                LOG.exception("Delete IKE Policy exception: %s" % e)
-                pass
+    def delete_item(self, ikepol):
+        self.client.delete_ikepolicy(ikepol['id'])
 
     def dry_run(self):
-        ikepols = self.list()
+        ikepols = list(self.list())
         self.data['ike_policies'] = ikepols
 
 
 class NetworkVpnServiceService(NetworkService):
+    depends_on = ()
 
     def list(self):
-        client = self.client
-        _, vpnsrvs = client.list_vpnservices()
-        vpnsrvs = vpnsrvs['vpnservices']
-        vpnsrvs = self._filter_by_tenant_id(vpnsrvs)
-        LOG.debug("List count, %s VPN Services" % len(vpnsrvs))
-        return vpnsrvs
+        items = self._list_pages(self.client.list_vpnservices, 'vpnservices')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        vpnsrvs = self.list()
-        for vpnsrv in vpnsrvs:
-            try:
-                client.delete_vpnservice(vpnsrv['id'])
-            except Exception as e:
-                LOG.exception("Delete VPN Service exception: %s" % e)
-                pass
+    def delete_item(self, vpnsrv):
+        self.client.delete_vpnservice(vpnsrv['id'])
 
     def dry_run(self):
-        vpnsrvs = self.list()
+        vpnsrvs = list(self.list())
         self.data['vpn_services'] = vpnsrvs
 
 
 class NetworkFloatingIpService(NetworkService):
+    depends_on = ()
 
     def list(self):
-        client = self.client
-        _, flips = client.list_floatingips()
-        flips = flips['floatingips']
-        flips = self._filter_by_tenant_id(flips)
-        LOG.debug("List count, %s Network Floating IPs" % len(flips))
-        return flips
+        items = self._list_pages(self.client.list_floatingips, 'floatingips')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        flips = self.list()
-        for flip in flips:
-            try:
-                client.delete_floatingip(flip['id'])
-            except Exception as e:
-                LOG.exception("Delete Network Floating IP exception: %s" % e)
-                pass
+    def delete_item(self, flip):
+        self.client.delete_floatingip(flip['id'])
 
     def dry_run(self):
-        flips = self.list()
+        flips = list(self.list())
         self.data['floating_ips'] = flips
 
 
 class NetworkRouterService(NetworkService):
+    depends_on = ('NetworkFloatingIpService', 'NetworkVpnServiceService')
 
     def list(self):
-        client = self.client
-        _, routers = client.list_routers()
-        routers = routers['routers']
-        routers = self._filter_by_tenant_id(routers)
+        routers = self._list_pages(self.client.list_routers, 'routers')
+        routers = self._filter(routers)
         if self.is_preserve:
-            routers = [router for router in routers
-                       if router['id'] != CONF_PUB_ROUTER]
-
-        LOG.debug("List count, %s Routers" % len(routers))
+            routers = (router for router in routers
+                       if router['id'] != CONF_PUB_ROUTER)
         return routers
 
-    def delete(self):
+    def delete_item(self, router):
         client = self.client
-        routers = self.list()
-        for router in routers:
-            try:
-                rid = router['id']
-                _, ports = client.list_router_interfaces(rid)
-                ports = ports['ports']
-                for port in ports:
-                    subid = port['fixed_ips'][0]['subnet_id']
-                    client.remove_router_interface_with_subnet_id(rid, subid)
-                    client.delete_router(rid)
-            except Exception as e:
-                LOG.exception("Delete Router exception: %s" % e)
-                pass
+        rid = router['id']
+        _, ports = client.list_router_interfaces(rid)
+        ports = ports['ports']
+        for port in ports:
+            subid = port['fixed_ips'][0]['subnet_id']
+            client.remove_router_interface_with_subnet_id(rid, subid)
+        client.delete_router(rid)
 
     def dry_run(self):
-        routers = self.list()
+        routers = list(self.list())
         self.data['routers'] = routers
 
 
 class NetworkHealthMonitorService(NetworkService):
+    depends_on = ()
 
     def list(self):
-        client = self.client
-        _, hms = client.list_health_monitors()
-        hms = hms['health_monitors']
-        hms = self._filter_by_tenant_id(hms)
-        LOG.debug("List count, %s Health Monitors" % len(hms))
-        return hms
+        items = self._list_pages(self.client.list_health_monitors,
+                                 'health_monitors')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        hms = self.list()
-        for hm in hms:
-            try:
-                client.delete_health_monitor(hm['id'])
-            except Exception as e:
-                LOG.exception("Delete Health Monitor exception: %s" % e)
-                pass
+    def delete_item(self, hm):
+        self.client.delete_health_monitor(hm['id'])
 
     def dry_run(self):
-        hms = self.list()
+        hms = list(self.list())
         self.data['health_monitors'] = hms
 
 
 class NetworkMemberService(NetworkService):
+    depends_on = ()
 
     def list(self):
-        client = self.client
-        _, members = client.list_members()
-        members = members['members']
-        members = self._filter_by_tenant_id(members)
-        LOG.debug("List count, %s Members" % len(members))
-        return members
+        items = self._list_pages(self.client.list_members, 'members')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        members = self.list()
-        for member in members:
-            try:
-                client.delete_member(member['id'])
-            except Exception as e:
-                LOG.exception("Delete Member exception: %s" % e)
-                pass
+    def delete_item(self, member):
+        self.client.delete_member(member['id'])
 
     def dry_run(self):
-        members = self.list()
+        members = list(self.list())
         self.data['members'] = members
 
 
 class NetworkVipService(NetworkService):
+    depends_on = ()
 
     def list(self):
-        client = self.client
-        _, vips = client.list_vips()
-        vips = vips['vips']
-        vips = self._filter_by_tenant_id(vips)
-        LOG.debug("List count, %s VIPs" % len(vips))
-        return vips
+        items = self._list_pages(self.client.list_vips, 'vips')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        vips = self.list()
-        for vip in vips:
-            try:
-                client.delete_vip(vip['id'])
-            except Exception as e:
-                LOG.exception("Delete VIP exception: %s" % e)
-                pass
+    def delete_item(self, vip):
+        self.client.delete_vip(vip['id'])
 
     def dry_run(self):
-        vips = self.list()
+        vips = list(self.list())
         self.data['vips'] = vips
 
 
 class NetworkPoolService(NetworkService):
+    depends_on = ('NetworkVipService', 'NetworkMemberService',
+                  'NetworkHealthMonitorService')
 
     def list(self):
-        client = self.client
-        _, pools = client.list_pools()
-        pools = pools['pools']
-        pools = self._filter_by_tenant_id(pools)
-        LOG.debug("List count, %s Pools" % len(pools))
-        return pools
+        items = self._list_pages(self.client.list_pools, 'pools')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        pools = self.list()
-        for pool in pools:
-            try:
-                client.delete_pool(pool['id'])
-            except Exception as e:
-                LOG.exception("Delete Pool exception: %s" % e)
-                pass
+    def delete_item(self, pool):
+        self.client.delete_pool(pool['id'])
 
     def dry_run(self):
-        pools = self.list()
+        pools = list(self.list())
         self.data['pools'] = pools
 
 
 class NetworMeteringLabelRuleService(NetworkService):
+    depends_on = ()
 
     def list(self):
-        client = self.client
-        _, rules = client.list_metering_label_rules()
-        rules = rules['metering_label_rules']
-        rules = self._filter_by_tenant_id(rules)
-        LOG.debug("List count, %s Metering Label Rules" % len(rules))
-        return rules
+        items = self._list_pages(self.client.list_metering_label_rules,
+                                 'metering_label_rules')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        rules = self.list()
-        for rule in rules:
-            try:
-                client.delete_metering_label_rule(rule['id'])
-            except Exception as e:
-                LOG.exception("Delete Metering Label Rule exception: %s" % e)
-                pass
+    def delete_item(self, rule):
+        self.client.delete_metering_label_rule(rule['id'])
 
     def dry_run(self):
-        rules = self.list()
+        rules = list(self.list())
         self.data['rules'] = rules
 
 
 class NetworMeteringLabelService(NetworkService):
+    depends_on = ('NetworMeteringLabelRuleService',)
 
     def list(self):
-        client = self.client
-        _, labels = client.list_metering_labels()
-        labels = labels['metering_labels']
-        labels = self._filter_by_tenant_id(labels)
-        LOG.debug("List count, %s Metering Labels" % len(labels))
-        return labels
+        items = self._list_pages(self.client.list_metering_labels,
+                                 'metering_labels')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        labels = self.list()
-        for label in labels:
-            try:
-                client.delete_metering_label(label['id'])
-            except Exception as e:
-                LOG.exception("Delete Metering Label exception: %s" % e)
-                pass
+    def delete_item(self, label):
+        self.client.delete_metering_label(label['id'])
 
     def dry_run(self):
-        labels = self.list()
+        labels = list(self.list())
         self.data['labels'] = labels
 
 
 class NetworkPortService(NetworkService):
+    depends_on = ('ServerService', 'NetworkRouterService',
+                  'NetworkFloatingIpService', 'NetworkVipService')
 
     def list(self):
-        client = self.client
-        _, ports = client.list_ports()
-        ports = ports['ports']
-        ports = self._filter_by_tenant_id(ports)
-        LOG.debug("List count, %s Ports" % len(ports))
-        return ports
+        items = self._list_pages(self.client.list_ports, 'ports')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        ports = self.list()
-        for port in ports:
-            try:
-                client.delete_port(port['id'])
-            except Exception as e:
-                LOG.exception("Delete Port exception: %s" % e)
-                pass
+    def delete_item(self, port):
+        self.client.delete_port(port['id'])
 
     def dry_run(self):
-        ports = self.list()
+        ports = list(self.list())
         self.data['ports'] = ports
 
 
 class NetworkSubnetService(NetworkService):
+    depends_on = ('NetworkPortService', 'NetworkRouterService',
+                  'NetworkVpnServiceService', 'NetworkPoolService')
 
     def list(self):
-        client = self.client
-        _, subnets = client.list_subnets()
-        subnets = subnets['subnets']
-        subnets = self._filter_by_tenant_id(subnets)
-        LOG.debug("List count, %s Subnets" % len(subnets))
-        return subnets
+        items = self._list_pages(self.client.list_subnets, 'subnets')
+        return self._filter(items)
 
-    def delete(self):
-        client = self.client
-        subnets = self.list()
-        for subnet in subnets:
-            try:
-                client.delete_subnet(subnet['id'])
-            except Exception as e:
-                LOG.exception("Delete Subnet exception: %s" % e)
-                pass
+    def delete_item(self, subnet):
+        self.client.delete_subnet(subnet['id'])
 
     def dry_run(self):
-        subnets = self.list()
+        subnets = list(self.list())
         self.data['subnets'] = subnets
 
 
@@ -748,21 +675,15 @@ class TelemetryAlarmService(BaseService):
     def list(self):
         client = self.client
         _, alarms = client.list_alarms()
+        alarms = list(self._filter(alarms))
         LOG.debug("List count, %s Alarms" % len(alarms))
         return alarms
 
-    def delete(self):
-        client = self.client
-        alarms = self.list()
-        for alarm in alarms:
-            try:
-                client.delete_alarm(alarm['id'])
-            except Exception as e:
-                LOG.exception("Delete Alarms exception: %s" % e)
-                pass
+    def delete_item(self, alarm):
+        self.client.delete_alarm(alarm['id'])
 
     def dry_run(self):
-        alarms = self.list()
+        alarms = list(self.list())
         self.data['alarms'] = alarms
 
 
@@ -786,18 +707,11 @@ class FlavorService(BaseService):
         LOG.debug("List count, %s Flavors after reconcile" % len(flavors))
         return flavors
 
-    def delete(self):
-        client = self.client
-        flavors = self.list()
-        for flavor in flavors:
-            try:
-                client.delete_flavor(flavor['id'])
-            except Exception as e:
-                LOG.exception("Delete Flavor exception: %s" % e)
-                pass
+    def delete_item(self, flavor):
+        self.client.delete_flavor(flavor['id'])
 
     def dry_run(self):
-        flavors = self.list()
+        flavors = list(self.list())
         self.data['flavors'] = flavors
 
     def save_state(self):
@@ -824,18 +738,11 @@ class ImageService(BaseService):
         LOG.debug("List count, %s Images after reconcile" % len(images))
         return images
 
-    def delete(self):
-        client = self.client
-        images = self.list()
-        for image in images:
-            try:
-                client.delete_image(image['id'])
-            except Exception as e:
-                LOG.exception("Delete Image exception: %s" % e)
-                pass
+    def delete_item(self, image):
+        self.client.delete_image(image['id'])
 
     def dry_run(self):
-        images = self.list()
+        images = list(self.list())
         self.data['images'] = images
 
     def save_state(self):
@@ -872,18 +779,11 @@ class UserService(IdentityService):
         LOG.debug("List count, %s Users after reconcile" % len(users))
         return users
 
-    def delete(self):
-        client = self.client
-        users = self.list()
-        for user in users:
-            try:
-                client.delete_user(user['id'])
-            except Exception as e:
-                LOG.exception("Delete User exception: %s" % e)
-                pass
+    def delete_item(self, user):
+        self.client.delete_user(user['id'])
 
     def dry_run(self):
-        users = self.list()
+        users = list(self.list())
         self.data['users'] = users
 
     def save_state(self):
@@ -911,18 +811,11 @@ class RoleService(IdentityService):
             LOG.exception("Cannot retrieve Roles, exception: %s" % ex)
             return []
 
-    def delete(self):
-        client = self.client
-        roles = self.list()
-        for role in roles:
-            try:
-                client.delete_role(role['id'])
-            except Exception as e:
-                LOG.exception("Delete Role exception: %s" % e)
-                pass
+    def delete_item(self, role):
+        self.client.delete_role(role['id'])
 
     def dry_run(self):
-        roles = self.list()
+        roles = list(self.list())
         self.data['roles'] = roles
 
     def save_state(self):
@@ -949,18 +842,11 @@ class TenantService(IdentityService):
         LOG.debug("List count, %s Tenants after reconcile" % len(tenants))
         return tenants
 
-    def delete(self):
-        client = self.client
-        tenants = self.list()
-        for tenant in tenants:
-            try:
-                client.delete_tenant(tenant['id'])
-            except Exception as e:
-                LOG.exception("Delete Tenant exception: %s" % e)
-                pass
+    def delete_item(self, tenant):
+        self.client.delete_tenant(tenant['id'])
 
     def dry_run(self):
-        tenants = self.list()
+        tenants = list(self.list())
         self.data['tenants'] = tenants
 
     def save_state(self):
@@ -971,6 +857,7 @@ class TenantService(IdentityService):
 
 
 class DomainService(BaseService):
+    depends_on = ('UserService', 'TenantService')
 
     def __init__(self, manager, **kwargs):
         super(DomainService, self).__init__(kwargs)
@@ -986,19 +873,12 @@ class DomainService(BaseService):
         LOG.debug("List count, %s Domains after reconcile" % len(domains))
         return domains
 
-    def delete(self):
-        client = self.client
-        domains = self.list()
-        for domain in domains:
-            try:
-                client.update_domain(domain['id'], enabled=False)
-                client.delete_domain(domain['id'])
-            except Exception as e:
-                LOG.exception("Delete Domain exception: %s" % e)
-                pass
+    def delete_item(self, domain):
+        self.client.update_domain(domain['id'], enabled=False)
+        self.client.delete_domain(domain['id'])
 
     def dry_run(self):
-        domains = self.list()
+        domains = list(self.list())
         self.data['domains'] = domains
 
     def save_state(self):
@@ -1008,6 +888,140 @@ class DomainService(BaseService):
             domain_data[domain['id']] = domain['name']
 
 
+class DeletionStats(object):
+    """Resources deleted, failed and left by service"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.start_time = time.time()
+        # service name -> [deleted, failed, left]
+        self._services = {}
+
+    def record(self, service_name, deleted=0, failed=0, left=0):
+        with self._lock:
+            counts = self._services.setdefault(service_name, [0, 0, 0])
+            counts[0] += deleted
+            counts[1] += failed
+            counts[2] += left
+
+    def totals(self):
+        with self._lock:
+            return [sum(counts[i] for counts in self._services.values())
+                    for i in range(3)]
+
+    def left(self):
+        """Returns the number of resources left by service"""
+        with self._lock:
+            return dict((name, counts[2])
+                        for name, counts in self._services.items()
+                        if counts[2])
+
+    def __str__(self):
+        deleted, failed, left = self.totals()
+        elapsed = time.time() - self.start_time
+        return ("%d deleted in %.1f s (%.1f/s), %d failed, %d left%s" %
+                (deleted, elapsed, deleted / max(elapsed, 0.001), failed,
+                 left, ''.join(', %s: %d' % item
+                               for item in sorted(self.left().items()))))
+
+
+class DeletionEngine(object):
+    """Deletes the resources of several services in dependency order
+
+    Each service starts once the services it depends on are done, the
+    deletions run on a bounded pool of workers shared by all the services,
+    with at most max_concurrency deletions in flight per service, and the
+    resources deleted asynchronously are waited for in bulk.
+    """
+
+    def __init__(self, max_workers=16):
+        self.executor = async_client.Executor(max_workers)
+        self.stats = DeletionStats()
+
+    @staticmethod
+    def _dependencies(services):
+        names = dict((service.__class__.__name__, service)
+                     for service in services)
+        dependencies = dict(
+            (name, [dep for dep in service.depends_on if dep in names])
+            for name, service in names.items())
+        # Fail early rather than deadlock on a cycle
+        done = set()
+        while len(done) < len(dependencies):
+            ready = [name for name, deps in dependencies.items()
+                     if name not in done and done.issuperset(deps)]
+            if not ready:
+                raise ValueError("Cyclic dependencies between %s" %
+                                 sorted(set(dependencies) - done))
+            done.update(ready)
+        return dependencies
+
+    def _delete_items(self, service):
+        name = service.__class__.__name__
+        items = service.list()
+        semaphore = threading.BoundedSemaphore(service.max_concurrency)
+        futures = []
+        for item in items:
+            semaphore.acquire()
+            future = self.executor.submit(service.delete_item, item)
+            future.add_done_callback(lambda future: semaphore.release())
+            futures.append((item, future))
+        deleted = []
+        failed = 0
+        for item, future in futures:
+            exc = future.exception()
+            if exc is None:
+                deleted.append(item)
+            else:
+                failed += 1
+                LOG.error("Delete %s %s exception: %s" %
+                          (name, service.item_id(item), exc))
+        left = service.wait_for_deletion(deleted)
+        if left:
+            LOG.error("%s still listed once deleted: %s" % (name, left))
+        self.stats.record(name, deleted=len(deleted) - len(left),
+                          failed=failed, left=failed + len(left))
+
+    def _run_service(self, service, dependencies, done):
+        try:
+            for event in dependencies:
+                event.wait()
+            self._delete_items(service)
+        except Exception as e:
+            LOG.exception("Delete %s exception: %s" %
+                          (service.__class__.__name__, e))
+        finally:
+            done.set()
+
+    def run(self, services):
+        """Runs the services, deleting their resources concurrently
+
+        Services in dry run or save state mode are run in turn.
+        """
+        if any(service.is_dry_run or service.is_save_state
+               for service in services):
+            for service in services:
+                service.run()
+            return
+        dependencies = self._dependencies(services)
+        events = dict((name, threading.Event()) for name in dependencies)
+        threads = []
+        for service in services:
+            name = service.__class__.__name__
+            thread = threading.Thread(
+                target=self._run_service,
+                args=(service, [events[dep] for dep in dependencies[name]],
+                      events[name]))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
 def get_tenant_cleanup_services():
     tenant_services = []
 
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Report of the slowest imports of tempest modules
+
+Imports the given modules (tempest.clients by default) in a fresh process
+and prints the modules which took the longest to import, with the time
+spent importing each module and its own dependencies (cumulative) and the
+time spent in the module itself (self). Run it before and after a change
+to spot startup time regressions:
+
+    tempest-import-report --top 20 tempest.test
+    tempest-import-report --all-clients
+"""
+
+import argparse
+import sys
+import time
+
+from six.moves import builtins
+
+
+class ImportTimer(object):
+    """Times the imports done while installed as the import function"""
+
+    def __init__(self):
+        # module name -> [cumulative time, self time]
+        self.times = {}
+        self._stack = []
+        self._import = None
+
+    def _new_modules(self, name, fromlist):
+        if name not in sys.modules and name not in self.times:
+            return [name]
+        package = sys.modules.get(name)
+        if not fromlist or not hasattr(package, '__path__'):
+            return []
+        # from package import module, for modules not imported yet
+        return ['%s.%s' % (name, item) for item in fromlist
+                if not hasattr(package, item) and
+                '%s.%s' % (name, item) not in self.times]
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=None,
+                      *args, **kwargs):
+        new_modules = self._new_modules(name, fromlist)
+        if not new_modules:
+            return self._import(name, globals, locals, fromlist,
+                                *args, **kwargs)
+        key = ', '.join(new_modules)
+        self.times[key] = [0.0, 0.0]
+        self._stack.append(0.0)
+        start = time.time()
+        try:
+            return self._import(name, globals, locals, fromlist,
+                                *args, **kwargs)
+        finally:
+            elapsed = time.time() - start
+            children = self._stack.pop()
+            self.times[key] = [elapsed, elapsed - children]
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def __enter__(self):
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        return self
+
+    def __exit__(self, *args):
+        builtins.__import__ = self._import
+
+    def slowest(self, top=None):
+        """Returns (name, cumulative, self) tuples, slowest first"""
+        times = sorted(((name, cumulative, own)
+                        for name, (cumulative, own) in self.times.items()),
+                       key=lambda item: item[1], reverse=True)
+        return times[:top] if top else times
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description='Report the slowest imports of tempest modules')
+    parser.add_argument('modules', nargs='*', default=['tempest.clients'],
+                        help="Modules to import (tempest.clients by default)")
+    parser.add_argument('-n', '--top', default=25, type=int,
+                        help="Number of modules to report, 0 for all")
+    parser.add_argument('-a', '--all-clients', action='store_true',
+                        help="Also import all the service client modules")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    ns = parse_args(args)
+    with ImportTimer() as timer:
+        for module in ns.modules:
+            __import__(module)
+        if ns.all_clients:
+            from tempest import clients
+            for module in clients.client_modules():
+                __import__(module)
+    total = sum(own for _, _, own in timer.slowest())
+    print("%-60s %10s %10s" % ("Module", "Cumulative", "Self"))
+    for name, cumulative, own in timer.slowest(ns.top):
+        print("%-60s %10.4f %10.4f" % (name, cumulative, own))
+    print("Imported %d modules in %.4f s" % (len(timer.times), total))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
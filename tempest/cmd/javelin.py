@@ -22,13 +22,19 @@ resources in a declarative way.
 import argparse
 import collections
 import datetime
+import functools
 import os
+import Queue
 import sys
+import threading
 import unittest
 
 import yaml
 
 import tempest.auth
+from tempest.common import async_client
+from tempest.common import polling
+from tempest.common.utils import misc
 from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import log as logging
@@ -45,12 +51,49 @@ from tempest.services.volume.json import volumes_client
 OPTS = {}
 USERS = {}
 RES = collections.defaultdict(list)
+CLIENTS = {}
+CLIENTS_LOCK = threading.Lock()
 
 LOG = None
 
 JAVELIN_START = datetime.datetime.utcnow()
 
 
+class NameCache(object):
+    """Resources of a client by name
+
+    Each type of resources is listed once, on the first lookup, then the
+    resources created or deleted are added or removed as they go.
+    """
+
+    def __init__(self, listers):
+        # resource type -> (callable listing the resources, name key)
+        self._listers = listers
+        self._lock = threading.Lock()
+        self._resources = {}
+
+    def _get_resources(self, resource_type):
+        if resource_type not in self._resources:
+            list_resources, key = self._listers[resource_type]
+            resources = {}
+            for resource in list_resources():
+                resources.setdefault(resource[key], resource)
+            self._resources[resource_type] = resources
+        return self._resources[resource_type]
+
+    def get(self, resource_type, name):
+        with self._lock:
+            return self._get_resources(resource_type).get(name)
+
+    def add(self, resource_type, name, resource):
+        with self._lock:
+            self._get_resources(resource_type)[name] = resource
+
+    def remove(self, resource_type, name):
+        with self._lock:
+            self._resources.get(resource_type, {}).pop(name, None)
+
+
 class OSClient(object):
     _creds = None
     identity = None
@@ -70,6 +113,81 @@ class OSClient(object):
         self.flavors = flavors_client.FlavorsClientJSON(_auth)
         self.telemetry = telemetry_client.TelemetryClientJSON(_auth)
         self.volumes = volumes_client.VolumesClientJSON(_auth)
+        self.names = NameCache({
+            'servers': (lambda: self.servers.list_servers()[1]['servers'],
+                        'name'),
+            'images': (lambda: self.images.image_list()[1], 'name'),
+            'flavors': (lambda: self.flavors.list_flavors()[1], 'name'),
+            'volumes': (lambda: self.volumes.list_volumes()[1],
+                        'display_name'),
+        })
+
+
+class TaskGraph(object):
+    """Named tasks run on a pool of workers in dependency order
+
+    A task starts as soon as all the tasks it depends on succeeded, the
+    tasks depending on a failed task are skipped. Dependencies on tasks
+    which are not part of the graph are ignored.
+    """
+
+    def __init__(self):
+        self.tasks = collections.OrderedDict()
+
+    def add(self, name, func, depends_on=()):
+        self.tasks[name] = (func, list(depends_on))
+        return name
+
+    def run(self, max_workers):
+        """Runs all the tasks, then raises if any failed or was skipped"""
+        pending = collections.OrderedDict(
+            (name, [dep for dep in deps if dep in self.tasks])
+            for name, (func, deps) in self.tasks.items())
+        succeeded = set()
+        failed = {}
+        completed = Queue.Queue()
+        running = 0
+        executor = async_client.Executor(max_workers)
+        try:
+            while True:
+                scheduled = True
+                while scheduled:
+                    scheduled = False
+                    for name, deps in pending.items():
+                        if any(dep in failed for dep in deps):
+                            LOG.error("Skipping %s, a task it depends on "
+                                      "failed" % name)
+                            failed[name] = None
+                        elif succeeded.issuperset(deps):
+                            future = executor.submit(self.tasks[name][0])
+                            future.add_done_callback(
+                                functools.partial(
+                                    lambda name, future: completed.put(
+                                        (name, future)), name))
+                            running += 1
+                        else:
+                            continue
+                        del pending[name]
+                        scheduled = True
+                if not running:
+                    break
+                name, future = completed.get()
+                running -= 1
+                exc = future.exception()
+                if exc is None:
+                    succeeded.add(name)
+                else:
+                    LOG.error("%s failed: %s" % (name, exc))
+                    failed[name] = exc
+        finally:
+            executor.shutdown(wait=False)
+        if pending:
+            raise ValueError("Cyclic dependencies between %s" %
+                             list(pending))
+        if failed:
+            raise exceptions.TempestException(
+                "%d of %d tasks failed or were skipped: %s" %
+                (len(failed), len(self.tasks), sorted(failed)))
 
 
 def load_resources(fname):
@@ -77,19 +195,69 @@ def load_resources(fname):
     return yaml.load(open(fname, 'r'))
 
 
+def _get_client(user, pw, tenant):
+    with CLIENTS_LOCK:
+        key = (user, tenant)
+        if key not in CLIENTS:
+            CLIENTS[key] = OSClient(user, pw, tenant)
+            LOG.debug("Created client for user %s" % user)
+        return CLIENTS[key]
+
+
 def keystone_admin():
-    return OSClient(OPTS.os_username, OPTS.os_password, OPTS.os_tenant_name)
+    return _get_client(OPTS.os_username, OPTS.os_password,
+                       OPTS.os_tenant_name)
 
 
 def client_for_user(name):
     LOG.debug("Entering client_for_user")
     if name in USERS:
         user = USERS[name]
-        LOG.debug("Created client for user %s" % user)
-        return OSClient(user['name'], user['pass'], user['tenant'])
+        return _get_client(user['name'], user['pass'], user['tenant'])
     else:
         LOG.error("%s not found in USERS: %s" % (name, USERS))
 
+
+def _bulk_wait(client, list_resources, ids, status, resource_type):
+    """Waits for all the resources to reach status, or to be deleted
+
+    The resources are polled together, with a single list call per poll.
+
+    :param list_resources: callable listing the resources of the client
+    :param status: status waited for, None to wait for the deletion
+    """
+    poller = polling.Poller(client.build_interval, client.build_timeout,
+                            resource_type, status or 'DELETED')
+    pending = set(ids)
+    while pending:
+        resources = dict((resource['id'], resource)
+                         for resource in list_resources())
+        for resource_id in list(pending):
+            resource = resources.get(resource_id)
+            if status is None:
+                if resource is None:
+                    pending.discard(resource_id)
+            elif resource is None:
+                poller.done(success=False)
+                raise exceptions.NotFound("%s %s" % (resource_type,
+                                                     resource_id))
+            elif resource['status'] == status:
+                pending.discard(resource_id)
+            elif resource['status'].lower() == 'error':
+                poller.done(success=False)
+                raise exceptions.TempestException(
+                    "%s %s is in ERROR status" % (resource_type, resource_id))
+        if not pending:
+            break
+        if poller.timed_out():
+            poller.done(success=False)
+            raise exceptions.TimeoutException(
+                "%s %s did not reach %s within %s s" % (
+                    resource_type, sorted(pending), status or 'DELETED',
+                    client.build_timeout))
+        poller.sleep()
+    poller.done()
+
 ###################
 #
 # TENANTS
@@ -106,17 +274,21 @@ def create_tenants(tenants):
     _, body = admin.identity.list_tenants()
     existing = [x['name'] for x in body]
     for tenant in tenants:
-        if tenant not in existing:
-            admin.identity.create_tenant(tenant)
-        else:
+        if tenant in existing:
             LOG.warn("Tenant '%s' already exists in this environment" % tenant)
+    misc.run_concurrently(admin.identity.create_tenant,
+                          [tenant for tenant in tenants
+                           if tenant not in existing])
 
 
-def destroy_tenants(tenants):
+def _destroy_tenant(tenant):
     admin = keystone_admin()
-    for tenant in tenants:
-        tenant_id = admin.identity.get_tenant_by_name(tenant)['id']
-        r, body = admin.identity.delete_tenant(tenant_id)
+    tenant_id = admin.identity.get_tenant_by_name(tenant)['id']
+    r, body = admin.identity.delete_tenant(tenant_id)
+
+
+def destroy_tenants(tenants):
+    misc.run_concurrently(_destroy_tenant, tenants)
 
 ##############
 #
@@ -157,50 +329,62 @@ def _assign_swift_role(user):
         pass
 
 
+def _create_user(u):
+    admin = keystone_admin()
+    try:
+        tenant = admin.identity.get_tenant_by_name(u['tenant'])
+    except exceptions.NotFound:
+        LOG.error("Tenant: %s - not found" % u['tenant'])
+        return
+    try:
+        admin.identity.get_user_by_username(tenant['id'], u['name'])
+        LOG.warn("User '%s' already exists in this environment"
+                 % u['name'])
+    except exceptions.NotFound:
+        admin.identity.create_user(
+            u['name'], u['pass'], tenant['id'],
+            "%s@%s" % (u['name'], tenant['id']),
+            enabled=True)
+
+
 def create_users(users):
-    """Create tenants from resource definition.
+    """Create users from resource definition.
 
-    Don't create the tenants if they already exist.
+    Don't create the users if they already exist.
     """
-    global USERS
     LOG.info("Creating users")
+    misc.run_concurrently(_create_user, users)
+
+
+def _destroy_user(user):
     admin = keystone_admin()
-    for u in users:
-        try:
-            tenant = admin.identity.get_tenant_by_name(u['tenant'])
-        except exceptions.NotFound:
-            LOG.error("Tenant: %s - not found" % u['tenant'])
-            continue
-        try:
-            admin.identity.get_user_by_username(tenant['id'], u['name'])
-            LOG.warn("User '%s' already exists in this environment"
-                     % u['name'])
-        except exceptions.NotFound:
-            admin.identity.create_user(
-                u['name'], u['pass'], tenant['id'],
-                "%s@%s" % (u['name'], tenant['id']),
-                enabled=True)
+    tenant_id = admin.identity.get_tenant_by_name(user['tenant'])['id']
+    user_id = admin.identity.get_user_by_username(tenant_id,
+                                                  user['name'])['id']
+    r, body = admin.identity.delete_user(user_id)
 
 
 def destroy_users(users):
+    misc.run_concurrently(_destroy_user, users)
+
+
+def _collect_user(u):
     admin = keystone_admin()
-    for user in users:
-        tenant_id = admin.identity.get_tenant_by_name(user['tenant'])['id']
-        user_id = admin.identity.get_user_by_username(tenant_id,
-                                                      user['name'])['id']
-        r, body = admin.identity.delete_user(user_id)
+    tenant = admin.identity.get_tenant_by_name(u['tenant'])
+    u['tenant_id'] = tenant['id']
+    body = admin.identity.get_user_by_username(tenant['id'], u['name'])
+    u['id'] = body['id']
+    USERS[u['name']] = u
+
+
+def _create_and_collect_user(u):
+    _create_user(u)
+    _collect_user(u)
 
 
 def collect_users(users):
-    global USERS
     LOG.info("Collecting users")
-    admin = keystone_admin()
-    for u in users:
-        tenant = admin.identity.get_tenant_by_name(u['tenant'])
-        u['tenant_id'] = tenant['id']
-        USERS[u['name']] = u
-        body = admin.identity.get_user_by_username(tenant['id'], u['name'])
-        USERS[u['name']]['id'] = body['id']
+    misc.run_concurrently(_collect_user, users)
 
 
 class JavelinCheck(unittest.TestCase):
@@ -347,26 +531,20 @@ def _file_contents(fname):
         return f.read()
 
 
-def create_objects(objects):
-    if not objects:
-        return
-    LOG.info("Creating objects")
-    for obj in objects:
-        LOG.debug("Object %s" % obj)
-        _assign_swift_role(obj['owner'])
-        client = client_for_user(obj['owner'])
-        client.containers.create_container(obj['container'])
-        client.objects.create_object(
-            obj['container'], obj['name'],
-            _file_contents(obj['file']))
+def _create_object(obj):
+    LOG.debug("Object %s" % obj)
+    client = client_for_user(obj['owner'])
+    client.containers.create_container(obj['container'])
+    client.objects.create_object(
+        obj['container'], obj['name'],
+        _file_contents(obj['file']))
 
 
-def destroy_objects(objects):
-    for obj in objects:
-        client = client_for_user(obj['owner'])
-        r, body = client.objects.delete_object(obj['container'], obj['name'])
-        if not (200 <= int(r['status']) < 299):
-            raise ValueError("unable to destroy object: [%s] %s" % (r, body))
+def _destroy_object(obj):
+    client = client_for_user(obj['owner'])
+    r, body = client.objects.delete_object(obj['container'], obj['name'])
+    if not (200 <= int(r['status']) < 299):
+        raise ValueError("unable to destroy object: [%s] %s" % (r, body))
 
 
 #######################
@@ -383,59 +561,49 @@ def _resolve_image(image, imgtype):
 
 
 def _get_image_by_name(client, name):
-    r, body = client.images.image_list()
-    for image in body:
-        if name == image['name']:
-            return image
-    return None
+    return client.names.get('images', name)
 
 
-def create_images(images):
-    if not images:
-        return
-    LOG.info("Creating images")
-    for image in images:
-        client = client_for_user(image['owner'])
-
-        # only upload a new image if the name isn't there
-        if _get_image_by_name(client, image['name']):
-            LOG.info("Image '%s' already exists" % image['name'])
-            continue
-
-        # special handling for 3 part image
-        extras = {}
-        if image['format'] == 'ami':
-            name, fname = _resolve_image(image, 'aki')
-            r, aki = client.images.create_image(
-                'javelin_' + name, 'aki', 'aki')
-            client.images.store_image(aki.get('id'), open(fname, 'r'))
-            extras['kernel_id'] = aki.get('id')
-
-            name, fname = _resolve_image(image, 'ari')
-            r, ari = client.images.create_image(
-                'javelin_' + name, 'ari', 'ari')
-            client.images.store_image(ari.get('id'), open(fname, 'r'))
-            extras['ramdisk_id'] = ari.get('id')
-
-        _, fname = _resolve_image(image, 'file')
-        r, body = client.images.create_image(
-            image['name'], image['format'], image['format'], **extras)
-        image_id = body.get('id')
-        client.images.store_image(image_id, open(fname, 'r'))
-
-
-def destroy_images(images):
-    if not images:
+def _create_image(image):
+    client = client_for_user(image['owner'])
+
+    # only upload a new image if the name isn't there
+    if _get_image_by_name(client, image['name']):
+        LOG.info("Image '%s' already exists" % image['name'])
         return
-    LOG.info("Destroying images")
-    for image in images:
-        client = client_for_user(image['owner'])
 
-        response = _get_image_by_name(client, image['name'])
-        if not response:
-            LOG.info("Image '%s' does not exists" % image['name'])
-            continue
-        client.images.delete_image(response['id'])
+    # special handling for 3 part image
+    extras = {}
+    if image['format'] == 'ami':
+        name, fname = _resolve_image(image, 'aki')
+        r, aki = client.images.create_image(
+            'javelin_' + name, 'aki', 'aki')
+        client.images.store_image(aki.get('id'), open(fname, 'r'))
+        extras['kernel_id'] = aki.get('id')
+
+        name, fname = _resolve_image(image, 'ari')
+        r, ari = client.images.create_image(
+            'javelin_' + name, 'ari', 'ari')
+        client.images.store_image(ari.get('id'), open(fname, 'r'))
+        extras['ramdisk_id'] = ari.get('id')
+
+    _, fname = _resolve_image(image, 'file')
+    r, body = client.images.create_image(
+        image['name'], image['format'], image['format'], **extras)
+    image_id = body.get('id')
+    client.images.store_image(image_id, open(fname, 'r'))
+    client.names.add('images', image['name'], body)
+
+
+def _destroy_image(image):
+    client = client_for_user(image['owner'])
+
+    response = _get_image_by_name(client, image['name'])
+    if not response:
+        LOG.info("Image '%s' does not exists" % image['name'])
+        return
+    client.images.delete_image(response['id'])
+    client.names.remove('images', image['name'])
 
 
 #######################
@@ -445,55 +613,54 @@ def destroy_images(images):
 #######################
 
 def _get_server_by_name(client, name):
-    r, body = client.servers.list_servers()
-    for server in body['servers']:
-        if name == server['name']:
-            return server
-    return None
+    return client.names.get('servers', name)
 
 
 def _get_flavor_by_name(client, name):
-    r, body = client.flavors.list_flavors()
-    for flavor in body:
-        if name == flavor['name']:
-            return flavor
-    return None
+    return client.names.get('flavors', name)
 
 
-def create_servers(servers):
-    if not servers:
+def _create_server(server, server_ids):
+    """Creates the server, its id is added to server_ids to be waited for"""
+    client = client_for_user(server['owner'])
+
+    if _get_server_by_name(client, server['name']):
+        LOG.info("Server '%s' already exists" % server['name'])
         return
-    LOG.info("Creating servers")
-    for server in servers:
-        client = client_for_user(server['owner'])
 
-        if _get_server_by_name(client, server['name']):
-            LOG.info("Server '%s' already exists" % server['name'])
-            continue
+    image_id = _get_image_by_name(client, server['image'])['id']
+    flavor_id = _get_flavor_by_name(client, server['flavor'])['id']
+    resp, body = client.servers.create_server(server['name'], image_id,
+                                              flavor_id)
+    client.names.add('servers', server['name'], body)
+    server_ids.append(body['id'])
+
 
-        image_id = _get_image_by_name(client, server['image'])['id']
-        flavor_id = _get_flavor_by_name(client, server['flavor'])['id']
-        resp, body = client.servers.create_server(server['name'], image_id,
-                                                  flavor_id)
-        server_id = body['id']
-        client.servers.wait_for_server_status(server_id, 'ACTIVE')
+def _wait_for_servers(owner, server_ids):
+    if server_ids:
+        client = client_for_user(owner)
+        client.servers.wait_for_servers_status(server_ids, 'ACTIVE')
 
 
-def destroy_servers(servers):
-    if not servers:
+def _destroy_server(server, server_ids):
+    client = client_for_user(server['owner'])
+
+    response = _get_server_by_name(client, server['name'])
+    if not response:
+        LOG.info("Server '%s' does not exist" % server['name'])
         return
-    LOG.info("Destroying servers")
-    for server in servers:
-        client = client_for_user(server['owner'])
 
-        response = _get_server_by_name(client, server['name'])
-        if not response:
-            LOG.info("Server '%s' does not exist" % server['name'])
-            continue
+    client.servers.delete_server(response['id'])
+    client.names.remove('servers', server['name'])
+    server_ids.append(response['id'])
+
 
-        client.servers.delete_server(response['id'])
-        client.servers.wait_for_server_termination(response['id'],
-                                                   ignore_error=True)
+def _wait_for_servers_termination(owner, server_ids):
+    if server_ids:
+        client = client_for_user(owner)
+        _bulk_wait(client.servers,
+                   lambda: client.servers.list_servers()[1]['servers'],
+                   server_ids, None, 'server')
 
 
 #######################
@@ -503,47 +670,48 @@ def destroy_servers(servers):
 #######################
 
 def _get_volume_by_name(client, name):
-    r, body = client.volumes.list_volumes()
-    for volume in body:
-        if name == volume['display_name']:
-            return volume
-    return None
+    return client.names.get('volumes', name)
 
 
-def create_volumes(volumes):
-    if not volumes:
+def _create_volume(volume, volume_ids):
+    """Creates the volume, its id is added to volume_ids to be waited for"""
+    client = client_for_user(volume['owner'])
+
+    # only create a volume if the name isn't here
+    if _get_volume_by_name(client, volume['name']):
+        LOG.info("volume '%s' already exists" % volume['name'])
         return
-    LOG.info("Creating volumes")
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
 
-        # only create a volume if the name isn't here
-        if _get_volume_by_name(client, volume['name']):
-            LOG.info("volume '%s' already exists" % volume['name'])
-            continue
+    size = volume['gb']
+    v_name = volume['name']
+    resp, body = client.volumes.create_volume(size=size,
+                                              display_name=v_name)
+    client.names.add('volumes', v_name, body)
+    volume_ids.append(body['id'])
+
 
-        size = volume['gb']
-        v_name = volume['name']
-        resp, body = client.volumes.create_volume(size=size,
-                                                  display_name=v_name)
-        client.volumes.wait_for_volume_status(body['id'], 'available')
+def _wait_for_volumes(owner, volume_ids):
+    if volume_ids:
+        client = client_for_user(owner)
+        _bulk_wait(client.volumes,
+                   lambda: client.volumes.list_volumes()[1],
+                   volume_ids, 'available', 'volume')
 
 
-def destroy_volumes(volumes):
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
-        volume_id = _get_volume_by_name(client, volume['name'])['id']
-        client.volumes.detach_volume(volume_id)
-        client.volumes.delete_volume(volume_id)
+def _destroy_volume(volume):
+    client = client_for_user(volume['owner'])
+    volume_id = _get_volume_by_name(client, volume['name'])['id']
+    client.volumes.detach_volume(volume_id)
+    client.volumes.delete_volume(volume_id)
+    client.names.remove('volumes', volume['name'])
 
 
-def attach_volumes(volumes):
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
-        server_id = _get_server_by_name(client, volume['server'])['id']
-        volume_id = _get_volume_by_name(client, volume['name'])['id']
-        device = volume['device']
-        client.volumes.attach_volume(volume_id, server_id, device)
+def _attach_volume(volume):
+    client = client_for_user(volume['owner'])
+    server_id = _get_server_by_name(client, volume['server'])['id']
+    volume_id = _get_volume_by_name(client, volume['name'])['id']
+    device = volume['device']
+    client.volumes.attach_volume(volume_id, server_id, device)
 
 
 #######################
@@ -552,31 +720,120 @@ def attach_volumes(volumes):
 #
 #######################
 
+def _server_owner(name, default):
+    for server in RES['servers']:
+        if server['name'] == name:
+            return server['owner']
+    return default
+
+
 def create_resources():
+    """Creates the resources, concurrently where they don't depend on
+    each other, then waits for the servers and volumes in bulk.
+    """
     LOG.info("Creating Resources")
+    graph = TaskGraph()
     # first create keystone level resources, and we need to be admin
     # for those.
-    create_tenants(RES['tenants'])
-    create_users(RES['users'])
-    collect_users(RES['users'])
-
-    # next create resources in a well known order
-    create_objects(RES['objects'])
-    create_images(RES['images'])
-    create_servers(RES['servers'])
-    create_volumes(RES['volumes'])
-    attach_volumes(RES['volumes'])
+    graph.add('tenants', functools.partial(create_tenants, RES['tenants']))
+    for user in RES['users']:
+        graph.add('user:%s' % user['name'],
+                  functools.partial(_create_and_collect_user, user),
+                  ['tenants'])
+
+    for owner in set(obj['owner'] for obj in RES['objects']):
+        graph.add('swift-role:%s' % owner,
+                  functools.partial(_assign_swift_role, owner),
+                  ['user:%s' % owner])
+    for obj in RES['objects']:
+        graph.add('object:%s/%s' % (obj['container'], obj['name']),
+                  functools.partial(_create_object, obj),
+                  ['swift-role:%s' % obj['owner']])
+
+    for image in RES['images']:
+        graph.add('image:%s' % image['name'],
+                  functools.partial(_create_image, image),
+                  ['user:%s' % image['owner']])
+
+    server_ids = collections.defaultdict(list)
+    for server in RES['servers']:
+        graph.add('server:%s' % server['name'],
+                  functools.partial(_create_server, server,
+                                    server_ids[server['owner']]),
+                  ['user:%s' % server['owner'], 'image:%s' % server['image']])
+    for owner in set(server['owner'] for server in RES['servers']):
+        graph.add('servers-active:%s' % owner,
+                  functools.partial(_wait_for_servers, owner,
+                                    server_ids[owner]),
+                  ['server:%s' % server['name'] for server in RES['servers']
+                   if server['owner'] == owner])
+
+    volume_ids = collections.defaultdict(list)
+    for volume in RES['volumes']:
+        graph.add('volume:%s' % volume['name'],
+                  functools.partial(_create_volume, volume,
+                                    volume_ids[volume['owner']]),
+                  ['user:%s' % volume['owner']])
+    for owner in set(volume['owner'] for volume in RES['volumes']):
+        graph.add('volumes-available:%s' % owner,
+                  functools.partial(_wait_for_volumes, owner,
+                                    volume_ids[owner]),
+                  ['volume:%s' % volume['name'] for volume in RES['volumes']
+                   if volume['owner'] == owner])
+    for volume in RES['volumes']:
+        server_owner = _server_owner(volume['server'], volume['owner'])
+        graph.add('attach:%s' % volume['name'],
+                  functools.partial(_attach_volume, volume),
+                  ['volumes-available:%s' % volume['owner'],
+                   'servers-active:%s' % server_owner])
+    graph.run(OPTS.workers)
 
 
 def destroy_resources():
     LOG.info("Destroying Resources")
-    # Destroy in inverse order of create
-    destroy_servers(RES['servers'])
-    destroy_images(RES['images'])
-    destroy_objects(RES['objects'])
-    destroy_volumes(RES['volumes'])
-    destroy_users(RES['users'])
-    destroy_tenants(RES['tenants'])
+    graph = TaskGraph()
+    owned_tasks = collections.defaultdict(list)
+    server_ids = collections.defaultdict(list)
+    for server in RES['servers']:
+        owned_tasks[server['owner']].append(graph.add(
+            'server:%s' % server['name'],
+            functools.partial(_destroy_server, server,
+                              server_ids[server['owner']])))
+    servers_deleted = []
+    for owner in set(server['owner'] for server in RES['servers']):
+        servers_deleted.append(graph.add(
+            'servers-deleted:%s' % owner,
+            functools.partial(_wait_for_servers_termination, owner,
+                              server_ids[owner]),
+            ['server:%s' % server['name'] for server in RES['servers']
+             if server['owner'] == owner]))
+        owned_tasks[owner].append(servers_deleted[-1])
+
+    for image in RES['images']:
+        owned_tasks[image['owner']].append(graph.add(
+            'image:%s' % image['name'],
+            functools.partial(_destroy_image, image), servers_deleted))
+    for obj in RES['objects']:
+        owned_tasks[obj['owner']].append(graph.add(
+            'object:%s/%s' % (obj['container'], obj['name']),
+            functools.partial(_destroy_object, obj)))
+    for volume in RES['volumes']:
+        server_owner = _server_owner(volume['server'], volume['owner'])
+        owned_tasks[volume['owner']].append(graph.add(
+            'volume:%s' % volume['name'],
+            functools.partial(_destroy_volume, volume),
+            ['servers-deleted:%s' % server_owner]))
+
+    for user in RES['users']:
+        graph.add('user:%s' % user['name'],
+                  functools.partial(_destroy_user, user),
+                  owned_tasks[user['name']])
+    for tenant in RES['tenants']:
+        graph.add('tenant:%s' % tenant,
+                  functools.partial(_destroy_tenant, tenant),
+                  ['user:%s' % user['name'] for user in RES['users']
+                   if user['tenant'] == tenant])
+    graph.run(OPTS.workers)
     LOG.warn("Destroy mode incomplete")
 
 
@@ -598,6 +855,11 @@ def get_options():
         required=True,
         metavar='/opt/stack/old',
         help='Devstack base directory for retrieving artifacts')
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=8,
+        help='Number of resources created or destroyed concurrently')
     parser.add_argument(
         '-c', '--config-file',
         metavar='/etc/tempest.conf',
@@ -26,8 +26,13 @@ except ImportError:
 
 from testtools import testsuite
 
+from tempest import config
 from tempest.openstack.common import log as logging
+from tempest.stress import distributed
 from tempest.stress import driver
+from tempest.stress import stats
+
+CONF = config.CONF
 
 LOG = logging.getLogger(__name__)
 
@@ -90,10 +95,60 @@ parser.add_argument('-i', '--call-inherited', action='store_true',
                     help="Call also inherited function with stress attribute")
 group.add_argument('-t', "--tests", nargs='?',
                    help="Name of the file with test description")
+group.add_argument('--agent', action='store_true',
+                   help="Run as an agent of the coordinator at --address, "
+                        "which sends the tests to run")
+group.add_argument('-c', '--compare', nargs=2,
+                   metavar=('BASELINE', 'RESULTS'),
+                   help="Compare two result files and report the "
+                        "regressions of RESULTS")
+parser.add_argument('-o', '--output',
+                    help="File the results (runs, failures and latency "
+                         "histograms of the actions) are written to")
+parser.add_argument('--timeseries',
+                    help="File the throughput and error rate of the actions "
+                         "are written to at regular intervals, in CSV")
+parser.add_argument('--threshold', default=10.0, type=float,
+                    help="Change in percent of a latency percentile, the "
+                         "throughput or the error rate reported as a "
+                         "regression by --compare")
+parser.add_argument('--agents', type=int,
+                    help="Run the tests on this number of agents, as their "
+                         "coordinator listening on --address")
+parser.add_argument('--address', default='localhost:7727',
+                    help="host:port the coordinator listens on and the "
+                         "agents connect to")
+parser.add_argument('-r', '--runner', choices=['process', 'actor'],
+                    help="Run each thread of the actions in a process of "
+                         "its own, or as actors in a few worker processes "
+                         "(default: the runner of the configuration)")
+
+
+def compare(baseline_file, results_file, threshold):
+    baseline = stats.StressResults.load(baseline_file)
+    results = stats.StressResults.load(results_file)
+    for name, run_results in (('Baseline', baseline), ('Results', results)):
+        print("%s:" % name)
+        for line in run_results.format_summary():
+            print("  %s" % line)
+    regressions = stats.compare_results(baseline, results, threshold)
+    if not regressions:
+        print("No regression")
+        return 0
+    print("Regressions:")
+    for regression in regressions:
+        print("  %s" % regression)
+    return 1
 
 
 def main():
     ns = parser.parse_args()
+    if ns.compare:
+        return compare(ns.compare[0], ns.compare[1], ns.threshold)
+    if ns.agent:
+        return distributed.Agent(
+            distributed.parse_address(ns.address),
+            connect_timeout=CONF.stress.agent_timeout).run()
     result = 0
     if not ns.all:
         tests = json.load(open(ns.tests, 'r'))
@@ -101,24 +156,52 @@ def main():
         tests = discover_stress_tests(filter_attr=ns.type,
                                       call_inherited=ns.call_inherited)
 
-    if ns.serial:
-        # Duration is total time
-        duration = ns.duration / len(tests)
-        for test in tests:
-            step_result = driver.stress_openstack([test],
-                                                  duration,
-                                                  ns.number,
-                                                  ns.stop)
-            # NOTE(mkoderer): we just save the last result code
-            if (step_result != 0):
-                result = step_result
-                if ns.stop:
-                    return result
-    else:
-        result = driver.stress_openstack(tests,
-                                         ns.duration,
-                                         ns.number,
-                                         ns.stop)
+    results = stats.StressResults()
+    timeseries = None
+    if ns.timeseries:
+        timeseries = stats.TimeSeries(ns.timeseries)
+    coordinator = None
+    stress_openstack = driver.stress_openstack
+    if ns.agents:
+        coordinator = distributed.Coordinator(
+            distributed.parse_address(ns.address), ns.agents,
+            agent_timeout=CONF.stress.agent_timeout)
+        coordinator.wait_for_agents()
+        stress_openstack = coordinator.run
+    try:
+        if ns.serial:
+            # Duration is total time
+            duration = ns.duration / len(tests)
+            for test in tests:
+                step_result = stress_openstack([test],
+                                               duration,
+                                               ns.number,
+                                               ns.stop,
+                                               results,
+                                               timeseries,
+                                               ns.runner)
+                # NOTE(mkoderer): we just save the last result code
+                if (step_result != 0):
+                    result = step_result
+                    if ns.stop:
+                        break
+        else:
+            result = stress_openstack(tests,
+                                      ns.duration,
+                                      ns.number,
+                                      ns.stop,
+                                      results,
+                                      timeseries,
+                                      ns.runner)
+    finally:
+        if coordinator is not None:
+            coordinator.close()
+        if timeseries is not None:
+            timeseries.close()
+    for line in results.format_summary():
+        print(line)
+    if ns.output:
+        results.save(ns.output)
     return result
 
 
@@ -24,12 +24,17 @@ import httplib2
 from six import moves
 
 from tempest import clients
+from tempest.common import discovery_cache
+from tempest.common.utils import misc
 from tempest import config
 
 
 CONF = config.CONF
 RAW_HTTP = httplib2.Http()
 CONF_PARSER = None
+# Results of discover(): {'versions': {service: versions},
+#                         'extensions': {service: extensions}}
+DISCOVERY = {'versions': {}, 'extensions': {}}
 
 
 def _get_config_file():
@@ -57,9 +62,23 @@ def print_and_or_update(option, group, value, update):
         change_option(option, group, value)
 
 
+def _get_glance_api_versions(os):
+    __, versions = os.image_client.get_versions()
+    return versions
+
+
+def _get_versions(os, service):
+    """Returns the discovered API versions of a service"""
+    if service in DISCOVERY['versions']:
+        return DISCOVERY['versions'][service]
+    if service == 'glance':
+        return _get_glance_api_versions(os)
+    return _get_api_versions(os, service)
+
+
 def verify_glance_api_versions(os, update):
     # Check glance api versions
-    __, versions = os.image_client.get_versions()
+    versions = _get_versions(os, 'glance')
     if CONF.image_feature_enabled.api_v1 != ('v1.1' in versions or 'v1.0' in
                                              versions):
         print_and_or_update('api_v1', 'image_feature_enabled',
@@ -75,7 +94,7 @@ def _get_unversioned_endpoint(base_url):
     return endpoint
 
 
-def _get_api_versions(os, service):
+def _get_api_versions(os, service, http=None):
     client_dict = {
         'nova': os.servers_client,
         'keystone': os.identity_client,
@@ -83,7 +102,7 @@ def _get_api_versions(os, service):
     }
     client_dict[service].skip_path()
     endpoint = _get_unversioned_endpoint(client_dict[service].base_url)
-    __, body = RAW_HTTP.request(endpoint, 'GET')
+    __, body = (http or RAW_HTTP).request(endpoint, 'GET')
     client_dict[service].reset_path()
     body = json.loads(body)
     if service == 'keystone':
@@ -95,7 +114,7 @@ def _get_api_versions(os, service):
 
 def verify_keystone_api_versions(os, update):
     # Check keystone api versions
-    versions = _get_api_versions(os, 'keystone')
+    versions = _get_versions(os, 'keystone')
     if CONF.identity_feature_enabled.api_v2 != ('v2.0' in versions):
         print_and_or_update('api_v2', 'identity_feature_enabled',
                             not CONF.identity_feature_enabled.api_v2, update)
@@ -105,7 +124,7 @@ def verify_keystone_api_versions(os, update):
 
 
 def verify_nova_api_versions(os, update):
-    versions = _get_api_versions(os, 'nova')
+    versions = _get_versions(os, 'nova')
     if CONF.compute_feature_enabled.api_v3 != ('v3.0' in versions):
         print_and_or_update('api_v3', 'compute_feature_enabled',
                             not CONF.compute_feature_enabled.api_v3, update)
@@ -113,7 +132,7 @@ def verify_nova_api_versions(os, update):
 
 def verify_cinder_api_versions(os, update):
     # Check cinder api versions
-    versions = _get_api_versions(os, 'cinder')
+    versions = _get_versions(os, 'cinder')
     if CONF.volume_feature_enabled.api_v1 != ('v1.0' in versions):
         print_and_or_update('api_v1', 'volume_feature_enabled',
                             not CONF.volume_feature_enabled.api_v1, update)
@@ -122,6 +141,9 @@ def verify_cinder_api_versions(os, update):
                             not CONF.volume_feature_enabled.api_v2, update)
 
 
+VERSION_SERVICES = ('cinder', 'glance', 'keystone', 'nova')
+
+
 def verify_api_versions(os, service, update):
     verify = {
         'cinder': verify_cinder_api_versions,
@@ -162,7 +184,7 @@ def get_enabled_extensions(service):
     return extensions_options[service]
 
 
-def verify_extensions(os, service, results):
+def _list_extensions(os, service):
     extensions_client = get_extension_client(os, service)
     __, resp = extensions_client.list_extensions()
     if isinstance(resp, dict):
@@ -180,6 +202,55 @@ def verify_extensions(os, service, results):
 
     else:
         extensions = map(lambda x: x['name'], resp)
+    return extensions
+
+
+def _discover(os, kind, service):
+    if kind == 'extensions':
+        return _list_extensions(os, service)
+    if service == 'glance':
+        return _get_glance_api_versions(os)
+    # The shared connections of RAW_HTTP are not thread safe
+    return _get_api_versions(os, service, http=httplib2.Http())
+
+
+def discover(os, extension_services, version_services, catalog_key=None,
+             use_cache=True):
+    """Discovers the extensions and API versions of the services
+
+    All the discovery requests are sent concurrently. The results are
+    taken from the discovery cache when it has fresh ones for this cloud
+    and catalog, and are stored in it otherwise.
+    """
+    global DISCOVERY
+    requests = ([('extensions', service) for service in extension_services] +
+                [('versions', service) for service in version_services
+                 if service in VERSION_SERVICES])
+    cache = discovery_cache.get_discovery_cache()
+    identity_key = cache.get_identity_key()
+    discovery = None
+    if use_cache and catalog_key is not None:
+        discovery = cache.get(identity_key, catalog_key)
+    if discovery is not None and all(service in discovery[kind]
+                                     for kind, service in requests):
+        print('Using the API discovery cached in %s' % cache.path)
+        DISCOVERY = discovery
+        return DISCOVERY
+    results = misc.run_concurrently(
+        lambda request: _discover(os, *request), requests)
+    DISCOVERY = {'versions': {}, 'extensions': {}}
+    for (kind, service), result in zip(requests, results):
+        DISCOVERY[kind][service] = result
+    if catalog_key is not None:
+        cache.set(identity_key, catalog_key, DISCOVERY)
+    return DISCOVERY
+
+
+def verify_extensions(os, service, results):
+    if service in DISCOVERY['extensions']:
+        extensions = DISCOVERY['extensions'][service]
+    else:
+        extensions = _list_extensions(os, service)
     if not results.get(service):
         results[service] = {}
     extensions_opt = get_enabled_extensions(service)
@@ -244,8 +315,20 @@ def display_results(results, update, replace):
                               output_string)
 
 
-def check_service_availability(os, update):
-    services = []
+def get_catalog(os):
+    """Returns the endpoints of the catalog and their service types"""
+    __, endpoints = os.endpoints_client.list_endpoints()
+    service_ids = list(set(endpoint['service_id'] for endpoint in endpoints))
+    services = misc.run_concurrently(
+        lambda service_id: os.service_client.get_service(service_id)[1],
+        service_ids)
+    service_types = dict((service_id, service['type'])
+                         for service_id, service in zip(service_ids, services))
+    return endpoints, [service_types[endpoint['service_id']]
+                       for endpoint in endpoints]
+
+
+def check_service_availability(os, update, catalog=None):
     avail_services = []
     codename_match = {
         'volume': 'cinder',
@@ -263,10 +346,7 @@ def check_service_availability(os, update):
         'database': 'trove'
     }
     # Get catalog list for endpoints to use for validation
-    __, endpoints = os.endpoints_client.list_endpoints()
-    for endpoint in endpoints:
-        __, service = os.service_client.get_service(endpoint['service_id'])
-        services.append(service['type'])
+    __, services = catalog or get_catalog(os)
     # Pull all catalog types from config file and compare against endpoint list
     for cfgname in dir(CONF._config):
         cfg = getattr(CONF, cfgname)
@@ -321,6 +401,9 @@ def parse_args():
     parser.add_argument('-r', '--replace-ext', action='store_true',
                         help="If specified the all option will be replaced "
                              "with a full list of extensions")
+    parser.add_argument('-n', '--no-cache', action='store_true',
+                        help="Query the services even if the discovery "
+                             "cache has fresh results for this cloud")
     args = parser.parse_args()
     return args
 
@@ -341,18 +424,25 @@ def main():
         CONF_PARSER.optionxform = str
         CONF_PARSER.readfp(conf_file)
     os = clients.ComputeAdminManager(interface='json')
-    services = check_service_availability(os, update)
-    results = {}
+    catalog = get_catalog(os)
+    services = check_service_availability(os, update, catalog)
+    extension_services = []
     for service in ['nova', 'nova_v3', 'cinder', 'neutron', 'swift']:
         if service == 'nova_v3' and 'nova' not in services:
             continue
         elif service not in services:
             continue
-        results = verify_extensions(os, service, results)
-
+        extension_services.append(service)
     # Verify API verisons of all services in the keystone catalog and keystone
     # itself.
     services.append('keystone')
+    discover(os, extension_services, services,
+             discovery_cache.DiscoveryCache.get_catalog_key(catalog[0]),
+             use_cache=not opts.no_cache)
+
+    results = {}
+    for service in extension_services:
+        results = verify_extensions(os, service, results)
     for service in services:
         verify_api_versions(os, service, update)
 
@@ -12,8 +12,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import errno
+import fcntl
 import hashlib
 import os
+import random
+import threading
+import time
 
 import yaml
 
@@ -21,7 +26,6 @@ from tempest import auth
 from tempest.common import cred_provider
 from tempest import config
 from tempest import exceptions
-from tempest.openstack.common import lockutils
 from tempest.openstack.common import log as logging
 
 CONF = config.CONF
@@ -34,6 +38,58 @@ def read_accounts_yaml(path):
     return accounts
 
 
+class AllocationStats(object):
+    """Allocation times and free accounts of the locking Accounts provider"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquires = 0
+        self.releases = 0
+        self.probes = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.accounts = 0
+
+    def record_acquire(self, wait_time, probes, accounts):
+        with self._lock:
+            self.acquires += 1
+            self.probes += probes
+            self.wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+            self.accounts = accounts
+
+    def record_release(self):
+        with self._lock:
+            self.releases += 1
+
+    def free_accounts(self):
+        """Estimated mean number of free accounts when acquiring one
+
+        Accounts are probed from a random one, so the mean number of probes
+        is about accounts / (free accounts + 1).
+        """
+        with self._lock:
+            if not self.acquires:
+                return None
+            return max(self.accounts * self.acquires / float(self.probes) - 1,
+                       0)
+
+    def __str__(self):
+        free_accounts = self.free_accounts()
+        with self._lock:
+            if not self.acquires:
+                return "no account acquired"
+            return ("acquires: %d, releases: %d, probes per acquire: %.1f, "
+                    "wait time: %.3f s (max %.3f s), "
+                    "estimated free accounts: %.1f of %d" % (
+                        self.acquires, self.releases,
+                        self.probes / float(self.acquires), self.wait_time,
+                        self.max_wait_time, free_accounts, self.accounts))
+
+
+allocation_stats = AllocationStats()
+
+
 class Accounts(cred_provider.CredentialProvider):
 
     def __init__(self, name):
@@ -47,6 +103,8 @@ class Accounts(cred_provider.CredentialProvider):
         self.hash_dict = self.get_hash_dict(accounts)
         self.accounts_dir = os.path.join(CONF.lock_path, 'test_accounts')
         self.isolated_creds = {}
+        # hash -> locked lock file of the accounts in use
+        self._lock_files = {}
 
     @classmethod
     def get_hash_dict(cls, accounts):
@@ -65,23 +123,43 @@ class Accounts(cred_provider.CredentialProvider):
         else:
             return len(self.hash_dict) > 1
 
-    def _create_hash_file(self, hash_string):
-        path = os.path.join(os.path.join(self.accounts_dir, hash_string))
-        if not os.path.isfile(path):
-            open(path, 'w').close()
-            return True
-        return False
+    def _lock_hash(self, hash_string):
+        """Returns the locked lock file of the account, or None if in use
+
+        The lock is an advisory lock held on the open file, released by the
+        kernel if the process dies.
+        """
+        path = os.path.join(self.accounts_dir, hash_string)
+        lock_file = open(path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except IOError as e:
+            lock_file.close()
+            if e.errno in (errno.EACCES, errno.EAGAIN):
+                return None
+            raise
+        return lock_file
 
-    @lockutils.synchronized('test_accounts_io', external=True)
     def _get_free_hash(self, hashes):
+        start = time.time()
         if not os.path.isdir(self.accounts_dir):
-            os.mkdir(self.accounts_dir)
-            # Create File from first hash (since none are in use)
-            self._create_hash_file(hashes[0])
-            return hashes[0]
-        for _hash in hashes:
-            res = self._create_hash_file(_hash)
-            if res:
+            try:
+                os.makedirs(self.accounts_dir)
+            except OSError:
+                # Created meanwhile by another process
+                if not os.path.isdir(self.accounts_dir):
+                    raise
+        # Start from a random account, so that the workers do not all
+        # contend for the first ones and a free account is found in a few
+        # probes while most accounts are free
+        offset = random.randrange(len(hashes))
+        for probes in range(1, len(hashes) + 1):
+            _hash = hashes[(offset + probes) % len(hashes)]
+            lock_file = self._lock_hash(_hash)
+            if lock_file is not None:
+                self._lock_files[_hash] = lock_file
+                allocation_stats.record_acquire(time.time() - start, probes,
+                                                len(hashes))
                 return _hash
         msg = 'Insufficient number of users provided'
         raise exceptions.InvalidConfiguration(msg)
@@ -93,16 +171,17 @@ class Accounts(cred_provider.CredentialProvider):
         free_hash = self._get_free_hash(self.hash_dict.keys())
         return self.hash_dict[free_hash]
 
-    @lockutils.synchronized('test_accounts_io', external=True)
     def remove_hash(self, hash_string):
-        hash_path = os.path.join(self.accounts_dir, hash_string)
-        if not os.path.isfile(hash_path):
-            LOG.warning('Expected an account lock file %s to remove, but '
-                        'one did not exist')
-        else:
-            os.remove(hash_path)
-            if not os.listdir(self.accounts_dir):
-                os.rmdir(self.accounts_dir)
+        lock_file = self._lock_files.pop(hash_string, None)
+        if lock_file is None:
+            LOG.warning('Expected a lock on the account %s to release, but '
+                        'none was held' % hash_string)
+            return
+        # NOTE: the lock file is kept, removing it would let another worker
+        # lock a new file while the old one is still locked
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+        allocation_stats.record_release()
 
     def get_hash(self, creds):
         for _hash in self.hash_dict:
@@ -0,0 +1,188 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Asynchronous variant of the service clients.
+
+AsyncClient wraps any service client (RestClient subclass). Calling one of
+its methods schedules the call on a shared pool of worker threads and
+returns a Future right away, so a single driver can keep many API calls in
+flight. The wrapped client is used unchanged: authentication, logging,
+response_checker and _error_checker all apply as for a synchronous call.
+
+    servers = AsyncClient(manager.servers_client)
+    futures = [servers.create_server(name, image, flavor)
+               for name in names]
+    results = gather(futures)
+"""
+
+import functools
+import Queue
+import sys
+import threading
+
+import six
+
+from tempest import config
+from tempest import exceptions
+
+CONF = config.CONF
+
+
+class Future(object):
+    """The result of an asynchronous call"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def done(self):
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Waits for the call to complete and returns its result, or re-raises
+        the exception raised by the call
+        """
+        if not self._event.wait(timeout):
+            raise exceptions.TimeoutException(
+                "Call not completed within %s s" % timeout)
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        return self._result
+
+    def exception(self, timeout=None):
+        """Returns the exception raised by the call, or None"""
+        try:
+            self.result(timeout)
+        except exceptions.TimeoutException:
+            if not self.done():
+                raise
+            return self._exc_info[1]
+        except Exception as exc:
+            return exc
+        return None
+
+    def add_done_callback(self, func):
+        """Calls func with the future as argument once it completes"""
+        with self._lock:
+            if not self.done():
+                self._callbacks.append(func)
+                return
+        func(self)
+
+    def _complete(self, result=None, exc_info=None):
+        with self._lock:
+            self._result = result
+            self._exc_info = exc_info
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for func in callbacks:
+            func(self)
+
+
+class Executor(object):
+    """Runs calls on a bounded pool of daemon worker threads
+
+    Worker threads are started on demand, up to max_workers.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._queue = Queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        with self._lock:
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, func, args, kwargs = item
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                future._complete(exc_info=sys.exc_info())
+            else:
+                future._complete(result=result)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns the executor shared by all the asynchronous clients"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = Executor(CONF.service_clients.async_workers)
+        return _executor
+
+
+class AsyncClient(object):
+    """Wraps a service client so that its methods return futures"""
+
+    def __init__(self, client, executor=None):
+        self.client = client
+        self.executor = executor or get_executor()
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def submit(*args, **kwargs):
+            return self.executor.submit(attr, *args, **kwargs)
+        return submit
+
+
+def gather(futures, timeout=None, raise_on_error=True):
+    """Waits for all the futures and returns their results in order
+
+    :param raise_on_error: when False, the exception raised by a call is
+                           returned in place of its result
+    """
+    results = []
+    for future in futures:
+        if raise_on_error:
+            results.append(future.result(timeout))
+        else:
+            results.append(future.exception(timeout) or future.result())
+    return results
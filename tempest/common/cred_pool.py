@@ -0,0 +1,333 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import atexit
+import threading
+
+from tempest import clients
+from tempest.common import async_client
+from tempest.common import isolated_creds
+from tempest import config
+from tempest import exceptions
+from tempest.openstack.common import log as logging
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Ports which are not left over by the tests
+NETWORK_PORT_OWNERS = ('network:router_interface', 'network:dhcp',
+                       'network:router_gateway')
+
+
+class CredentialPool(object):
+    """Isolated credentials and network resources provisioned in advance
+
+    The pool keeps up to size sets of credentials (and network resources,
+    with neutron) ready for each kind of credentials (admin or not), which
+    are provisioned in parallel in the background. Sets given back by the
+    test classes are checked and reused when clean, i.e. when the tests
+    left no resources and no role behind, deleted otherwise.
+    """
+
+    def __init__(self, size, interface='json'):
+        self.size = size
+        self._creator = isolated_creds.IsolatedCreds('tempest-pool',
+                                                     interface=interface)
+        self._executor = async_client.Executor(
+            CONF.auth.isolated_creds_pool_workers)
+        self._lock = threading.Lock()
+        # admin -> [(credentials, network resources)]
+        self._idle = {False: [], True: []}
+        # admin -> number of sets being provisioned
+        self._provisioning = {False: 0, True: 0}
+        # user id -> names of the roles of the user when provisioned
+        self._roles = {}
+        self._admin_manager = None
+        self.created = 0
+        self.reused = 0
+        self.misses = 0
+        self.deleted = 0
+
+    @property
+    def password(self):
+        return self._creator.password
+
+    def _incr(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def admin_manager(self):
+        with self._lock:
+            if self._admin_manager is None:
+                self._admin_manager = clients.AdminManager(
+                    interface=self._creator.interface)
+            return self._admin_manager
+
+    def _get_roles(self, credentials):
+        _, roles = self._creator.identity_admin_client.list_user_roles(
+            credentials.tenant_id, credentials.user_id)
+        return frozenset(role['name'] for role in roles)
+
+    def _create(self, admin):
+        credentials = self._creator._create_creds(admin=admin)
+        try:
+            roles = self._get_roles(credentials)
+        except Exception:
+            self._creator._clear_creds(credentials)
+            raise
+        with self._lock:
+            self._roles[credentials.user_id] = roles
+        net_resources = None
+        if self._creator._needs_network_resources():
+            try:
+                net_resources = self._creator._create_network_resources(
+                    credentials.tenant_id)
+            except Exception:
+                self._creator._clear_creds(credentials)
+                raise
+        self._incr('created')
+        return credentials, net_resources
+
+    def _delete(self, credentials, net_resources):
+        try:
+            if net_resources is not None:
+                self._creator._clear_net_resources(*net_resources)
+            self._creator._clear_creds(credentials)
+            with self._lock:
+                self._roles.pop(credentials.user_id, None)
+            self._incr('deleted')
+        except Exception:
+            LOG.exception("Failed to delete the pooled credentials %s" %
+                          credentials)
+
+    def _provision(self, admin):
+        try:
+            credentials_set = self._create(admin)
+        except Exception:
+            LOG.exception("Failed to provision isolated credentials")
+            return
+        finally:
+            with self._lock:
+                self._provisioning[admin] -= 1
+        self._put(admin, credentials_set)
+
+    def _put(self, admin, credentials_set):
+        with self._lock:
+            if len(self._idle[admin]) < self.size:
+                self._idle[admin].append(credentials_set)
+                return
+        self._delete(*credentials_set)
+
+    def fill(self, admin=False):
+        """Provisions in the background the sets missing from the pool"""
+        with self._lock:
+            missing = (self.size - len(self._idle[admin]) -
+                       self._provisioning[admin])
+            self._provisioning[admin] += max(missing, 0)
+        for _ in range(missing):
+            self._executor.submit(self._provision, admin)
+
+    def acquire(self, admin=False):
+        """Returns a (credentials, network resources) set
+
+        The set is taken from the pool when one is ready, created otherwise.
+        """
+        with self._lock:
+            credentials_set = None
+            if self._idle[admin]:
+                credentials_set = self._idle[admin].pop()
+        if credentials_set is None:
+            self._incr('misses')
+            credentials_set = self._create(admin)
+        else:
+            self._incr('reused')
+        self.fill(admin)
+        return credentials_set
+
+    def _is_clean(self, credentials, net_resources):
+        """Whether the tests left nothing behind in the tenant of a set"""
+        with self._lock:
+            roles = self._roles.get(credentials.user_id)
+        return (roles == self._get_roles(credentials) and
+                self._is_compute_clean(credentials) and
+                self._is_volume_clean(credentials) and
+                self._is_network_clean(credentials, net_resources))
+
+    def _is_compute_clean(self, credentials):
+        if not CONF.service_available.nova:
+            return True
+        _, body = self.admin_manager.servers_client.list_servers(
+            {'all_tenants': 1, 'tenant_id': credentials.tenant_id})
+        if body['servers']:
+            return False
+        # Key pairs belong to the user, only the user can list them
+        user_manager = clients.Manager(credentials=credentials,
+                                       interface=self._creator.interface)
+        _, keypairs = user_manager.keypairs_client.list_keypairs()
+        return not keypairs
+
+    def _is_volume_clean(self, credentials):
+        if not CONF.service_available.cinder:
+            return True
+        tenant_id = credentials.tenant_id
+        volumes_client = self.admin_manager.volumes_client
+        _, volumes = volumes_client.list_volumes_with_detail(
+            {'all_tenants': 1})
+        if any(volume.get('os-vol-tenant-attr:tenant_id') == tenant_id
+               for volume in volumes):
+            return False
+        snapshots_client = self.admin_manager.snapshots_client
+        _, snapshots = snapshots_client.list_snapshots_with_detail(
+            {'all_tenants': 1})
+        return not any(
+            snapshot.get('os-extended-snapshot-attributes:project_id') ==
+            tenant_id for snapshot in snapshots)
+
+    def _is_network_clean(self, credentials, net_resources):
+        if net_resources is None:
+            return True
+        client = self._creator.network_admin_client
+        tenant_id = credentials.tenant_id
+        try:
+            client.show_network(net_resources[0]['id'])
+        except exceptions.NotFound:
+            return False
+        _, body = client.list_ports(tenant_id=tenant_id)
+        if any(port['device_owner'] not in NETWORK_PORT_OWNERS
+               for port in body['ports']):
+            return False
+        _, body = client.list_floatingips(tenant_id=tenant_id)
+        if body['floatingips']:
+            return False
+        _, body = client.list_security_groups(tenant_id=tenant_id)
+        return all(security_group['name'] == 'default'
+                   for security_group in body['security_groups'])
+
+    def _reset_quotas(self, tenant_id):
+        """Puts back the default quotas, in case the tests changed them"""
+        if CONF.service_available.nova:
+            self.admin_manager.quotas_client.delete_quota_set(tenant_id)
+        if CONF.service_available.cinder:
+            self.admin_manager.volume_quotas_client.delete_quota_set(
+                tenant_id)
+
+    def _recycle(self, admin, credentials, net_resources):
+        try:
+            # In case the test changed it, and before checking as the user
+            self._creator.identity_admin_client.update_user_password(
+                credentials.user_id, self._creator.password)
+            clean = self._is_clean(credentials, net_resources)
+            if clean:
+                self._reset_quotas(credentials.tenant_id)
+        except Exception:
+            LOG.exception("Failed to check the pooled credentials %s" %
+                          credentials)
+            clean = False
+        if clean:
+            self._put(admin, (credentials, net_resources))
+        else:
+            LOG.info("Deleting the pooled credentials %s, not clean" %
+                     credentials)
+            self._delete(credentials, net_resources)
+
+    def release(self, credentials, net_resources, admin=False):
+        """Gives back a set, recycled in the background"""
+        self._executor.submit(self._recycle, admin, credentials,
+                              net_resources)
+
+    def delete_all(self):
+        """Waits for the background jobs and deletes all the pooled sets"""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            credentials_sets = self._idle[False] + self._idle[True]
+            self._idle = {False: [], True: []}
+        executor = async_client.Executor(
+            CONF.auth.isolated_creds_pool_workers)
+        async_client.gather([executor.submit(self._delete, *credentials_set)
+                             for credentials_set in credentials_sets])
+        executor.shutdown()
+        LOG.info("Isolated credentials pool: %s" % self)
+
+    def __str__(self):
+        with self._lock:
+            return ("created: %d, reused: %d, misses: %d, deleted: %d" %
+                    (self.created, self.reused, self.misses, self.deleted))
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_credential_pool(interface='json'):
+    """Returns the credential pool of this process for the interface"""
+    with _pools_lock:
+        if interface not in _pools:
+            pool = CredentialPool(CONF.auth.isolated_creds_pool_size,
+                                  interface=interface)
+            atexit.register(pool.delete_all)
+            pool.fill()
+            _pools[interface] = pool
+        return _pools[interface]
+
+
+class PooledIsolatedCreds(isolated_creds.IsolatedCreds):
+    """Isolated credentials taken from the credential pool
+
+    Test classes asking for specific network resources or password get
+    their own credentials, as with IsolatedCreds.
+    """
+
+    def __init__(self, name, interface='json', password='pass',
+                 network_resources=None):
+        super(PooledIsolatedCreds, self).__init__(name, interface, password,
+                                                  network_resources)
+        self._pool = None
+        if network_resources is None:
+            pool = get_credential_pool(interface)
+            if pool.password == password:
+                self._pool = pool
+        self._pooled = set()
+
+    def get_credentials(self, credential_type):
+        if self._pool is None or self.isolated_creds.get(credential_type):
+            return super(PooledIsolatedCreds, self).get_credentials(
+                credential_type)
+        credentials, net_resources = self._pool.acquire(
+            admin=(credential_type == 'admin'))
+        self.isolated_creds[credential_type] = credentials
+        if net_resources is not None:
+            self.isolated_net_resources[credential_type] = net_resources
+        self._pooled.add(credential_type)
+        LOG.info("Acquired pooled isolated creds:\n credentials: %s"
+                 % credentials)
+        return credentials
+
+    def prepare_credentials(self, credential_types):
+        if self._pool is None:
+            return super(PooledIsolatedCreds, self).prepare_credentials(
+                credential_types)
+        # Pooled credentials are provisioned in advance already
+        for credential_type in credential_types:
+            self.get_credentials(credential_type)
+
+    def clear_isolated_creds(self):
+        for credential_type in self._pooled:
+            self._pool.release(
+                self.isolated_creds.pop(credential_type),
+                self.isolated_net_resources.pop(credential_type, None),
+                admin=(credential_type == 'admin'))
+        self._pooled = set()
+        super(PooledIsolatedCreds, self).clear_isolated_creds()
@@ -12,6 +12,7 @@
 #    limitations under the License.
 
 from tempest.common import accounts
+from tempest.common import cred_pool
 from tempest.common import isolated_creds
 from tempest import config
 
@@ -28,6 +29,10 @@ def get_isolated_credentials(name, network_resources=None,
     # In case admin credentials are not available for the account creation,
     # the test should be skipped else it would fail.
     if CONF.auth.allow_tenant_isolation or force_tenant_isolation:
+        if CONF.auth.isolated_creds_pool_size > 0:
+            return cred_pool.PooledIsolatedCreds(
+                name=name,
+                network_resources=network_resources)
         return isolated_creds.IsolatedCreds(
             name=name,
             network_resources=network_resources)
@@ -0,0 +1,132 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from tempest import config
+from tempest.openstack.common import lockutils
+from tempest.openstack.common import log as logging
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Services of test.is_extension_enabled -> services of verify-tempest-config
+EXTENSION_SERVICES = {
+    'compute': 'nova',
+    'compute_v3': 'nova_v3',
+    'volume': 'cinder',
+    'network': 'neutron',
+    'object': 'swift',
+}
+
+
+class DiscoveryCache(object):
+    """API versions and extensions discovered on a cloud
+
+    The discovery results are stored in a JSON file, with an entry per
+    identity endpoint holding the key of the service catalog they were
+    discovered with and the time of the discovery. An entry is only
+    returned until it is ttl seconds old, and, when a catalog key is
+    given, if the catalog did not change.
+    """
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or CONF.discovery.cache_file or os.path.join(
+            CONF.lock_path, 'discovery_cache.json')
+        self.ttl = CONF.discovery.cache_ttl if ttl is None else ttl
+
+    @staticmethod
+    def get_catalog_key(endpoints):
+        """Returns the key of a catalog from its list of endpoints"""
+        endpoints = sorted(endpoints, key=lambda endpoint: endpoint.get('id'))
+        return hashlib.sha256(json.dumps(endpoints,
+                                         sort_keys=True)).hexdigest()
+
+    @staticmethod
+    def get_identity_key():
+        return '%s|%s' % (CONF.identity.uri, CONF.identity.region)
+
+    def _read(self):
+        try:
+            with open(self.path) as cache_file:
+                return json.load(cache_file)
+        except (IOError, ValueError):
+            return {}
+
+    def get(self, identity_key, catalog_key=None):
+        """Returns the discovery results, or None if missing or stale"""
+        if self.ttl <= 0:
+            return None
+        entry = self._read().get(identity_key)
+        if entry is None or time.time() - entry['time'] > self.ttl:
+            return None
+        if catalog_key is not None and entry['catalog'] != catalog_key:
+            return None
+        return entry['discovery']
+
+    def set(self, identity_key, catalog_key, discovery):
+        if self.ttl <= 0:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with lockutils.lock('discovery-cache', external=True):
+            entries = self._read()
+            entries[identity_key] = {'catalog': catalog_key,
+                                     'time': time.time(),
+                                     'discovery': discovery}
+            tmp_path = '%s.%d' % (self.path, os.getpid())
+            with open(tmp_path, 'w') as cache_file:
+                json.dump(entries, cache_file)
+            # Readers never see a partially written file
+            os.rename(tmp_path, self.path)
+
+
+_discovery_cache = None
+_discovery_cache_lock = threading.Lock()
+_discovered_extensions = None
+_discovered_extensions_lock = threading.Lock()
+
+
+def get_discovery_cache():
+    """Returns the discovery cache of this process"""
+    global _discovery_cache
+    with _discovery_cache_lock:
+        if _discovery_cache is None:
+            _discovery_cache = DiscoveryCache()
+        return _discovery_cache
+
+
+def get_discovered_extensions(service):
+    """Returns the cached extensions of a service, or None
+
+    :param service: service as named by test.is_extension_enabled
+    """
+    global _discovered_extensions
+    with _discovered_extensions_lock:
+        if _discovered_extensions is None:
+            # Read once per process, the tests don't change the cloud
+            discovery = None
+            try:
+                discovery = get_discovery_cache().get(
+                    DiscoveryCache.get_identity_key())
+            except Exception:
+                LOG.exception("Failed to read the discovery cache")
+            _discovered_extensions = (discovery or {}).get('extensions', {})
+    return _discovered_extensions.get(EXTENSION_SERVICES.get(service))
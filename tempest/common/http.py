@@ -14,12 +14,178 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import threading
+import time
+import urlparse
+
 import httplib2
 
 
 class ClosingHttp(httplib2.Http):
+    """httplib2.Http which closes the connection after each request
+
+    Connection objects are kept per thread, so that an instance can be
+    shared by concurrent requests.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._local = threading.local()
+        super(ClosingHttp, self).__init__(*args, **kwargs)
+
+    @property
+    def connections(self):
+        if not hasattr(self._local, 'connections'):
+            self._local.connections = {}
+        return self._local.connections
+
+    @connections.setter
+    def connections(self, value):
+        self._local.connections = value
+
     def request(self, *args, **kwargs):
         original_headers = kwargs.get('headers', {})
         new_headers = dict(original_headers, connection='close')
         new_kwargs = dict(kwargs, headers=new_headers)
         return super(ClosingHttp, self).request(*args, **new_kwargs)
+
+
+class ConnectionStats(object):
+    """Thread-safe counters shared by the connections of a pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.reused = 0
+        self.connections = 0
+        self.expired = 0
+        self.handshake_time = 0.0
+
+    def incr(self, name, value=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self):
+        with self._lock:
+            return dict(requests=self.requests, reused=self.reused,
+                        connections=self.connections, expired=self.expired,
+                        handshake_time=self.handshake_time)
+
+    def __str__(self):
+        return ("requests: %(requests)d, reused: %(reused)d, "
+                "connections: %(connections)d, expired: %(expired)d, "
+                "handshake time: %(handshake_time).3fs" % self.to_dict())
+
+
+# Counters of all the pools of the managers, reported at the end of a run
+pool_stats = ConnectionStats()
+
+
+class KeepAliveHttp(httplib2.Http):
+    """httplib2.Http which keeps its connections open between requests
+
+    Connect and TLS handshake time of new connections and the number of
+    requests sent on an already open connection are recorded in ``stats``.
+    """
+
+    def __init__(self, stats=None, *args, **kwargs):
+        super(KeepAliveHttp, self).__init__(*args, **kwargs)
+        self.stats = stats or ConnectionStats()
+        self.last_used = time.time()
+
+    def _conn_request(self, conn, request_uri, method, body, headers):
+        self.stats.incr('requests')
+        if getattr(conn, 'sock', None) is None:
+            start = time.time()
+            try:
+                conn.connect()
+            except Exception:
+                # NOTE: let httplib2 retry the connection, so that errors
+                # are translated the same way as for any other request
+                conn.close()
+            else:
+                self.stats.incr('connections')
+                self.stats.incr('handshake_time', time.time() - start)
+        else:
+            self.stats.incr('reused')
+        return super(KeepAliveHttp, self)._conn_request(
+            conn, request_uri, method, body, headers)
+
+    def close(self):
+        for conn in self.connections.values():
+            conn.close()
+        self.connections.clear()
+
+
+class HttpConnectionPool(object):
+    """Thread-safe pool of keep-alive connections
+
+    It exposes the same request() interface as httplib2.Http, so it can be
+    used as the http_obj of any RestClient. Idle connections are kept per
+    endpoint (scheme and network location), at most ``pool_size`` of them,
+    and are closed once unused for more than ``idle_timeout`` seconds.
+    A connection is used by one request at a time, so concurrent requests
+    to the same endpoint open additional connections.
+    """
+
+    def __init__(self, pool_size=10, idle_timeout=60,
+                 disable_ssl_certificate_validation=False, stats=None):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.dscv = disable_ssl_certificate_validation
+        self.stats = stats or ConnectionStats()
+        self._idle = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _acquire(self, endpoint):
+        now = time.time()
+        expired = []
+        http_obj = None
+        with self._lock:
+            idle = self._idle[endpoint]
+            while idle:
+                candidate = idle.pop()
+                if now - candidate.last_used > self.idle_timeout:
+                    expired.append(candidate)
+                else:
+                    http_obj = candidate
+                    break
+        for candidate in expired:
+            self.stats.incr('expired')
+            candidate.close()
+        if http_obj is None:
+            http_obj = KeepAliveHttp(
+                stats=self.stats,
+                disable_ssl_certificate_validation=self.dscv)
+        return http_obj
+
+    def _release(self, endpoint, http_obj):
+        http_obj.last_used = time.time()
+        with self._lock:
+            idle = self._idle[endpoint]
+            if len(idle) < self.pool_size:
+                idle.append(http_obj)
+                return
+        http_obj.close()
+
+    def request(self, uri, method='GET', body=None, headers=None,
+                *args, **kwargs):
+        parts = urlparse.urlsplit(uri)
+        endpoint = (parts.scheme, parts.netloc)
+        http_obj = self._acquire(endpoint)
+        try:
+            resp, resp_body = http_obj.request(uri, method, body, headers,
+                                               *args, **kwargs)
+        except Exception:
+            # The connection state is unknown, do not hand it out again
+            http_obj.close()
+            raise
+        self._release(endpoint, http_obj)
+        return resp, resp_body
+
+    def close(self):
+        with self._lock:
+            idle = [h for pool in self._idle.values() for h in pool]
+            self._idle.clear()
+        for http_obj in idle:
+            http_obj.close()
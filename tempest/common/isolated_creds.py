@@ -12,20 +12,95 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 import netaddr
 
 from tempest import auth
 from tempest import clients
 from tempest.common import cred_provider
 from tempest.common.utils import data_utils
+from tempest.common.utils import misc
 from tempest import config
 from tempest import exceptions
+from tempest.openstack.common import excutils
 from tempest.openstack.common import log as logging
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+class CidrIndex(object):
+    """Subnet CIDRs in use, from which the isolated subnets are allocated
+
+    The CIDRs of the existing subnets are listed once, then the CIDRs are
+    allocated from the free ones of tenant_network_cidr and tracked locally.
+    The index is refreshed only when another process took a CIDR meanwhile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_use = None
+
+    @staticmethod
+    def _list_cidrs(client):
+        _, body = client.list_subnets(fields='cidr')
+        return netaddr.IPSet(subnet['cidr'] for subnet in body['subnets'])
+
+    def allocate(self, client, count=1):
+        """Returns count free CIDRs, marked as in use"""
+        base_cidr = netaddr.IPNetwork(CONF.network.tenant_network_cidr)
+        mask_bits = CONF.network.tenant_network_mask_bits
+        with self._lock:
+            if self._in_use is None:
+                self._in_use = self._list_cidrs(client)
+            cidrs = []
+            for cidr in base_cidr.subnet(mask_bits):
+                if self._in_use.isdisjoint(netaddr.IPSet([cidr])):
+                    cidrs.append(cidr)
+                    if len(cidrs) == count:
+                        break
+            else:
+                e = exceptions.BuildErrorException()
+                e.message = ('Available CIDR for subnet creation could not '
+                             'be found')
+                raise e
+            for cidr in cidrs:
+                self._in_use.add(cidr)
+            return cidrs
+
+    def release(self, cidrs):
+        with self._lock:
+            if self._in_use is not None:
+                for cidr in cidrs:
+                    self._in_use.remove(cidr)
+
+    def refresh(self, client, conflicting=()):
+        """Reloads the CIDRs in use after a conflict with another process
+
+        The conflicting CIDRs are kept as in use, so that they are not
+        allocated again even if the conflict could not be listed.
+        """
+        in_use = self._list_cidrs(client)
+        for cidr in conflicting:
+            in_use.add(cidr)
+        with self._lock:
+            self._in_use = in_use
+
+
+_cidr_index = None
+_cidr_index_lock = threading.Lock()
+
+
+def get_cidr_index():
+    """Returns the CIDR index of this process"""
+    global _cidr_index
+    with _cidr_index_lock:
+        if _cidr_index is None:
+            _cidr_index = CidrIndex()
+        return _cidr_index
+
+
 class IsolatedCreds(cred_provider.CredentialProvider):
 
     def __init__(self, name, interface='json', password='pass',
@@ -132,11 +207,7 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             tenant_name=tenant['name'], tenant_id=tenant['id'],
             password=self.password)
 
-    def _create_network_resources(self, tenant_id):
-        network = None
-        subnet = None
-        router = None
-        # Make sure settings
+    def _check_network_resources(self):
         if self.network_resources:
             if self.network_resources['router']:
                 if (not self.network_resources['subnet'] or
@@ -150,63 +221,93 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             elif self.network_resources['dhcp']:
                 raise exceptions.InvalidConfiguration('DHCP requires a subnet')
 
-        data_utils.rand_name_root = data_utils.rand_name(self.name)
+    def _create_network_resources(self, tenant_id):
+        return self._create_tenants_network_resources([tenant_id])[0]
+
+    def _create_tenants_network_resources(self, tenant_ids):
+        """Creates the network resources of several tenants at once
+
+        The networks and the subnets are created with a bulk request each
+        and the routers concurrently. Returns a (network, subnet, router)
+        tuple for each tenant.
+        """
+        self._check_network_resources()
+        networks = subnets = routers = [None] * len(tenant_ids)
+        rand_name_roots = [data_utils.rand_name(self.name)
+                           for _ in tenant_ids]
         if not self.network_resources or self.network_resources['network']:
-            network_name = data_utils.rand_name_root + "-network"
-            network = self._create_network(network_name, tenant_id)
+            networks = self._create_networks(
+                [root + "-network" for root in rand_name_roots], tenant_ids)
         try:
             if not self.network_resources or self.network_resources['subnet']:
-                subnet_name = data_utils.rand_name_root + "-subnet"
-                subnet = self._create_subnet(subnet_name, tenant_id,
-                                             network['id'])
+                subnets = self._create_subnets(
+                    [root + "-subnet" for root in rand_name_roots],
+                    tenant_ids, [network['id'] for network in networks])
             if not self.network_resources or self.network_resources['router']:
-                router_name = data_utils.rand_name_root + "-router"
-                router = self._create_router(router_name, tenant_id)
-                self._add_router_interface(router['id'], subnet['id'])
+                results = misc.run_concurrently(
+                    self._create_router_with_interface,
+                    zip([root + "-router" for root in rand_name_roots],
+                        tenant_ids, subnets),
+                    raise_on_error=False)
+                routers = [None if isinstance(result, Exception) else result
+                           for result in results]
+                for result in results:
+                    if isinstance(result, Exception):
+                        raise result
         except Exception:
-            if router:
-                self._clear_isolated_router(router['id'], router['name'])
-            if subnet:
-                self._clear_isolated_subnet(subnet['id'], subnet['name'])
-            if network:
-                self._clear_isolated_network(network['id'], network['name'])
-            raise
-        return network, subnet, router
+            with excutils.save_and_reraise_exception():
+                misc.run_concurrently(
+                    lambda resources: self._clear_created_net_resources(
+                        *resources),
+                    zip(networks, subnets, routers), raise_on_error=False)
+        return zip(networks, subnets, routers)
 
     def _create_network(self, name, tenant_id):
         _, resp_body = self.network_admin_client.create_network(
             name=name, tenant_id=tenant_id)
         return resp_body['network']
 
+    def _create_networks(self, names, tenant_ids):
+        if len(names) == 1:
+            return [self._create_network(names[0], tenant_ids[0])]
+        _, resp_body = self.network_admin_client.create_bulk_network(
+            names, tenant_ids=tenant_ids)
+        return resp_body['networks']
+
     def _create_subnet(self, subnet_name, tenant_id, network_id):
-        base_cidr = netaddr.IPNetwork(CONF.network.tenant_network_cidr)
-        mask_bits = CONF.network.tenant_network_mask_bits
-        for subnet_cidr in base_cidr.subnet(mask_bits):
-            try:
+        return self._create_subnets([subnet_name], [tenant_id],
+                                    [network_id])[0]
+
+    def _create_subnets(self, subnet_names, tenant_ids, network_ids):
+        cidr_index = get_cidr_index()
+        client = self.network_admin_client
+        while True:
+            cidrs = cidr_index.allocate(client, len(subnet_names))
+            subnet_list = []
+            for name, tenant_id, network_id, cidr in zip(
+                    subnet_names, tenant_ids, network_ids, cidrs):
+                subnet = dict(network_id=network_id, cidr=str(cidr),
+                              name=name, tenant_id=tenant_id, ip_version=4)
                 if self.network_resources:
-                    _, resp_body = self.network_admin_client.\
-                        create_subnet(
-                            network_id=network_id, cidr=str(subnet_cidr),
-                            name=subnet_name,
-                            tenant_id=tenant_id,
-                            enable_dhcp=self.network_resources['dhcp'],
-                            ip_version=4)
-                else:
-                    _, resp_body = self.network_admin_client.\
-                        create_subnet(network_id=network_id,
-                                      cidr=str(subnet_cidr),
-                                      name=subnet_name,
-                                      tenant_id=tenant_id,
-                                      ip_version=4)
-                break
+                    subnet['enable_dhcp'] = self.network_resources['dhcp']
+                subnet_list.append(subnet)
+            try:
+                if len(subnet_list) == 1:
+                    _, resp_body = client.create_subnet(**subnet_list[0])
+                    return [resp_body['subnet']]
+                _, resp_body = client.create_bulk_subnet(subnet_list)
+                return resp_body['subnets']
             except exceptions.BadRequest as e:
                 if 'overlaps with another subnet' not in str(e):
+                    cidr_index.release(cidrs)
                     raise
-        else:
-            e = exceptions.BuildErrorException()
-            e.message = 'Available CIDR for subnet creation could not be found'
-            raise e
-        return resp_body['subnet']
+                # Taken meanwhile by another process
+                LOG.debug("CIDR conflict on %s, refreshing the CIDR index" %
+                          [str(cidr) for cidr in cidrs])
+                cidr_index.refresh(client, conflicting=cidrs)
+            except Exception:
+                with excutils.save_and_reraise_exception():
+                    cidr_index.release(cidrs)
 
     def _create_router(self, router_name, tenant_id):
         external_net_id = dict(
@@ -221,6 +322,16 @@ class IsolatedCreds(cred_provider.CredentialProvider):
         self.network_admin_client.add_router_interface_with_subnet_id(
             router_id, subnet_id)
 
+    def _create_router_with_interface(self, router_args):
+        router_name, tenant_id, subnet = router_args
+        router = self._create_router(router_name, tenant_id)
+        try:
+            self._add_router_interface(router['id'], subnet['id'])
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                self._clear_isolated_router(router['id'], router['name'])
+        return router
+
     def get_primary_network(self):
         return self.isolated_net_resources.get('primary')[0]
 
@@ -248,26 +359,52 @@ class IsolatedCreds(cred_provider.CredentialProvider):
     def get_alt_router(self):
         return self.isolated_net_resources.get('alt')[2]
 
-    def get_credentials(self, credential_type):
-        if self.isolated_creds.get(credential_type):
-            credentials = self.isolated_creds[credential_type]
-        else:
-            is_admin = (credential_type == 'admin')
-            credentials = self._create_creds(admin=is_admin)
-            self.isolated_creds[credential_type] = credentials
-            # Maintained until tests are ported
-            LOG.info("Acquired isolated creds:\n credentials: %s"
-                     % credentials)
-            if (CONF.service_available.neutron and
-                not CONF.baremetal.driver_enabled):
-                network, subnet, router = self._create_network_resources(
-                    credentials.tenant_id)
-                self.isolated_net_resources[credential_type] = (
-                    network, subnet, router,)
-                LOG.info("Created isolated network resources for : \n"
-                         + " credentials: %s" % credentials)
+    def _needs_network_resources(self):
+        return (CONF.service_available.neutron and
+                not CONF.baremetal.driver_enabled)
+
+    def _create_credential_type(self, credential_type):
+        is_admin = (credential_type == 'admin')
+        credentials = self._create_creds(admin=is_admin)
+        self.isolated_creds[credential_type] = credentials
+        # Maintained until tests are ported
+        LOG.info("Acquired isolated creds:\n credentials: %s"
+                 % credentials)
         return credentials
 
+    def _create_credential_types(self, credential_types):
+        credentials = misc.run_concurrently(self._create_credential_type,
+                                            credential_types)
+        if not self._needs_network_resources():
+            return
+        net_resources = self._create_tenants_network_resources(
+            [creds.tenant_id for creds in credentials])
+        for credential_type, creds, resources in zip(
+                credential_types, credentials, net_resources):
+            self.isolated_net_resources[credential_type] = resources
+            LOG.info("Created isolated network resources for : \n"
+                     + " credentials: %s" % creds)
+
+    def prepare_credentials(self, credential_types):
+        """Creates at once the missing credentials of the given types
+
+        The users and tenants are created concurrently and their network
+        resources together, which is faster than getting each type of
+        credentials in turn.
+        """
+        missing = []
+        for credential_type in credential_types:
+            if (not self.isolated_creds.get(credential_type) and
+                    credential_type not in missing):
+                missing.append(credential_type)
+        if missing:
+            self._create_credential_types(missing)
+
+    def get_credentials(self, credential_type):
+        if not self.isolated_creds.get(credential_type):
+            self._create_credential_types([credential_type])
+        return self.isolated_creds[credential_type]
+
     def get_primary_creds(self):
         return self.get_credentials('primary')
 
@@ -285,13 +422,15 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             LOG.warn('router with name: %s not found for delete' %
                      router_name)
 
-    def _clear_isolated_subnet(self, subnet_id, subnet_name):
+    def _clear_isolated_subnet(self, subnet_id, subnet_name, cidr=None):
         net_client = self.network_admin_client
         try:
             net_client.delete_subnet(subnet_id)
         except exceptions.NotFound:
             LOG.warn('subnet with name: %s not found for delete' %
                      subnet_name)
+        if cidr is not None:
+            get_cidr_index().release([netaddr.IPNetwork(cidr)])
 
     def _clear_isolated_network(self, network_id, network_name):
         net_client = self.network_admin_client
@@ -313,44 +452,60 @@ class IsolatedCreds(cred_provider.CredentialProvider):
                 LOG.warn('Security group %s, id %s not found for clean-up' %
                          (secgroup['name'], secgroup['id']))
 
-    def _clear_isolated_net_resources(self):
+    def _clear_created_net_resources(self, network, subnet, router):
+        if router:
+            self._clear_isolated_router(router['id'], router['name'])
+        if subnet:
+            self._clear_isolated_subnet(subnet['id'], subnet['name'],
+                                        subnet.get('cidr'))
+        if network:
+            self._clear_isolated_network(network['id'], network['name'])
+
+    def _clear_net_resources(self, network, subnet, router):
         net_client = self.network_admin_client
-        for cred in self.isolated_net_resources:
-            network, subnet, router = self.isolated_net_resources.get(cred)
-            LOG.debug("Clearing network: %(network)s, "
-                      "subnet: %(subnet)s, router: %(router)s",
-                      {'network': network, 'subnet': subnet, 'router': router})
-            if (not self.network_resources or
-                self.network_resources.get('router')):
-                try:
-                    net_client.remove_router_interface_with_subnet_id(
-                        router['id'], subnet['id'])
-                except exceptions.NotFound:
-                    LOG.warn('router with name: %s not found for delete' %
-                             router['name'])
-                self._clear_isolated_router(router['id'], router['name'])
-            if (not self.network_resources or
-                self.network_resources.get('subnet')):
-                self._clear_isolated_subnet(subnet['id'], subnet['name'])
-            if (not self.network_resources or
-                self.network_resources.get('network')):
-                self._clear_isolated_network(network['id'], network['name'])
+        LOG.debug("Clearing network: %(network)s, "
+                  "subnet: %(subnet)s, router: %(router)s",
+                  {'network': network, 'subnet': subnet, 'router': router})
+        if (not self.network_resources or
+            self.network_resources.get('router')):
+            try:
+                net_client.remove_router_interface_with_subnet_id(
+                    router['id'], subnet['id'])
+            except exceptions.NotFound:
+                LOG.warn('router with name: %s not found for delete' %
+                         router['name'])
+            self._clear_isolated_router(router['id'], router['name'])
+        if (not self.network_resources or
+            self.network_resources.get('subnet')):
+            self._clear_isolated_subnet(subnet['id'], subnet['name'],
+                                        subnet.get('cidr'))
+        if (not self.network_resources or
+            self.network_resources.get('network')):
+            self._clear_isolated_network(network['id'], network['name'])
+
+    def _clear_isolated_net_resources(self):
+        misc.run_concurrently(
+            lambda resources: self._clear_net_resources(*resources),
+            self.isolated_net_resources.values())
+
+    def _clear_creds(self, creds):
+        try:
+            self._delete_user(creds.user_id)
+        except exceptions.NotFound:
+            LOG.warn("user with name: %s not found for delete" %
+                     creds.username)
+        try:
+            self._delete_tenant(creds.tenant_id)
+        except exceptions.NotFound:
+            LOG.warn("tenant with name: %s not found for delete" %
+                     creds.tenant_name)
 
     def clear_isolated_creds(self):
         if not self.isolated_creds:
             return
         self._clear_isolated_net_resources()
-        for creds in self.isolated_creds.itervalues():
-            try:
-                self._delete_user(creds.user_id)
-            except exceptions.NotFound:
-                LOG.warn("user with name: %s not found for delete" %
-                         creds.username)
-            try:
-                self._delete_tenant(creds.tenant_id)
-            except exceptions.NotFound:
-                LOG.warn("tenant with name: %s not found for delete" %
-                         creds.tenant_name)
+        misc.run_concurrently(self._clear_creds,
+                              self.isolated_creds.values())
 
     def is_multi_user(self):
         return True
@@ -0,0 +1,166 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Polling engine of the waiters.
+
+A waiter creates a Poller for each wait and calls its sleep method between
+two polls of the resource status:
+
+    poller = polling.Poller(client.build_interval, client.build_timeout,
+                            'image', status)
+    while image['status'] != status:
+        poller.sleep()
+        resp, image = client.get_image(image_id)
+        if poller.timed_out():
+            poller.done(success=False)
+            raise exceptions.TimeoutException(...)
+    poller.done()
+
+With [polling] adaptive enabled, the first poll comes after
+initial_interval and the interval then grows with backoff_factor, with
+some jitter, up to max_interval. With learn_transition_times enabled, the
+time taken by the previous waits for the same resource type and status is
+used to poll less before the resource is expected to be ready. Otherwise
+the resource is polled every interval.
+"""
+
+import random
+import threading
+import time
+
+from tempest import config
+
+CONF = config.CONF
+
+
+class WaitStats(object):
+    """Wait times, polls and timeouts by resource type and status"""
+
+    # Weight of the last wait in the learned transition time
+    smoothing = 0.3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (resource type, status) -> [waits, timeouts, polls, total time]
+        self._waits = {}
+        # (resource type, status) -> learned transition time
+        self._transition_times = {}
+
+    def record(self, resource_type, status, elapsed, polls, success=True):
+        key = (resource_type, status)
+        with self._lock:
+            waits = self._waits.setdefault(key, [0, 0, 0, 0.0])
+            waits[0] += 1
+            waits[2] += polls
+            waits[3] += elapsed
+            if not success:
+                waits[1] += 1
+                return
+            learned = self._transition_times.get(key)
+            if learned is None:
+                self._transition_times[key] = elapsed
+            else:
+                self._transition_times[key] = (
+                    self.smoothing * elapsed + (1 - self.smoothing) * learned)
+
+    def transition_time(self, resource_type, status):
+        """Returns the learned time to reach status, or None"""
+        with self._lock:
+            return self._transition_times.get((resource_type, status))
+
+    def to_dict(self):
+        with self._lock:
+            return dict(('%s:%s' % key, {'waits': waits,
+                                         'timeouts': timeouts,
+                                         'polls': polls,
+                                         'time': total_time})
+                        for key, (waits, timeouts, polls, total_time)
+                        in self._waits.items())
+
+    def __str__(self):
+        return ', '.join(
+            '%s: %d waits (%d timed out), %d polls, %.1f s' % (
+                key, stats['waits'], stats['timeouts'], stats['polls'],
+                stats['time'])
+            for key, stats in sorted(self.to_dict().items()))
+
+
+wait_stats = WaitStats()
+
+
+class Poller(object):
+    """Paces the polls of a single wait
+
+    :param interval: polling interval when adaptive polling is disabled,
+                     usually the build_interval of the client
+    :param timeout: time in seconds after which the wait times out
+    :param resource_type: type of the resource waited on, for the metrics
+                          and the learned transition times
+    :param status: status waited for
+    """
+
+    def __init__(self, interval, timeout, resource_type='resource',
+                 status=None):
+        self.interval = interval
+        self.timeout = timeout
+        self.resource_type = resource_type
+        self.status = status
+        self.polls = 0
+        self.start_time = time.time()
+        self._next_interval = CONF.polling.initial_interval
+        self._expected = None
+        if CONF.polling.adaptive and CONF.polling.learn_transition_times:
+            self._expected = wait_stats.transition_time(resource_type,
+                                                        status)
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def timed_out(self):
+        return self.elapsed() >= self.timeout
+
+    def next_interval(self):
+        """Returns the time to wait before the next poll"""
+        if not CONF.polling.adaptive:
+            return self.interval
+        interval = self._next_interval
+        self._next_interval = min(interval * CONF.polling.backoff_factor,
+                                  CONF.polling.max_interval)
+        if self._expected is not None:
+            # Not worth polling before the resource is expected to be ready
+            remaining = self._expected - self.elapsed()
+            if remaining > interval:
+                interval = min(remaining, CONF.polling.max_interval)
+            elif remaining < 0:
+                # Later than usual: poll at the initial pace again
+                self._expected = None
+                interval = CONF.polling.initial_interval
+                self._next_interval = min(
+                    interval * CONF.polling.backoff_factor,
+                    CONF.polling.max_interval)
+        jitter = interval * CONF.polling.jitter
+        interval += random.uniform(-jitter, jitter)
+        # No point in sleeping past the timeout
+        return max(0, min(interval, self.timeout - self.elapsed()))
+
+    def sleep(self):
+        time.sleep(self.next_interval())
+        self.polls += 1
+
+    def done(self, success=True):
+        """Records the end of the wait in the wait metrics"""
+        wait_stats.record(self.resource_type, self.status, self.elapsed(),
+                          self.polls, success)
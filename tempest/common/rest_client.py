@@ -17,7 +17,9 @@
 import collections
 import json
 import logging as real_logging
+import random
 import re
+import threading
 import time
 
 import jsonschema
@@ -25,6 +27,7 @@ from lxml import etree
 import six
 
 from tempest.common import http
+from tempest.common import polling
 from tempest.common.utils import misc as misc_utils
 from tempest.common import xml_utils as common
 from tempest import config
@@ -41,6 +44,31 @@ TOKEN_CHARS_RE = re.compile('^[-A-Za-z0-9+/=]*$')
 HTTP_SUCCESS = (200, 201, 202, 203, 204, 205, 206)
 
 
+class ValidationStats(object):
+    """Counters of the response validations done by all the clients"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.validated = 0
+        self.skipped = 0
+        self.time = 0.0
+
+    def record(self, secs=None):
+        with self._lock:
+            if secs is None:
+                self.skipped += 1
+            else:
+                self.validated += 1
+                self.time += secs
+
+    def __str__(self):
+        with self._lock:
+            average = self.time / self.validated if self.validated else 0
+            return ("validated: %d, skipped: %d, time: %.3fs "
+                    "(%.6fs per response)" % (self.validated, self.skipped,
+                                              self.time, average))
+
+
 # convert a structure into a string safely
 def safe_body(body, maxlen=2048):
     try:
@@ -72,6 +100,10 @@ class RestClient(object):
 
     LOG = logging.getLogger(__name__)
 
+    # Validators of the response schemas, by schema id
+    _validators = {}
+    validation_stats = ValidationStats()
+
     def __init__(self, auth_provider):
         self.auth_provider = auth_provider
 
@@ -93,6 +125,8 @@ class RestClient(object):
         dscv = CONF.identity.disable_ssl_certificate_validation
         self.http_obj = http.ClosingHttp(
             disable_ssl_certificate_validation=dscv)
+        # Keep-alive connection pool, shared by the clients of a manager
+        self.http_pool = None
 
     def _get_type(self):
         return self.TYPE
@@ -116,6 +150,17 @@ class RestClient(object):
                              str(self.token)[0:STRING_LIMIT],
                              str(self.get_headers())[0:STRING_LIMIT])
 
+    def _get_http(self):
+        """
+        Returns the HTTP transport to be used for the requests of this client
+        """
+        if self.http_pool is None:
+            return self.http_obj
+        services = CONF.service_clients.http_keep_alive_services
+        if services and self.service not in services:
+            return self.http_obj
+        return self.http_pool
+
     def _get_region(self, service):
         """
         Returns the region for a specific service
@@ -407,7 +452,7 @@ class RestClient(object):
         # Do the actual request, and time it
         start = time.time()
         self._log_request_start(method, req_url)
-        resp, resp_body = self.http_obj.request(
+        resp, resp_body = self._get_http().request(
             req_url, method, headers=req_headers, body=req_body)
         end = time.time()
         self._log_request(method, req_url, resp, secs=(end - start),
@@ -453,6 +498,26 @@ class RestClient(object):
                             resp, resp_body)
         return resp, resp_body
 
+    def request_many(self, requests, raise_on_error=True):
+        """Runs several requests concurrently
+
+        Each request goes through request(), so retries on rate limiting
+        and the _error_checker apply to each of them as usual.
+
+        :param requests: list of (method, url, body) tuples
+        :param raise_on_error: if False, the exception raised for a request
+                               is returned in place of its (resp, body)
+        :returns: list of (resp, body), in the same order as the requests
+        """
+        def _request(req):
+            method, url, body = req
+            return self.request(method, url, body=body)
+
+        return misc_utils.run_concurrently(
+            _request, requests,
+            max_workers=CONF.service_clients.concurrent_requests,
+            raise_on_error=raise_on_error)
+
     def _error_checker(self, method, url,
                        headers, body, resp, resp_body):
 
@@ -565,11 +630,14 @@ class RestClient(object):
 
     def wait_for_resource_deletion(self, id):
         """Waits for a resource to be deleted."""
-        start_time = int(time.time())
+        poller = polling.Poller(self.build_interval, self.build_timeout,
+                                self.resource_type, 'DELETED')
         while True:
             if self.is_resource_deleted(id):
+                poller.done()
                 return
-            if int(time.time()) - start_time >= self.build_timeout:
+            if poller.timed_out():
+                poller.done(success=False)
                 message = ('Failed to delete %(resource_type)s %(id)s within '
                            'the required time (%(timeout)s s).' %
                            {'resource_type': self.resource_type, 'id': id,
@@ -578,7 +646,7 @@ class RestClient(object):
                 if caller:
                     message = '(%s) %s' % (caller, message)
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def is_resource_deleted(self, id):
         """
@@ -593,6 +661,32 @@ class RestClient(object):
         """Returns the primary type of resource this client works with."""
         return 'resource'
 
+    @classmethod
+    def _get_validator(cls, schema):
+        """
+        Returns a validator for the schema. It is built, and the schema is
+        checked against its meta-schema, only the first time.
+        """
+        cached = cls._validators.get(id(schema))
+        # NOTE: the schema is kept in the cache, so that its id can not be
+        # reused by another object
+        if cached is None or cached[0] is not schema:
+            validator_class = jsonschema.validators.validator_for(schema)
+            validator_class.check_schema(schema)
+            cached = (schema, validator_class(schema))
+            cls._validators[id(schema)] = cached
+        return cached[1]
+
+    @classmethod
+    def _skip_validation(cls):
+        mode = CONF.service_clients.response_validation
+        if mode == 'disabled':
+            return True
+        if mode == 'sampled':
+            rate = CONF.service_clients.response_validation_sample_rate
+            return random.random() >= rate
+        return False
+
     @classmethod
     def validate_response(cls, schema, resp, body):
         # Only check the response if the status code is a success code
@@ -602,12 +696,16 @@ class RestClient(object):
         # the response schema. For now we'll ignore it.
         if resp.status in HTTP_SUCCESS:
             cls.expected_success(schema['status_code'], resp.status)
+            if cls._skip_validation():
+                cls.validation_stats.record()
+                return
+            start = time.time()
 
             # Check the body of a response
             body_schema = schema.get('response_body')
             if body_schema:
                 try:
-                    jsonschema.validate(body, body_schema)
+                    cls._get_validator(body_schema).validate(body)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response body is invalid (%s)") % ex
                     raise exceptions.InvalidHTTPResponseBody(msg)
@@ -620,10 +718,11 @@ class RestClient(object):
             header_schema = schema.get('response_header')
             if header_schema:
                 try:
-                    jsonschema.validate(resp, header_schema)
+                    cls._get_validator(header_schema).validate(resp)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response header is invalid (%s)") % ex
                     raise exceptions.InvalidHTTPResponseHeader(msg)
+            cls.validation_stats.record(time.time() - start)
 
 
 class NegativeRestClient(RestClient):
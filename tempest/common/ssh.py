@@ -37,7 +37,8 @@ LOG = logging.getLogger(__name__)
 class Client(object):
 
     def __init__(self, host, username, password=None, timeout=300, pkey=None,
-                 channel_timeout=10, look_for_keys=False, key_filename=None):
+                 channel_timeout=10, look_for_keys=False, key_filename=None,
+                 keep_connection=False):
         self.host = host
         self.username = username
         self.password = password
@@ -50,6 +51,9 @@ class Client(object):
         self.timeout = int(timeout)
         self.channel_timeout = float(channel_timeout)
         self.buf_size = 1024
+        # With keep_connection, the commands share one connection
+        self.keep_connection = keep_connection
+        self._connection = None
 
     def _get_ssh_connection(self, sleep=1.5, backoff=1):
         """Returns an ssh connection to the specified host."""
@@ -97,6 +101,23 @@ class Client(object):
     def _is_timed_out(self, start_time):
         return (time.time() - self.timeout) > start_time
 
+    def _get_command_connection(self):
+        if not self.keep_connection:
+            return self._get_ssh_connection()
+        transport = None
+        if self._connection is not None:
+            transport = self._connection.get_transport()
+        if transport is None or not transport.is_active():
+            self.close()
+            self._connection = self._get_ssh_connection()
+        return self._connection
+
+    def close(self):
+        """Closes the connection kept between the commands, if any"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
     def exec_command(self, cmd):
         """
         Execute the specified command on the server.
@@ -108,7 +129,7 @@ class Client(object):
         :raises: SSHExecCommandFailed if command returns nonzero
                  status. The exception contains command status stderr content.
         """
-        ssh = self._get_ssh_connection()
+        ssh = self._get_command_connection()
         transport = ssh.get_transport()
         channel = transport.open_session()
         channel.fileno()  # Register event pipe
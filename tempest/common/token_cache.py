@@ -0,0 +1,146 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import json
+import os
+import threading
+
+from tempest import config
+from tempest.openstack.common import lockutils
+from tempest.openstack.common import log as logging
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+
+class TokenCache(object):
+    """Auth data store shared by all the test processes
+
+    Auth data is stored in one file per key in a directory under the lock
+    path, readable by the owner only. Fetching the auth data for a key is
+    serialized across processes, so that concurrent workers with the same
+    credentials authenticate only once.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CONF.lock_path, 'token_cache')
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    @staticmethod
+    def get_key(*args):
+        """Returns a cache key from the JSON serializable arguments"""
+        return hashlib.sha256(json.dumps(args, sort_keys=True)).hexdigest()
+
+    def _incr(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _read(self, key):
+        try:
+            with open(os.path.join(self.path, key)) as cache_file:
+                token, auth_data = json.load(cache_file)
+        except (IOError, ValueError):
+            return None
+        return token, auth_data
+
+    def _write(self, key, auth_data):
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path, 0o700)
+            except OSError:
+                # Created meanwhile by another process
+                if not os.path.isdir(self.path):
+                    raise
+        path = os.path.join(self.path, key)
+        tmp_path = '%s.%d.%s' % (path, os.getpid(),
+                                 threading.current_thread().ident)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump(list(auth_data), cache_file)
+        # Readers never see a partially written file
+        os.rename(tmp_path, path)
+
+    def _fetch(self, key, fetch, is_expired):
+        with lockutils.lock(key, 'token-cache-', external=True):
+            # Another process may have fetched it while we were waiting
+            auth_data = self._read(key)
+            if auth_data is not None and not is_expired(auth_data):
+                return auth_data, False
+            auth_data = fetch()
+            self._write(key, auth_data)
+            return auth_data, True
+
+    def _refresh(self, key, fetch, needs_refresh):
+        try:
+            # Skipped if refreshed meanwhile by another process
+            __, fetched = self._fetch(key, fetch, needs_refresh)
+            if fetched:
+                self._incr('refreshes')
+        except Exception:
+            LOG.exception("Failed to refresh the cached token %s" % key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _start_refresh(self, key, fetch, needs_refresh):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        thread = threading.Thread(target=self._refresh,
+                                  args=(key, fetch, needs_refresh))
+        thread.daemon = True
+        thread.start()
+
+    def get_auth(self, key, fetch, is_expired, needs_refresh=None):
+        """Returns the cached auth data for key, fetching it on a miss
+
+        :param fetch: callable which authenticates and returns the auth data
+        :param is_expired: callable telling whether auth data is expired
+        :param needs_refresh: callable telling whether auth data, still
+                              valid, should be refreshed in the background
+        """
+        auth_data = self._read(key)
+        if auth_data is None or is_expired(auth_data):
+            auth_data, fetched = self._fetch(key, fetch, is_expired)
+            self._incr('misses' if fetched else 'hits')
+            return auth_data
+        self._incr('hits')
+        if needs_refresh is not None and needs_refresh(auth_data):
+            self._start_refresh(key, fetch, needs_refresh)
+        return auth_data
+
+    def __str__(self):
+        with self._lock:
+            return "hits: %d, misses: %d, background refreshes: %d" % (
+                self.hits, self.misses, self.refreshes)
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    """Returns the token cache of this process"""
+    global _token_cache
+    with _token_cache_lock:
+        if _token_cache is None:
+            _token_cache = TokenCache()
+        return _token_cache
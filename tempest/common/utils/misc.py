@@ -14,7 +14,11 @@
 #    under the License.
 
 import inspect
+from multiprocessing import pool
 import re
+import sys
+
+import six
 
 from tempest.openstack.common import log as logging
 
@@ -85,3 +89,41 @@ def find_test_caller():
     if caller_name is None:
         LOG.debug("Sane call name not found in %s" % names)
     return caller_name
+
+
+def run_concurrently(func, items, max_workers=10, raise_on_error=True):
+    """Call func on each of the items using a bounded pool of threads.
+
+    :param func: callable taking a single item as argument
+    :param items: list of items to process
+    :param max_workers: maximum number of concurrent calls
+    :param raise_on_error: when True, the first exception (in items order)
+                           is re-raised once all the calls completed. When
+                           False, the exception raised by a call is returned
+                           in place of its result.
+    :returns: list of results, in the same order as the items
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def _call(item):
+        try:
+            return True, func(item)
+        except Exception:
+            return False, sys.exc_info()
+
+    workers = pool.ThreadPool(min(max_workers, len(items)))
+    try:
+        outcomes = workers.map(_call, items)
+    finally:
+        workers.close()
+        workers.join()
+    results = []
+    for success, value in outcomes:
+        if not success:
+            if raise_on_error:
+                six.reraise(*value)
+            value = value[1]
+        results.append(value)
+    return results
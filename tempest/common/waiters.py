@@ -11,8 +11,10 @@
 #    under the License.
 
 
+import re
 import time
 
+from tempest.common import polling
 from tempest.common.utils import misc as misc_utils
 from tempest import config
 from tempest import exceptions
@@ -22,65 +24,79 @@ CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+def _get_task_state(client, body):
+    if client.service == CONF.compute.catalog_v3_type:
+        task_state = body.get("os-extended-status:task_state", None)
+    else:
+        task_state = body.get('OS-EXT-STS:task_state', None)
+    return task_state
+
+
+def _is_server_status_reached(server_status, task_state, status, ready_wait):
+    """Same conditions as in wait_for_server_status"""
+    if status == 'BUILD' and server_status != 'UNKNOWN':
+        return True
+    if server_status != status:
+        return False
+    return not ready_wait or str(task_state) == "None"
+
+
 # NOTE(afazekas): This function needs to know a token and a subject.
 def wait_for_server_status(client, server_id, status, ready_wait=True,
                            extra_timeout=0, raise_on_error=True):
     """Waits for a server to reach a given status."""
 
-    def _get_task_state(body):
-        if client.service == CONF.compute.catalog_v3_type:
-            task_state = body.get("os-extended-status:task_state", None)
-        else:
-            task_state = body.get('OS-EXT-STS:task_state', None)
-        return task_state
-
     # NOTE(afazekas): UNKNOWN status possible on ERROR
     # or in a very early stage.
     resp, body = client.get_server(server_id)
     old_status = server_status = body['status']
-    old_task_state = task_state = _get_task_state(body)
-    start_time = int(time.time())
+    old_task_state = task_state = _get_task_state(client, body)
     timeout = client.build_timeout + extra_timeout
+    poller = polling.Poller(client.build_interval, timeout, 'server', status)
     while True:
         # NOTE(afazekas): Now the BUILD status only reached
         # between the UNKNOWN->ACTIVE transition.
         # TODO(afazekas): enumerate and validate the stable status set
         if status == 'BUILD' and server_status != 'UNKNOWN':
+            poller.done()
             return
         if server_status == status:
             if ready_wait:
                 if status == 'BUILD':
+                    poller.done()
                     return
                 # NOTE(afazekas): The instance is in "ready for action state"
                 # when no task in progress
                 # NOTE(afazekas): Converted to string bacuse of the XML
                 # responses
                 if str(task_state) == "None":
+                    poller.done()
                     # without state api extension 3 sec usually enough
                     time.sleep(CONF.compute.ready_wait)
                     return
             else:
+                poller.done()
                 return
 
-        time.sleep(client.build_interval)
+        poller.sleep()
         resp, body = client.get_server(server_id)
         server_status = body['status']
-        task_state = _get_task_state(body)
+        task_state = _get_task_state(client, body)
         if (server_status != old_status) or (task_state != old_task_state):
             LOG.info('State transition "%s" ==> "%s" after %d second wait',
                      '/'.join((old_status, str(old_task_state))),
                      '/'.join((server_status, str(task_state))),
-                     time.time() - start_time)
+                     poller.elapsed())
         if (server_status == 'ERROR') and raise_on_error:
+            poller.done(success=False)
             if 'fault' in body:
                 raise exceptions.BuildErrorException(body['fault'],
                                                      server_id=server_id)
             else:
                 raise exceptions.BuildErrorException(server_id=server_id)
 
-        timed_out = int(time.time()) - start_time >= timeout
-
-        if timed_out:
+        if poller.timed_out():
+            poller.done(success=False)
             expected_task_state = 'None' if ready_wait else 'n/a'
             message = ('Server %(server_id)s failed to reach %(status)s '
                        'status and task state "%(expected_task_state)s" '
@@ -99,6 +115,77 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
         old_task_state = task_state
 
 
+def wait_for_servers_status(client, server_ids, status, ready_wait=True,
+                            extra_timeout=0, raise_on_error=True,
+                            name_prefix=None):
+    """Waits for all the servers to reach a given status.
+
+    The servers are polled together, with one list_servers_with_detail call
+    per build_interval, restricted to the servers whose name starts with
+    name_prefix when given. Returns as soon as all the servers reached the
+    status, or raises on the first server going to ERROR.
+    """
+    pending = set(server_ids)
+    states = dict((server_id, ('UNKNOWN', None)) for server_id in pending)
+    params = None
+    if name_prefix is not None:
+        # NOTE: the name filter of the API is a regular expression
+        params = {'name': '^%s' % re.escape(name_prefix)}
+    timeout = client.build_timeout + extra_timeout
+    poller = polling.Poller(client.build_interval, timeout, 'server', status)
+    while True:
+        resp, body = client.list_servers_with_detail(params)
+        for server in body['servers']:
+            if server['id'] not in pending:
+                continue
+            server_status = server['status']
+            task_state = _get_task_state(client, server)
+            old_status, old_task_state = states[server['id']]
+            if (server_status != old_status or
+                    task_state != old_task_state):
+                LOG.info('Server %s state transition "%s" ==> "%s" after '
+                         '%d second wait', server['id'],
+                         '/'.join((old_status, str(old_task_state))),
+                         '/'.join((server_status, str(task_state))),
+                         poller.elapsed())
+                states[server['id']] = (server_status, task_state)
+            if server_status == 'ERROR' and raise_on_error:
+                poller.done(success=False)
+                if 'fault' in server:
+                    raise exceptions.BuildErrorException(
+                        server['fault'], server_id=server['id'])
+                raise exceptions.BuildErrorException(server_id=server['id'])
+            if _is_server_status_reached(server_status, task_state, status,
+                                         ready_wait):
+                pending.discard(server['id'])
+        if not pending:
+            poller.done()
+            if ready_wait and status != 'BUILD':
+                # without state api extension 3 sec usually enough
+                time.sleep(CONF.compute.ready_wait)
+            return
+
+        if poller.timed_out():
+            poller.done(success=False)
+            expected_task_state = 'None' if ready_wait else 'n/a'
+            message = ('Servers %(server_ids)s failed to reach %(status)s '
+                       'status and task state "%(expected_task_state)s" '
+                       'within the required time (%(timeout)s s).' %
+                       {'server_ids': ', '.join(sorted(pending)),
+                        'status': status,
+                        'expected_task_state': expected_task_state,
+                        'timeout': timeout})
+            message += ' Current status and task state: %s.' % ', '.join(
+                '%s: %s/%s' % (server_id, states[server_id][0],
+                               states[server_id][1])
+                for server_id in sorted(pending))
+            caller = misc_utils.find_test_caller()
+            if caller:
+                message = '(%s) %s' % (caller, message)
+            raise exceptions.TimeoutException(message)
+        poller.sleep()
+
+
 def wait_for_image_status(client, image_id, status):
     """Waits for an image to reach a given status.
 
@@ -106,21 +193,24 @@ def wait_for_image_status(client, image_id, status):
     The client should also have build_interval and build_timeout attributes.
     """
     resp, image = client.get_image(image_id)
-    start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout,
+                            'image', status)
 
     while image['status'] != status:
-        time.sleep(client.build_interval)
+        poller.sleep()
         resp, image = client.get_image(image_id)
         if image['status'] == 'ERROR':
+            poller.done(success=False)
             raise exceptions.AddImageException(image_id=image_id)
 
         # check the status again to avoid a false negative where we hit
         # the timeout at the same time that the image reached the expected
         # status
         if image['status'] == status:
-            return
+            break
 
-        if int(time.time()) - start >= client.build_timeout:
+        if poller.timed_out():
+            poller.done(success=False)
             message = ('Image %(image_id)s failed to reach %(status)s '
                        'status within the required time (%(timeout)s s).' %
                        {'image_id': image_id,
@@ -131,6 +221,7 @@ def wait_for_image_status(client, image_id, status):
             if caller:
                 message = '(%s) %s' % (caller, message)
             raise exceptions.TimeoutException(message)
+    poller.done()
 
 
 def wait_for_bm_node_status(client, node_id, attr, status):
@@ -139,15 +230,17 @@ def wait_for_bm_node_status(client, node_id, attr, status):
     The client should have a show_node(node_uuid) method to get the node.
     """
     _, node = client.show_node(node_id)
-    start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout,
+                            'baremetal node %s' % attr, status)
 
     while node[attr] != status:
-        time.sleep(client.build_interval)
+        poller.sleep()
         _, node = client.show_node(node_id)
         if node[attr] == status:
-            return
+            break
 
-        if int(time.time()) - start >= client.build_timeout:
+        if poller.timed_out():
+            poller.done(success=False)
             message = ('Node %(node_id)s failed to reach %(attr)s=%(status)s '
                        'within the required time (%(timeout)s s).' %
                        {'node_id': node_id,
@@ -159,3 +252,4 @@ def wait_for_bm_node_status(client, node_id, attr, status):
             if caller:
                 message = '(%s) %s' % (caller, message)
             raise exceptions.TimeoutException(message)
+    poller.done()
@@ -59,6 +59,29 @@ AuthGroup = [
                      "It requires at least `2 * CONC` distinct accounts "
                      "configured in `test_accounts_file`, with CONC == the "
                      "number of concurrent test processes."),
+    cfg.BoolOpt('token_cache',
+                default=False,
+                help="Share the tokens between the test processes, through "
+                     "files stored under the lock path, so that each set of "
+                     "credentials authenticates once for the whole run "
+                     "instead of once per process and client manager."),
+    cfg.IntOpt('token_cache_refresh_time',
+               default=300,
+               help="Time in seconds before its expiry when a cached token "
+                    "is refreshed in the background."),
+    cfg.IntOpt('isolated_creds_pool_size',
+               default=0,
+               help="With tenant isolation, number of sets of isolated "
+                    "credentials (tenant, user and network resources) each "
+                    "test process provisions ahead of time, in the "
+                    "background. Test classes take them from the pool and "
+                    "give them back, when clean, for the next classes to "
+                    "reuse. The pool is deleted at the end of the run. 0 "
+                    "disables the pool."),
+    cfg.IntOpt('isolated_creds_pool_workers',
+               default=4,
+               help="Number of threads provisioning, checking and deleting "
+                    "the pooled isolated credentials in parallel."),
 ]
 
 identity_group = cfg.OptGroup(name='identity',
@@ -824,9 +847,43 @@ StressGroup = [
     cfg.IntOpt('log_check_interval',
                default=60,
                help='time (in seconds) between log file error checks.'),
+    cfg.ListOpt('log_error_patterns',
+                default=['ERROR', 'TRACE'],
+                help='Regular expressions of the errors looked for in the '
+                     'log files.'),
+    cfg.IntOpt('log_check_concurrency',
+               default=10,
+               help='Number of nodes whose log files are checked '
+                    'concurrently.'),
     cfg.IntOpt('default_thread_number_per_action',
                default=4,
                help='The number of threads created while stress test.'),
+    cfg.IntOpt('stats_interval',
+               default=10,
+               help='Time (in seconds) between two samples of the '
+                    'throughput and error rate of the stress actions, when '
+                    'they are written to a time series file.'),
+    cfg.StrOpt('runner',
+               default='process',
+               choices=['process', 'actor'],
+               help="How the threads of the stress actions are run: "
+                    "'process' runs each of them in a process of its own, "
+                    "'actor' runs them as threads sharded across a few "
+                    "worker processes, which scales to many more threads "
+                    "for the actions only doing API calls."),
+    cfg.IntOpt('actor_workers',
+               default=0,
+               help="Number of worker processes of the 'actor' runner, 0 "
+                    "for one per CPU."),
+    cfg.StrOpt('distributed_authkey',
+               secret=True,
+               help="Shared secret authenticating the agents of a "
+                    "distributed stress run to their coordinator."),
+    cfg.IntOpt('agent_timeout',
+               default=60,
+               help="Time (in seconds) the coordinator of a distributed "
+                    "stress run waits for its agents to connect, and for "
+                    "them to stop when told to."),
     cfg.BoolOpt('leave_dirty_stack',
                 default=False,
                 help='Prevent the cleaning (tearDownClass()) between'
@@ -1022,6 +1079,107 @@ CLIGroup = [
                help="Number of seconds to wait on a CLI timeout"),
 ]
 
+service_clients_group = cfg.OptGroup(name='service-clients',
+                                     title="Service Clients Options")
+
+ServiceClientsGroup = [
+    cfg.IntOpt('async_workers',
+               default=100,
+               help="Number of worker threads shared by the asynchronous "
+                    "service clients, i.e. the maximum number of API calls "
+                    "they keep in flight."),
+    cfg.IntOpt('concurrent_requests',
+               default=10,
+               help="Maximum number of API requests a service client runs "
+                    "concurrently when sending a batch of requests."),
+    cfg.BoolOpt('http_keep_alive',
+                default=False,
+                help="Reuse HTTP connections between requests instead of "
+                     "opening a new connection (and TLS session) for each "
+                     "API call. Connections are pooled per endpoint and "
+                     "shared by all the clients of a client manager."),
+    cfg.ListOpt('http_keep_alive_services',
+                default=[],
+                help="Catalog types of the services whose clients use "
+                     "keep-alive connections. If empty, all the service "
+                     "clients use them when http_keep_alive is enabled."),
+    cfg.IntOpt('http_pool_size',
+               default=10,
+               help="Maximum number of idle keep-alive connections kept "
+                    "per endpoint."),
+    cfg.StrOpt('response_validation',
+               default='full',
+               choices=['full', 'sampled', 'disabled'],
+               help="Validation of the API responses against their JSON "
+                    "schemas: 'full' validates every response, 'sampled' "
+                    "a random share of them (see "
+                    "response_validation_sample_rate) and 'disabled' none. "
+                    "Status codes are always checked."),
+    cfg.FloatOpt('response_validation_sample_rate',
+                 default=0.1,
+                 help="Share of the responses validated when "
+                      "response_validation is 'sampled', between 0 and 1."),
+    cfg.IntOpt('http_pool_idle_timeout',
+               default=60,
+               help="Time in seconds after which an idle keep-alive "
+                    "connection is closed instead of being reused."),
+]
+
+polling_group = cfg.OptGroup(name='polling',
+                             title="Options for waiting on resources")
+
+PollingGroup = [
+    cfg.BoolOpt('adaptive',
+                default=True,
+                help="Poll the status of the resources being waited on "
+                     "with an exponential backoff, starting at "
+                     "initial_interval, instead of every build_interval."),
+    cfg.FloatOpt('initial_interval',
+                 default=1.0,
+                 help="Time in seconds before the first poll of an "
+                      "adaptive wait."),
+    cfg.FloatOpt('backoff_factor',
+                 default=1.5,
+                 help="Factor applied to the polling interval after each "
+                      "poll of an adaptive wait."),
+    cfg.FloatOpt('max_interval',
+                 default=10.0,
+                 help="Maximum time in seconds between two polls of an "
+                      "adaptive wait."),
+    cfg.FloatOpt('jitter',
+                 default=0.2,
+                 help="Random variation, as a share of the interval, added "
+                      "to each polling interval of an adaptive wait so that "
+                      "concurrent waits do not poll in lockstep."),
+    cfg.BoolOpt('learn_transition_times',
+                default=True,
+                help="Learn how long each type of resource takes to reach "
+                     "a status from the previous waits of the run, and poll "
+                     "less before that time is reached."),
+]
+
+discovery_group = cfg.OptGroup(name='discovery',
+                               title="Options for the discovery cache")
+
+DiscoveryGroup = [
+    cfg.StrOpt('cache_file',
+               help="File where verify-tempest-config caches the API "
+                    "versions and extensions it discovered, keyed by the "
+                    "identity endpoint and the service catalog. Defaults "
+                    "to discovery_cache.json under the lock path."),
+    cfg.IntOpt('cache_ttl',
+               default=3600,
+               help="Time in seconds during which the discovered API "
+                    "versions and extensions are reused instead of "
+                    "querying the services again. 0 disables the cache."),
+    cfg.BoolOpt('check_extensions',
+                default=False,
+                help="When the list of enabled extensions of a service is "
+                     "'all', check the extensions used by the tests against "
+                     "the extensions found in the discovery cache, if it is "
+                     "fresh."),
+]
+
 negative_group = cfg.OptGroup(name='negative', title="Negative Test Options")
 
 NegativeGroup = [
@@ -1060,7 +1218,10 @@ _opts = [
     (baremetal_group, BaremetalGroup),
     (input_scenario_group, InputScenarioGroup),
     (cli_group, CLIGroup),
-    (negative_group, NegativeGroup)
+    (negative_group, NegativeGroup),
+    (service_clients_group, ServiceClientsGroup),
+    (polling_group, PollingGroup),
+    (discovery_group, DiscoveryGroup)
 ]
 
 
@@ -1132,6 +1293,9 @@ class TempestConfigPrivate(object):
         self.input_scenario = cfg.CONF['input-scenario']
         self.cli = cfg.CONF.cli
         self.negative = cfg.CONF.negative
+        self.service_clients = cfg.CONF['service-clients']
+        self.polling = cfg.CONF.polling
+        self.discovery = cfg.CONF.discovery
         if not self.compute_admin.username:
             self.compute_admin.username = self.identity.admin_username
             self.compute_admin.password = self.identity.admin_password
@@ -14,6 +14,7 @@
 #    under the License.
 
 from tempest import auth
+from tempest.common import http
 from tempest import config
 from tempest import exceptions
 
@@ -47,6 +48,15 @@ class Manager(object):
             raise exceptions.InvalidCredentials()
         # Creates an auth provider for the credentials
         self.auth_provider = self.get_auth_provider(self.credentials)
+        # Keep-alive connections shared by the clients of this manager
+        self.http_pool = None
+        if CONF.service_clients.http_keep_alive:
+            self.http_pool = http.HttpConnectionPool(
+                pool_size=CONF.service_clients.http_pool_size,
+                idle_timeout=CONF.service_clients.http_pool_idle_timeout,
+                disable_ssl_certificate_validation=(
+                    CONF.identity.disable_ssl_certificate_validation),
+                stats=http.pool_stats)
         # FIXME(andreaf) unused
         self.client_attr_names = []
 
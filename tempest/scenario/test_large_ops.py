@@ -45,11 +45,12 @@ class TestLargeOpsScenario(manager.ScenarioTest):
         cls.set_network_resources()
         super(TestLargeOpsScenario, cls).resource_setup()
 
-    def _wait_for_server_status(self, status):
-        for server in self.servers:
-            # Make sure nova list keeps working throughout the build process
-            self.servers_client.list_servers()
-            self.servers_client.wait_for_server_status(server['id'], status)
+    def _wait_for_server_status(self, status, name_prefix):
+        # Make sure nova list keeps working throughout the build process
+        self.servers_client.list_servers()
+        self.servers_client.wait_for_servers_status(
+            [server['id'] for server in self.servers], status,
+            name_prefix=name_prefix)
 
     def nova_boot(self):
         name = data_utils.rand_name('scenario-server-')
@@ -77,7 +78,7 @@ class TestLargeOpsScenario(manager.ScenarioTest):
                 thing_id=server['id'], thing_id_param='server_id',
                 cleanup_callable=self.delete_wrapper,
                 cleanup_args=[self.servers_client.delete_server, server['id']])
-        self._wait_for_server_status('ACTIVE')
+        self._wait_for_server_status('ACTIVE', name)
 
     def _large_ops_scenario(self):
         self.glance_image_create()
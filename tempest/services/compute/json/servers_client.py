@@ -182,6 +182,16 @@ class ServersClientJSON(rest_client.RestClient):
                                               raise_on_error=raise_on_error,
                                               ready_wait=ready_wait)
 
+    def wait_for_servers_status(self, server_ids, status, extra_timeout=0,
+                                raise_on_error=True, ready_wait=True,
+                                name_prefix=None):
+        """Waits for all the servers to reach a given status."""
+        return waiters.wait_for_servers_status(self, server_ids, status,
+                                               extra_timeout=extra_timeout,
+                                               raise_on_error=raise_on_error,
+                                               ready_wait=ready_wait,
+                                               name_prefix=name_prefix)
+
     def wait_for_server_termination(self, server_id, ignore_error=False):
         """Waits for server to reach termination."""
         start_time = int(time.time())
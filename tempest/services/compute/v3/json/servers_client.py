@@ -180,6 +180,14 @@ class ServersV3ClientJSON(rest_client.RestClient):
                                               extra_timeout=extra_timeout,
                                               raise_on_error=raise_on_error)
 
+    def wait_for_servers_status(self, server_ids, status, extra_timeout=0,
+                                raise_on_error=True, name_prefix=None):
+        """Waits for all the servers to reach a given status."""
+        return waiters.wait_for_servers_status(self, server_ids, status,
+                                               extra_timeout=extra_timeout,
+                                               raise_on_error=raise_on_error,
+                                               name_prefix=name_prefix)
+
     def wait_for_server_termination(self, server_id, ignore_error=False):
         """Waits for server to reach termination."""
         start_time = int(time.time())
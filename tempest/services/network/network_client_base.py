@@ -10,9 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import time
 import urllib
 
+from tempest.common import polling
 from tempest.common.utils import misc
 from tempest import config
 from tempest import exceptions
@@ -181,8 +181,11 @@ class NetworkClientBase(object):
         raise AttributeError(name)
 
     # Common methods that are hard to automate
-    def create_bulk_network(self, names):
+    def create_bulk_network(self, names, tenant_ids=None):
         network_list = [{'name': name} for name in names]
+        if tenant_ids is not None:
+            for network, tenant_id in zip(network_list, tenant_ids):
+                network['tenant_id'] = tenant_id
         post_data = {'networks': network_list}
         body = self.serialize_list(post_data, "networks", "network")
         uri = self.get_uri("networks")
@@ -211,13 +214,16 @@ class NetworkClientBase(object):
 
     def wait_for_resource_deletion(self, resource_type, id):
         """Waits for a resource to be deleted."""
-        start_time = int(time.time())
+        poller = polling.Poller(self.build_interval, self.build_timeout,
+                                resource_type, 'DELETED')
         while True:
             if self.is_resource_deleted(resource_type, id):
+                poller.done()
                 return
-            if int(time.time()) - start_time >= self.build_timeout:
+            if poller.timed_out():
+                poller.done(success=False)
                 raise exceptions.TimeoutException
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def is_resource_deleted(self, resource_type, id):
         method = 'show_' + resource_type
@@ -248,15 +254,20 @@ class NetworkClientBase(object):
             interval = self.build_interval
         if not timeout:
             timeout = self.build_timeout
-        start_time = time.time()
+        poller = polling.Poller(interval, timeout, 'network resource',
+                                status)
 
-        while time.time() - start_time <= timeout:
+        while True:
             resource = fetch()
             if resource['status'] == status:
+                poller.done()
                 return
-            time.sleep(interval)
+            if poller.timed_out():
+                break
+            poller.sleep()
 
         # At this point, the wait has timed out
+        poller.done(success=False)
         message = 'Resource %s' % (str(resource))
         message += ' failed to reach status %s' % status
         message += ' within the required time %s' % timeout
@@ -149,6 +149,25 @@ class AccountClient(rest_client.RestClient):
             body = body.strip().splitlines()
         return resp, body
 
+    def iter_account_containers(self, params=None):
+        """
+        Yields the containers of the account, one listing page at a time
+
+        The pages follow each other with the marker of the JSON listing, so
+        an account of any size is walked in constant memory. The optional
+        params are those of list_account_containers, with prefix and
+        end_marker, and limit sets the number of containers per page.
+        """
+        params = dict(params or {}, format='json')
+        limit = params.get('limit')
+        while True:
+            resp, containers = self.list_account_containers(params=params)
+            for container in containers:
+                yield container
+            if not containers or (limit and len(containers) < int(limit)):
+                return
+            params['marker'] = containers[-1]['name'].encode('utf-8')
+
     def list_extensions(self):
         self.skip_path()
         try:
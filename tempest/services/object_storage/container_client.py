@@ -108,38 +108,30 @@ class ContainerClient(rest_client.RestClient):
             item count is beyond 10,000 item listing limit.
             Does not require any parameters aside from container name.
         """
-        # TODO(dwalleck): Rewrite using json format to avoid newlines at end of
-        # obj names. Set limit to API limit - 1 (max returned items = 9999)
-        limit = 9999
-        if params is not None:
-            if 'limit' in params:
-                limit = params['limit']
-
-            if 'marker' in params:
-                limit = params['marker']
-
-        resp, objlist = self.list_container_contents(
-            container,
-            params={'limit': limit, 'format': 'json'})
-        return objlist
-        """tmp = []
-        for obj in objlist:
-            tmp.append(obj['name'])
-        objlist = tmp
-
-        if len(objlist) >= limit:
-
-            # Increment marker
-            marker = objlist[len(objlist) - 1]
-
-            # Get the next chunk of the list
-            objlist.extend(_list_all_container_objects(container,
-                                                      params={'marker': marker,
-                                                              'limit': limit}))
-            return objlist
-        else:
-            # Return final, complete list
-            return objlist"""
+        return list(self.iter_container_objects(container, params=params))
+
+    def iter_container_objects(self, container, params=None):
+        """
+            Yields the objects of the container, one listing page at a time
+
+            The pages follow each other with the marker of the JSON listing,
+            so a container of any size is walked in constant memory.
+            The optional params are those of list_container_contents, e.g.
+            prefix, end_marker or delimiter, and limit sets the number of
+            objects per page. Pseudo-directories listed with a delimiter
+            are yielded as {'subdir': name}.
+        """
+        params = dict(params or {}, format='json')
+        limit = params.get('limit')
+        while True:
+            resp, objlist = self.list_container_contents(container,
+                                                         params=params)
+            for obj in objlist:
+                yield obj
+            if not objlist or (limit and len(objlist) < int(limit)):
+                return
+            marker = objlist[-1].get('name', objlist[-1].get('subdir'))
+            params['marker'] = marker.encode('utf-8')
 
     def list_container_contents(self, container, params=None):
         """
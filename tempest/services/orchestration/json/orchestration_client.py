@@ -15,9 +15,9 @@
 
 import json
 import re
-import time
 import urllib
 
+from tempest.common import polling
 from tempest.common import rest_client
 from tempest import config
 from tempest import exceptions
@@ -161,7 +161,8 @@ class OrchestrationClient(rest_client.RestClient):
     def wait_for_resource_status(self, stack_identifier, resource_name,
                                  status, failure_pattern='^.*_FAILED$'):
         """Waits for a Resource to reach a given status."""
-        start = int(time.time())
+        poller = polling.Poller(self.build_interval, self.build_timeout,
+                                'stack resource', status)
         fail_regexp = re.compile(failure_pattern)
 
         while True:
@@ -176,25 +177,29 @@ class OrchestrationClient(rest_client.RestClient):
                 resource_name = body['resource_name']
                 resource_status = body['resource_status']
                 if resource_status == status:
+                    poller.done()
                     return
                 if fail_regexp.search(resource_status):
+                    poller.done(success=False)
                     raise exceptions.StackResourceBuildErrorException(
                         resource_name=resource_name,
                         stack_identifier=stack_identifier,
                         resource_status=resource_status,
                         resource_status_reason=body['resource_status_reason'])
 
-            if int(time.time()) - start >= self.build_timeout:
+            if poller.timed_out():
+                poller.done(success=False)
                 message = ('Resource %s failed to reach %s status within '
                            'the required time (%s s).' %
                            (resource_name, status, self.build_timeout))
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def wait_for_stack_status(self, stack_identifier, status,
                               failure_pattern='^.*_FAILED$'):
         """Waits for a Stack to reach a given status."""
-        start = int(time.time())
+        poller = polling.Poller(self.build_interval, self.build_timeout,
+                                'stack', status)
         fail_regexp = re.compile(failure_pattern)
 
         while True:
@@ -202,23 +207,27 @@ class OrchestrationClient(rest_client.RestClient):
                 resp, body = self.get_stack(stack_identifier)
             except exceptions.NotFound:
                 if status == 'DELETE_COMPLETE':
+                    poller.done()
                     return
             stack_name = body['stack_name']
             stack_status = body['stack_status']
             if stack_status == status:
+                poller.done()
                 return body
             if fail_regexp.search(stack_status):
+                poller.done(success=False)
                 raise exceptions.StackBuildErrorException(
                     stack_identifier=stack_identifier,
                     stack_status=stack_status,
                     stack_status_reason=body['stack_status_reason'])
 
-            if int(time.time()) - start >= self.build_timeout:
+            if poller.timed_out():
+                poller.done(success=False)
                 message = ('Stack %s failed to reach %s status within '
                            'the required time (%s s).' %
                            (stack_name, status, self.build_timeout))
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def show_resource_metadata(self, stack_identifier, resource_name):
         """Returns the resource's metadata."""
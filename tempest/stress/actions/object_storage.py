@@ -0,0 +1,303 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""
+Object storage stress actions.
+
+The sizes in the kwargs of the JSON description are numbers of bytes, or
+strings with a K, M or G suffix. The size of the objects put can follow a
+distribution:
+
+    "object_size": "64K"
+    "object_size": {"distribution": "uniform", "min": "4K", "max": "1M"}
+    "object_size": {"distribution": "lognormal", "median": "64K",
+                    "sigma": 1.5, "max": "64M"}
+    "object_size": {"distribution": "choice",
+                    "sizes": {"4K": 70, "1M": 25, "64M": 5}}
+"""
+
+import collections
+import math
+import os
+import random
+
+import six
+
+from tempest.common.utils import data_utils
+from tempest.common.utils import misc
+from tempest import exceptions
+import tempest.stress.stressaction as stressaction
+
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+# Size of the random block the data of the objects is made of
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_size(size):
+    """Returns the number of bytes of a size like 4096, "4K" or "1.5M" """
+    if isinstance(size, six.string_types):
+        size = size.strip().upper()
+        if size and size[-1] in SIZE_UNITS:
+            return int(float(size[:-1]) * SIZE_UNITS[size[-1]])
+    return int(size)
+
+
+def _weighted_choice(weights):
+    """Returns a key of weights, chosen with the probability of its weight"""
+    point = random.uniform(0, sum(weights.values()))
+    for key, weight in sorted(weights.items()):
+        point -= weight
+        if point <= 0:
+            return key
+    return key
+
+
+class SizeDistribution(object):
+    """Sizes of the objects, following the distribution of spec"""
+
+    distributions = ('fixed', 'uniform', 'lognormal', 'choice')
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict):
+            spec = {'distribution': 'fixed', 'size': spec}
+        self.distribution = spec.get('distribution', 'fixed')
+        if self.distribution not in self.distributions:
+            raise ValueError("Unknown size distribution '%s', expected one "
+                             "of %s" % (self.distribution,
+                                        ', '.join(self.distributions)))
+        self.size = parse_size(spec.get('size', 0))
+        self.min = parse_size(spec.get('min', 0))
+        self.max = parse_size(spec.get('max', 0))
+        self.median = parse_size(spec.get('median', BLOCK_SIZE))
+        self.sigma = float(spec.get('sigma', 1.0))
+        self.sizes = dict((parse_size(size), weight)
+                          for size, weight in spec.get('sizes', {}).items())
+        if self.distribution == 'choice' and not self.sizes:
+            raise ValueError("The choice distribution needs sizes")
+
+    def next_size(self):
+        if self.distribution == 'uniform':
+            return random.randint(self.min, self.max)
+        if self.distribution == 'lognormal':
+            size = int(random.lognormvariate(math.log(self.median),
+                                             self.sigma))
+            return min(size, self.max) if self.max else size
+        if self.distribution == 'choice':
+            return _weighted_choice(self.sizes)
+        return self.size
+
+
+class ObjectStorageStress(stressaction.StressAction):
+    """Base of the actions working in a container of their own"""
+
+    def setUp(self, **kwargs):
+        super(ObjectStorageStress, self).setUp(**kwargs)
+        self.container = data_utils.rand_name("stress-container")
+        self.manager.container_client.create_container(self.container)
+        self._block = os.urandom(BLOCK_SIZE)
+
+    def data(self, size):
+        """Returns size bytes of data"""
+        return (self._block * (size // BLOCK_SIZE + 1))[:size]
+
+    def delete_objects(self, names):
+        def delete(name):
+            try:
+                self.manager.object_client.delete_object(self.container, name)
+            except exceptions.NotFound:
+                pass
+        misc.run_concurrently(delete, names, raise_on_error=False)
+
+    def tearDown(self):
+        self.delete_objects(self.objects_left())
+        try:
+            self.manager.container_client.delete_container(self.container)
+        except Exception:
+            self.logger.exception("Failed to delete container %s" %
+                                  self.container)
+        super(ObjectStorageStress, self).tearDown()
+
+    def objects_left(self):
+        """Returns the names of the objects to delete in tearDown"""
+        return []
+
+
+class ObjectMixedStress(ObjectStorageStress):
+    """Mixed PUT, GET, HEAD and DELETE of objects of various sizes
+
+    Each run does one of the operations, chosen with the probability of its
+    weight, on the objects the action put. kwargs:
+
+    :param operations: weight of each operation
+    :param object_size: size distribution of the objects put
+    :param objects: number of objects in the container, beyond which the
+                    objects put replace existing ones
+    """
+
+    operations = {'put': 1, 'get': 4, 'head': 2, 'delete': 1}
+
+    def setUp(self, operations=None, object_size='64K', objects=100,
+              **kwargs):
+        super(ObjectMixedStress, self).setUp(**kwargs)
+        if operations is not None:
+            unknown = set(operations) - set(self.operations)
+            if unknown:
+                raise ValueError("Unknown operations %s, expected some of "
+                                 "%s" % (', '.join(sorted(unknown)),
+                                         ', '.join(sorted(self.operations))))
+            self.operations = operations
+        self.sizes = SizeDistribution(object_size)
+        self.max_objects = objects
+        self.objects = []
+
+    @property
+    def action(self):
+        """The operations, unless all of them run"""
+        action = super(ObjectMixedStress, self).action
+        if set(self.operations) != set(ObjectMixedStress.operations):
+            action += '(%s)' % '+'.join(sorted(self.operations))
+        return action
+
+    def objects_left(self):
+        return self.objects
+
+    def _put(self):
+        if len(self.objects) < self.max_objects:
+            name = data_utils.rand_name("object")
+        else:
+            name = random.choice(self.objects)
+        size = self.sizes.next_size()
+        self.manager.object_client.create_object(self.container, name,
+                                                 self.data(size))
+        if name not in self.objects:
+            self.objects.append(name)
+        self.count_bytes(size)
+
+    def _get(self):
+        _, body = self.manager.object_client.get_object(
+            self.container, random.choice(self.objects))
+        self.count_bytes(len(body))
+
+    def _head(self):
+        self.manager.object_client.list_object_metadata(
+            self.container, random.choice(self.objects))
+
+    def _delete(self):
+        name = self.objects.pop(random.randrange(len(self.objects)))
+        self.manager.object_client.delete_object(self.container, name)
+
+    def run(self):
+        operation = _weighted_choice(self.operations)
+        if not self.objects and 'put' in self.operations:
+            operation = 'put'
+        elif not self.objects:
+            raise RuntimeError("No object to %s, operations need 'put'" %
+                               operation)
+        getattr(self, '_' + operation)()
+
+
+class ObjectSegmentedUploadStress(ObjectStorageStress):
+    """Uploads of large objects, their segments in parallel
+
+    Each run uploads the segments of a dynamic large object concurrently,
+    then its manifest. kwargs:
+
+    :param segment_size: size of the segments
+    :param segments: number of segments of an object
+    :param concurrency: number of segments uploaded concurrently
+    :param verify: whether to read the whole object back after the upload
+    :param objects: number of large objects kept in the container, beyond
+                    which a run deletes the oldest one first
+    """
+
+    def setUp(self, segment_size='1M', segments=10, concurrency=4,
+              verify=False, objects=10, **kwargs):
+        super(ObjectSegmentedUploadStress, self).setUp(**kwargs)
+        self.segment_size = parse_size(segment_size)
+        self.segments = segments
+        self.concurrency = concurrency
+        self.verify = verify
+        self.max_objects = objects
+        self.segment = self.data(self.segment_size)
+        self.objects = collections.deque()
+
+    def _segment_names(self, name):
+        return ['%s/%08d' % (name, segment)
+                for segment in six.moves.xrange(self.segments)]
+
+    def objects_left(self):
+        names = []
+        for name in self.objects:
+            names.append(name)
+            names.extend(self._segment_names(name))
+        return names
+
+    def run(self):
+        object_client = self.manager.object_client
+        if len(self.objects) >= max(self.max_objects, 1):
+            name = self.objects.popleft()
+            self.delete_objects([name] + self._segment_names(name))
+        name = data_utils.rand_name("large-object")
+        self.objects.append(name)
+
+        def upload(segment):
+            object_client.create_object_segments(self.container, name,
+                                                 '%08d' % segment,
+                                                 self.segment)
+        misc.run_concurrently(upload, six.moves.xrange(self.segments),
+                              max_workers=self.concurrency)
+        size = self.segment_size * self.segments
+        self.count_bytes(size)
+        object_client.create_object(
+            self.container, name, '',
+            metadata={'X-Object-Manifest': '%s/%s/' % (self.container,
+                                                       name)})
+        if self.verify:
+            _, body = object_client.get_object(self.container, name)
+            if len(body) != size:
+                raise RuntimeError("Large object %s has %d bytes instead of "
+                                   "%d" % (name, len(body), size))
+            self.count_bytes(len(body))
+
+
+class ObjectRangedReadStress(ObjectStorageStress):
+    """Ranged reads at random offsets of an object
+
+    kwargs:
+
+    :param object_size: size of the object read
+    :param range_size: size of the ranges read
+    """
+
+    def setUp(self, object_size='16M', range_size='64K', **kwargs):
+        super(ObjectRangedReadStress, self).setUp(**kwargs)
+        self.object_size = parse_size(object_size)
+        self.range_size = min(parse_size(range_size), self.object_size)
+        self.object_data = self.data(self.object_size)
+        self.object_name = data_utils.rand_name("object")
+        self.manager.object_client.create_object(
+            self.container, self.object_name, self.object_data)
+
+    def objects_left(self):
+        return [self.object_name]
+
+    def run(self):
+        first = random.randint(0, self.object_size - self.range_size)
+        last = first + self.range_size - 1
+        _, body = self.manager.object_client.get_object(
+            self.container, self.object_name,
+            metadata={'Range': 'bytes=%d-%d' % (first, last)})
+        if body != self.object_data[first:last + 1]:
+            raise RuntimeError("Range %d-%d of %s has %d unexpected bytes" %
+                               (first, last, self.object_name, len(body)))
+        self.count_bytes(len(body))
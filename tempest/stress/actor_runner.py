@@ -0,0 +1,129 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Runs many stress actions as lightweight actors in a few processes.
+
+Instead of a process per thread of each test, the actions are sharded
+across a few worker processes, one per core by default, which run each
+action in a thread of its own. Actions which only do API calls spend most
+of their time waiting on the network, which releases the interpreter lock,
+so thousands of them can run per host.
+"""
+
+import multiprocessing
+import signal
+import sys
+import threading
+
+from tempest.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+
+class ActorHistogram(object):
+    """Records the latencies of an actor in the histogram of its worker"""
+
+    def __init__(self, histogram, lock):
+        self._histogram = histogram
+        self._lock = lock
+
+    def record(self, seconds):
+        with self._lock:
+            self._histogram.record(seconds)
+
+
+class ActorStatistics(object):
+    """Counters of an actor, added to the shared counters of its worker
+
+    The actor sees its own counters, e.g. to stop after max_runs, while the
+    counters of all the actors of an action in a worker are added up in a
+    single slot of the shared statistics.
+    """
+
+    def __init__(self, slot, lock):
+        self._slot = slot
+        self._lock = lock
+        self._counters = dict((field, 0) for field in slot.keys())
+        self.histogram = None
+        if slot.histogram is not None:
+            self.histogram = ActorHistogram(slot.histogram, lock)
+
+    def __getitem__(self, field):
+        return self._counters[field]
+
+    def __setitem__(self, field, value):
+        with self._lock:
+            self._slot[field] += value - self._counters[field]
+            self._counters[field] = value
+
+    def __contains__(self, field):
+        return field in self._counters
+
+
+class Worker(object):
+    """Runs actors, i.e. (stress action, statistics slot), in threads"""
+
+    def __init__(self, actors):
+        self.actors = actors
+        self._stopping = threading.Event()
+
+    def _run_actor(self, action, statistic):
+        try:
+            action.run_loop(statistic, self._stopping)
+        except SystemExit:
+            # Stopped on error, as told by stop_on_error
+            pass
+        except Exception:
+            LOG.exception("Actor %s failed" % action.action)
+
+    def _shutdown_handler(self, signalnum, frame):
+        self._stopping.set()
+        for action, __ in self.actors:
+            try:
+                action.tearDown()
+            except Exception:
+                LOG.exception("Error while tearDown")
+        sys.exit(0)
+
+    def run(self):
+        signal.signal(signal.SIGHUP, self._shutdown_handler)
+        signal.signal(signal.SIGTERM, self._shutdown_handler)
+        # Slots shared by the actors of this worker -> lock of the slot
+        locks = {}
+        threads = []
+        for action, slot in self.actors:
+            lock = locks.setdefault(id(slot), threading.Lock())
+            thread = threading.Thread(
+                target=self._run_actor,
+                args=(action, ActorStatistics(slot, lock)))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        # The main thread must stay responsive to the signals
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(1)
+
+
+def shard(actions, workers):
+    """Splits the actions in round robin across the workers
+
+    :param actions: list of (test index, stress action)
+    :returns: list of lists of (test index, stress action) per worker
+    """
+    workers = max(min(workers or multiprocessing.cpu_count(), len(actions)),
+                  1)
+    return [actions[worker::workers] for worker in range(workers)]
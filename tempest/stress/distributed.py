@@ -0,0 +1,425 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Runs the stress tests from several load generator hosts.
+
+A coordinator waits for its agents to connect, splits the threads of the
+tests of the JSON description between them and starts them together. Each
+agent runs its share with stress_openstack and streams its counters back
+every stats_interval. The coordinator stops all the agents at the end of
+the duration, or at the first failure when told to stop on error, and
+merges their counters and latency histograms.
+
+The messages are JSON documents sent over authenticated multiprocessing
+connections, so that nothing received is unpickled.
+"""
+
+import json
+from multiprocessing import connection
+import socket
+import threading
+import time
+
+import six
+from six import moves
+
+from tempest import config
+from tempest import exceptions
+from tempest.openstack.common import log as logging
+from tempest.stress import cleanup
+from tempest.stress import driver
+from tempest.stress import stats
+
+CONF = config.CONF
+
+LOG = logging.getLogger(__name__)
+
+# Fields of the "rate" of a test which are split between the agents
+RATE_FIELDS = ('ops_per_sec', 'start_ops_per_sec', 'step_ops_per_sec',
+               'spike_ops_per_sec')
+
+
+def parse_address(address):
+    """Returns the (host, port) of a host:port address"""
+    host, __, port = address.rpartition(':')
+    return (host or 'localhost', int(port))
+
+
+def _authkey():
+    authkey = CONF.stress.distributed_authkey
+    return authkey.encode('utf-8') if authkey else None
+
+
+def _send(conn, message_type, **kwargs):
+    kwargs['type'] = message_type
+    conn.send_bytes(json.dumps(kwargs).encode('utf-8'))
+
+
+def _recv(conn):
+    return json.loads(conn.recv_bytes().decode('utf-8'))
+
+
+def split_tests(tests, agents, default_threads):
+    """Splits the threads of the tests between the agents
+
+    The target rate of a test is split like its threads.
+
+    :returns: list of the tests of each agent, with their share of threads
+    """
+    shares = [[] for __ in moves.xrange(agents)]
+    for index, test in enumerate(tests):
+        threads = test.get('threads', default_threads)
+        for agent in moves.xrange(agents):
+            # The agents getting one more thread change with each test
+            agent_threads = threads // agents + int(
+                (agent - index) % agents < threads % agents)
+            if not agent_threads:
+                continue
+            agent_test = dict(test, threads=agent_threads)
+            if 'rate' in test:
+                agent_test['rate'] = dict(
+                    (key, value * agent_threads / float(threads)
+                     if key in RATE_FIELDS else value)
+                    for key, value in test['rate'].items())
+            shares[agent].append(agent_test)
+    return shares
+
+
+def _sum_totals(totals):
+    """Sums the runs and failures of each action over the agents"""
+    summed = {}
+    for agent_totals in totals.values():
+        for action, (runs, fails) in agent_totals.items():
+            summed_runs, summed_fails = summed.get(action, (0, 0))
+            summed[action] = (summed_runs + runs, summed_fails + fails)
+    return summed
+
+
+class _StatsStream(object):
+    """Sends the totals of an agent to its coordinator
+
+    Used as the time series of stress_openstack, which samples it every
+    stats_interval.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def start(self):
+        pass
+
+    def sample(self, totals):
+        try:
+            _send(self._conn, 'stats', totals=totals)
+        except (IOError, OSError) as e:
+            # The run is stopped by the receiver of the agent
+            LOG.error("Failed to send the stats: %s" % e)
+
+
+class Agent(object):
+    """Runs the shares of the stress tests sent by a coordinator"""
+
+    def __init__(self, address, connect_timeout=60):
+        self.address = address
+        self.connect_timeout = connect_timeout
+        self._conn = None
+
+    def _connect(self):
+        deadline = time.time() + self.connect_timeout
+        while True:
+            try:
+                return connection.Client(self.address, authkey=_authkey())
+            except socket.error:
+                if time.time() > deadline:
+                    raise exceptions.TimeoutException(
+                        "Could not connect to the coordinator at %s:%d" %
+                        self.address)
+                time.sleep(1)
+
+    def _receive(self, messages, stopping):
+        try:
+            while True:
+                message = _recv(self._conn)
+                if message['type'] == 'stop':
+                    stopping.set()
+                    continue
+                if message['type'] == 'run':
+                    # Before the stop of this run can be received
+                    stopping.clear()
+                messages.put(message)
+        except (EOFError, IOError, OSError):
+            # The coordinator is gone
+            stopping.set()
+            messages.put(None)
+
+    def run(self):
+        """Runs the stress tests until the coordinator is done"""
+        self._conn = self._connect()
+        messages = moves.queue.Queue()
+        stopping = threading.Event()
+        receiver = threading.Thread(target=self._receive,
+                                    args=(messages, stopping))
+        receiver.daemon = True
+        receiver.start()
+        _send(self._conn, 'hello', host=socket.gethostname())
+        try:
+            while True:
+                try:
+                    message = messages.get(True, 1)
+                except moves.queue.Empty:
+                    continue
+                if message is None or message['type'] == 'exit':
+                    break
+                results = stats.StressResults()
+                try:
+                    code = driver.stress_openstack(
+                        message['tests'], message['duration'],
+                        message['max_runs'], message['stop_on_error'],
+                        results, _StatsStream(self._conn),
+                        message['runner'], stopping=stopping, clean=False)
+                except Exception:
+                    LOG.exception("Stress run failed")
+                    code = 1
+                try:
+                    _send(self._conn, 'result', code=code,
+                          results=results.to_dict())
+                except (IOError, OSError):
+                    LOG.error("Lost the coordinator, results not sent:")
+                    for line in results.format_summary():
+                        LOG.error(line)
+                    break
+        finally:
+            self._conn.close()
+        return 0
+
+
+class _AgentConnection(object):
+
+    def __init__(self, conn, host, number):
+        self.conn = conn
+        self.host = host
+        self.number = number
+        self.alive = True
+
+
+class Coordinator(object):
+    """Runs the stress tests on agents and merges their results
+
+    :param address: (host, port) the agents connect to
+    :param agents: number of agents to wait for
+    :param agent_timeout: time in seconds to wait for the agents to connect,
+                          and for them to stop when told to
+    """
+
+    def __init__(self, address, agents, agent_timeout=60):
+        self.address = address
+        self.agent_count = agents
+        self.agent_timeout = agent_timeout
+        self.listener = connection.Listener(address, authkey=_authkey())
+        self.agents = []
+        # (agent, message) received from all the agents, None as message
+        # when the connection to the agent was lost
+        self._messages = moves.queue.Queue()
+
+    def _hello(self, conn, deadline):
+        """Returns the host of a new agent, None if its hello is not valid"""
+        try:
+            if not conn.poll(max(deadline - time.time(), 0)):
+                LOG.warning("Agent rejected: no hello before the timeout")
+                return None
+            hello = _recv(conn)
+        except (EOFError, IOError, OSError, ValueError) as e:
+            LOG.warning("Agent rejected: %s" % e)
+            return None
+        if (not isinstance(hello, dict) or hello.get('type') != 'hello' or
+                not isinstance(hello.get('host'), six.string_types)):
+            LOG.warning("Agent rejected: invalid hello %r" % (hello,))
+            return None
+        return hello['host']
+
+    def _accept(self, accepted, deadline):
+        while accepted.qsize() < self.agent_count:
+            try:
+                conn = self.listener.accept()
+            except connection.AuthenticationError as e:
+                LOG.warning("Agent rejected: %s" % e)
+                continue
+            except (EOFError, IOError, OSError):
+                return
+            host = self._hello(conn, deadline)
+            if host is None:
+                conn.close()
+            else:
+                accepted.put((conn, host))
+
+    def _receive(self, agent):
+        try:
+            while True:
+                self._messages.put((agent, _recv(agent.conn)))
+        except (EOFError, IOError, OSError):
+            agent.alive = False
+            self._messages.put((agent, None))
+
+    def wait_for_agents(self):
+        """Waits for all the agents to connect"""
+        accepted = moves.queue.Queue()
+        deadline = time.time() + self.agent_timeout
+        acceptor = threading.Thread(target=self._accept,
+                                    args=(accepted, deadline))
+        acceptor.daemon = True
+        acceptor.start()
+        LOG.info("Waiting for %d agents on %s:%d" %
+                 ((self.agent_count,) + self.address))
+        while len(self.agents) < self.agent_count:
+            try:
+                conn, host = accepted.get(True,
+                                          max(deadline - time.time(), 0))
+            except moves.queue.Empty:
+                raise exceptions.TimeoutException(
+                    "Only %d of the %d agents connected" %
+                    (len(self.agents), self.agent_count))
+            agent = _AgentConnection(conn, host, len(self.agents))
+            LOG.info("Agent %d connected from %s" %
+                     (agent.number, agent.host))
+            self.agents.append(agent)
+            receiver = threading.Thread(target=self._receive, args=(agent,))
+            receiver.daemon = True
+            receiver.start()
+
+    def _stop(self, running):
+        for agent in running:
+            try:
+                _send(agent.conn, 'stop')
+            except (IOError, OSError):
+                pass
+
+    def run(self, tests, duration, max_runs=None, stop_on_error=False,
+            results=None, timeseries=None, runner=None):
+        """Runs the stress tests on the agents, like stress_openstack
+
+        :returns: 1 when an agent failed, had errors or was lost, else 0
+        """
+        agents = [agent for agent in self.agents if agent.alive]
+        if not agents:
+            raise exceptions.TempestException("No agent left")
+        shares = split_tests(tests, len(agents),
+                             int(CONF.stress.default_thread_number_per_action))
+        # agent -> runs and failures of each action so far
+        totals = {}
+        running = set()
+        for agent, agent_tests in zip(agents, shares):
+            if not agent_tests:
+                continue
+            _send(agent.conn, 'run', tests=agent_tests, duration=duration,
+                  max_runs=max_runs, stop_on_error=stop_on_error,
+                  runner=runner)
+            running.add(agent)
+            totals[agent] = {}
+
+        run_results = stats.StressResults()
+        had_errors = False
+        interval = CONF.stress.stats_interval
+        start_time = time.time()
+        end_time = start_time + duration if max_runs is None else None
+        stop_time = None
+        next_sample = start_time + interval
+        if timeseries is not None:
+            timeseries.start()
+        try:
+            while running:
+                now = time.time()
+                if stop_time is None and (
+                        (end_time is not None and now >= end_time) or
+                        (stop_on_error and had_errors)):
+                    self._stop(running)
+                    stop_time = now
+                if stop_time is not None and (
+                        now > stop_time + self.agent_timeout):
+                    LOG.error("Agents did not stop: %s" %
+                              ', '.join('%d on %s' % (agent.number,
+                                                      agent.host)
+                                        for agent in running))
+                    had_errors = True
+                    break
+                wait = next_sample - now
+                if end_time is not None and stop_time is None:
+                    wait = min(wait, end_time - now)
+                try:
+                    agent, message = self._messages.get(
+                        True, max(wait, 0.01))
+                except moves.queue.Empty:
+                    pass
+                else:
+                    if agent not in running:
+                        # Late message of a previous run
+                        continue
+                    if message is None:
+                        LOG.error("Lost agent %d on %s" % (agent.number,
+                                                           agent.host))
+                        running.discard(agent)
+                        had_errors = True
+                    elif message['type'] == 'stats':
+                        totals[agent] = message['totals']
+                        if any(fails for __, fails
+                               in message['totals'].values()):
+                            had_errors = True
+                    elif message['type'] == 'result':
+                        running.discard(agent)
+                        agent_results = stats.StressResults.from_dict(
+                            message['results'])
+                        totals[agent] = dict(
+                            (action, (result['runs'], result['fails']))
+                            for action, result
+                            in agent_results.actions.items())
+                        run_results.merge(agent_results, concurrent=True)
+                        if message['code'] != 0:
+                            had_errors = True
+                if timeseries is not None and time.time() >= next_sample:
+                    timeseries.sample(_sum_totals(totals))
+                    next_sample += interval
+        except KeyboardInterrupt:
+            LOG.warning("Interrupted, stopping the agents ...")
+            self._stop(running)
+            had_errors = True
+        if timeseries is not None:
+            timeseries.sample(_sum_totals(totals))
+
+        LOG.info("Statistics (per agent):")
+        for agent in sorted(totals, key=lambda agent: agent.number):
+            for action, (runs, fails) in sorted(totals[agent].items()):
+                LOG.info(" Agent %d on %s (%s): Run %d actions (%d failed)" %
+                         (agent.number, agent.host, action, runs, fails))
+        LOG.info("Summary:")
+        for line in run_results.format_summary():
+            LOG.info(line)
+        if results is not None:
+            results.merge(run_results)
+
+        if not had_errors and CONF.stress.full_clean_stack:
+            LOG.info("cleaning up")
+            cleanup.cleanup()
+        return 1 if had_errors else 0
+
+    def close(self):
+        """Tells the agents to exit"""
+        for agent in self.agents:
+            if agent.alive:
+                try:
+                    _send(agent.conn, 'exit')
+                except (IOError, OSError):
+                    pass
+            agent.conn.close()
+        self.listener.close()
@@ -27,7 +27,11 @@ from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import importutils
 from tempest.openstack.common import log as logging
+from tempest.stress import actor_runner
 from tempest.stress import cleanup
+from tempest.stress import load_profile
+from tempest.stress import log_watcher
+from tempest.stress import stats
 
 CONF = config.CONF
 
@@ -64,23 +68,6 @@ def _get_compute_nodes(controller, ssh_user, ssh_key=None):
     return nodes
 
 
-def _has_error_in_logs(logfiles, nodes, ssh_user, ssh_key=None,
-                       stop_on_error=False):
-    """
-    Detect errors in the nova log files on the controller and compute nodes.
-    """
-    grep = 'egrep "ERROR|TRACE" %s' % logfiles
-    ret = False
-    for node in nodes:
-        errors = do_ssh(grep, node, ssh_user, ssh_key)
-        if len(errors) > 0:
-            LOG.error('%s: %s' % (node, errors))
-            ret = True
-            if stop_on_error:
-                break
-    return ret
-
-
 def sigchld_handler(signalnum, frame):
     """
     Signal handler (only active if stop_on_error is True).
@@ -116,10 +103,73 @@ def terminate_all_processes(check_interval=20):
         process['process'].join()
 
 
-def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
+def _action_totals(started):
+    """Returns the runs and failures of each action so far"""
+    totals = {}
+    for process in started:
+        runs, fails = totals.get(process['action'], (0, 0))
+        totals[process['action']] = (runs + process['statistic']['runs'],
+                                     fails + process['statistic']['fails'])
+    return totals
+
+
+def _start_processes(test_runs, statistics):
+    """Runs each stress action in a process of its own"""
+    started = []
+    for slot, (__, p_number, test_run) in enumerate(test_runs):
+        shared_statistic = statistics.slot(slot)
+        p = multiprocessing.Process(target=test_run.execute,
+                                    args=(shared_statistic,))
+        started.append({'process': p,
+                        'p_number': p_number,
+                        'action': test_run.action,
+                        'statistic': shared_statistic})
+    return started
+
+
+def _start_actors(test_runs, statistics, workers):
+    """Runs the stress actions as actors sharded across worker processes
+
+    The actors of a test in a worker share a slot of the statistics.
+    """
+    started = []
+    slot = 0
+    for worker, shard in enumerate(actor_runner.shard(
+            [(index, test_run) for index, __, test_run in test_runs],
+            workers)):
+        # test index -> statistics slot of the test in this worker
+        slots = {}
+        actors = []
+        for index, test_run in shard:
+            if index not in slots:
+                slots[index] = statistics.slot(slot)
+                slot += 1
+                started.append({'process': None,
+                                'p_number': worker,
+                                'action': test_run.action,
+                                'statistic': slots[index]})
+            actors.append((test_run, slots[index]))
+        p = multiprocessing.Process(target=actor_runner.Worker(actors).run)
+        for process in started[-len(slots):]:
+            process['process'] = p
+    return started
+
+
+def stress_openstack(tests, duration, max_runs=None, stop_on_error=False,
+                     results=None, timeseries=None, runner=None,
+                     stopping=None, clean=True):
     """
     Workload driver. Executes an action function against a nova-cluster.
+
+    :param results: StressResults the results of the run are merged into
+    :param timeseries: TimeSeries the throughput and error rate of the
+                       actions are sampled to every stats_interval
+    :param runner: 'process' to run each thread of the actions in a process,
+                   'actor' to run them as actors in a few worker processes
+    :param stopping: threading.Event stopping the run early when set
+    :param clean: whether to clean up the stack after a run without errors
     """
+    runner = runner or CONF.stress.runner
     admin_manager = clients.AdminManager()
 
     ssh_user = CONF.stress.target_ssh_user
@@ -127,12 +177,19 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
     logfiles = CONF.stress.target_logfiles
     log_check_interval = int(CONF.stress.log_check_interval)
     default_thread_num = int(CONF.stress.default_thread_number_per_action)
+    watcher = None
     if logfiles:
         controller = CONF.stress.target_controller
         computes = _get_compute_nodes(controller, ssh_user, ssh_key)
-        for node in computes:
-            do_ssh("rm -f %s" % logfiles, node, ssh_user, ssh_key)
-    for test in tests:
+        watcher = log_watcher.LogWatcher(
+            computes, logfiles, ssh_user, ssh_key,
+            patterns=CONF.stress.log_error_patterns,
+            max_workers=CONF.stress.log_check_concurrency)
+        # Only the errors logged from now on are reported
+        watcher.start()
+    # (test index, thread number, stress action) of all the threads
+    test_runs = []
+    for index, test in enumerate(tests):
         if test.get('use_admin', False):
             manager = admin_manager
         else:
@@ -155,33 +212,46 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
 
             test_obj = importutils.import_class(test['action'])
             test_run = test_obj(manager, max_runs, stop_on_error)
+            if 'rate' in test:
+                threads = test.get('threads', default_thread_num)
+                test_run.load_profile = load_profile.LoadProfile(
+                    test['rate'], share=1.0 / threads)
+                test_run.phase = float(p_number) / threads
 
             kwargs = test.get('kwargs', {})
             test_run.setUp(**dict(kwargs.iteritems()))
 
             LOG.debug("calling Target Object %s" %
                       test_run.__class__.__name__)
+            test_runs.append((index, p_number, test_run))
 
-            mp_manager = multiprocessing.Manager()
-            shared_statistic = mp_manager.dict()
-            shared_statistic['runs'] = 0
-            shared_statistic['fails'] = 0
-
-            p = multiprocessing.Process(target=test_run.execute,
-                                        args=(shared_statistic,))
-
-            process = {'process': p,
-                       'p_number': p_number,
-                       'action': test_run.action,
-                       'statistic': shared_statistic}
-
-            processes.append(process)
-            p.start()
+    # One slot of counters per process, or per test in each worker for the
+    # actors, in a single shared memory block
+    statistics = stats.SharedStatistics(len(test_runs))
+    if runner == 'actor':
+        started = _start_actors(test_runs, statistics,
+                                CONF.stress.actor_workers)
+    else:
+        started = _start_processes(test_runs, statistics)
+    for process in started:
+        processes.append(process)
+    # The actors of a worker share its process
+    for p in set(process['process'] for process in started):
+        p.start()
     if stop_on_error:
         # NOTE(mkoderer): only the parent should register the handler
         signal.signal(signal.SIGCHLD, sigchld_handler)
-    end_time = time.time() + duration
+    start_time = time.time()
+    end_time = start_time + duration
     had_errors = False
+    interval = log_check_interval
+    if timeseries is not None:
+        timeseries.start()
+        interval = min(interval, CONF.stress.stats_interval)
+    # Logs are checked every log_check_interval, i.e. every n intervals
+    log_check_every = max(int(round(log_check_interval / float(interval))),
+                          1)
+    ticks = 0
     try:
         while True:
             if max_runs is None:
@@ -189,7 +259,7 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
                 if remaining <= 0:
                     break
             else:
-                remaining = log_check_interval
+                remaining = interval
                 all_proc_term = True
                 for process in processes:
                     if process['process'].is_alive():
@@ -198,34 +268,43 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
                 if all_proc_term:
                     break
 
-            time.sleep(min(remaining, log_check_interval))
+            if stopping is None:
+                time.sleep(min(remaining, interval))
+            elif stopping.wait(min(remaining, interval)):
+                break
+            ticks += 1
+            if timeseries is not None:
+                timeseries.sample(_action_totals(started))
             if stop_on_error:
                 if any([True for proc in processes
                         if proc['statistic']['fails'] > 0]):
                     break
 
-            if not logfiles:
+            if watcher is None or ticks % log_check_every:
                 continue
-            if _has_error_in_logs(logfiles, computes, ssh_user, ssh_key,
-                                  stop_on_error):
+            if watcher.has_errors():
                 had_errors = True
                 break
     except KeyboardInterrupt:
         LOG.warning("Interrupted, going to print statistics and exit ...")
+    finally:
+        if watcher is not None:
+            watcher.close()
 
     if stop_on_error:
         signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    elapsed = time.time() - start_time
+    if timeseries is not None:
+        timeseries.sample(_action_totals(started))
     terminate_all_processes()
 
-    sum_fails = 0
-    sum_runs = 0
+    sum_fails = statistics.total('fails')
+    sum_runs = statistics.total('runs')
+    if sum_fails > 0:
+        had_errors = True
 
     LOG.info("Statistics (per process):")
     for process in processes:
-        if process['statistic']['fails'] > 0:
-            had_errors = True
-        sum_runs += process['statistic']['runs']
-        sum_fails += process['statistic']['fails']
         LOG.info(" Process %d (%s): Run %d actions (%d failed)" %
                  (process['p_number'],
                   process['action'],
@@ -234,8 +313,18 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
     LOG.info("Summary:")
     LOG.info("Run %d actions (%d failed)" %
              (sum_runs, sum_fails))
+    run_results = stats.StressResults(elapsed)
+    for process in started:
+        run_results.add(process['action'], process['statistic']['runs'],
+                        process['statistic']['fails'],
+                        process['statistic'].histogram,
+                        process['statistic']['bytes'])
+    for line in run_results.format_summary():
+        LOG.info(line)
+    if results is not None:
+        results.merge(run_results)
 
-    if not had_errors and CONF.stress.full_clean_stack:
+    if clean and not had_errors and CONF.stress.full_clean_stack:
         LOG.info("cleaning up")
         cleanup.cleanup()
     if had_errors:
@@ -0,0 +1,132 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Target rates of the open-loop stress actions.
+
+A test of the JSON description runs in open loop when it has a "rate":
+
+    {"action": "tempest.stress.actions.ssh_floating.FloatingStress",
+     "threads": 4,
+     "rate": {"profile": "ramp", "ops_per_sec": 2, "ramp_time": 120}}
+
+The rate is the total of the threads of the test, each of them runs its
+share. The profiles are:
+
+    constant: ops_per_sec all along
+    ramp: from start_ops_per_sec (0) to ops_per_sec in ramp_time seconds
+    step: from start_ops_per_sec (step_ops_per_sec), step_ops_per_sec more
+          every step_time seconds, up to ops_per_sec
+    spike: ops_per_sec, and spike_ops_per_sec from spike_time seconds for
+           spike_duration seconds
+"""
+
+# Time in seconds between two checks of a profile while its rate is 0
+IDLE_STEP = 0.1
+
+
+class LoadProfile(object):
+    """Target rate of an action over time
+
+    :param spec: "rate" of the test in the JSON description
+    :param share: share of the rate of this process
+    """
+
+    profiles = ('constant', 'ramp', 'step', 'spike')
+
+    def __init__(self, spec, share=1.0):
+        self.profile = spec.get('profile', 'constant')
+        if self.profile not in self.profiles:
+            raise ValueError("Unknown load profile '%s', expected one of %s"
+                             % (self.profile, ', '.join(self.profiles)))
+        if 'ops_per_sec' not in spec:
+            raise ValueError("The rate of a test needs ops_per_sec")
+        if share <= 0:
+            raise ValueError("The share of a rate must be positive")
+        self.share = share
+        self.ops_per_sec = float(spec['ops_per_sec'])
+        self.ramp_time = float(spec.get('ramp_time', 60))
+        self.step_time = float(spec.get('step_time', 60))
+        self.step_ops_per_sec = float(spec.get('step_ops_per_sec',
+                                               self.ops_per_sec / 4))
+        self.start_ops_per_sec = float(spec.get(
+            'start_ops_per_sec',
+            self.step_ops_per_sec if self.profile == 'step' else 0))
+        self.spike_time = float(spec.get('spike_time', 60))
+        self.spike_duration = float(spec.get('spike_duration', 10))
+        self.spike_ops_per_sec = float(spec.get('spike_ops_per_sec',
+                                                self.ops_per_sec * 4))
+        # The profile would never run, or never stop idling
+        if self.ops_per_sec <= 0:
+            raise ValueError("ops_per_sec must be positive")
+        if self.profile == 'step' and (self.step_ops_per_sec <= 0 or
+                                       self.step_time <= 0):
+            raise ValueError("step_ops_per_sec and step_time must be "
+                             "positive")
+        if min(self.start_ops_per_sec, self.spike_ops_per_sec) < 0:
+            raise ValueError("The rates of a profile can't be negative")
+
+    def positive_after(self):
+        """Returns the elapsed time after which the rate is positive"""
+        if self.profile == 'ramp':
+            return self.ramp_time
+        if self.profile == 'step':
+            return self.step_time
+        if self.profile == 'spike':
+            return self.spike_time + self.spike_duration
+        return 0.0
+
+    def rate_at(self, elapsed):
+        """Returns the target rate of this process after elapsed seconds"""
+        rate = self.ops_per_sec
+        if self.profile == 'ramp' and elapsed < self.ramp_time:
+            rate = self.start_ops_per_sec + (
+                (self.ops_per_sec - self.start_ops_per_sec) *
+                elapsed / self.ramp_time)
+        elif self.profile == 'step':
+            steps = int(elapsed // self.step_time)
+            rate = min(self.start_ops_per_sec +
+                       steps * self.step_ops_per_sec, self.ops_per_sec)
+        elif self.profile == 'spike' and (
+                self.spike_time <= elapsed <
+                self.spike_time + self.spike_duration):
+            rate = self.spike_ops_per_sec
+        return rate * self.share
+
+    def schedule(self, start_time, phase=0.0):
+        """Yields the intended start times of the runs
+
+        The runs are scheduled on time slots following the rate, whatever
+        the time the previous runs took.
+
+        :param phase: offset of the first slot, as a share of the interval,
+                      so that the processes of a test don't run in bursts
+        """
+        elapsed = 0.0
+        first = True
+        while True:
+            rate = self.rate_at(elapsed)
+            if rate <= 0:
+                if elapsed > self.positive_after():
+                    raise ValueError("The rate of the %s profile stays 0" %
+                                     self.profile)
+                elapsed += IDLE_STEP
+                continue
+            interval = 1.0 / rate
+            if first:
+                elapsed += phase * interval
+                first = False
+            yield start_time + elapsed
+            elapsed += interval
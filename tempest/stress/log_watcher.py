@@ -0,0 +1,129 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import re
+import threading
+
+from six import moves
+
+from tempest.common import ssh
+from tempest.common.utils import misc
+from tempest.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# Starts the output of each log file on a node
+MARKER = '@@tempest-log@@'
+
+
+class LogWatcher(object):
+    """Scans the log files of the nodes for errors, incrementally
+
+    The watcher remembers, per node and log file, the offset up to which
+    the file was scanned, and only reads what was written since. Each node
+    is reached over a single SSH connection kept for the whole run, and
+    the nodes are checked concurrently.
+
+    :param logfiles: shell pattern of the log files on the nodes
+    :param patterns: regular expressions of the errors to look for
+    """
+
+    def __init__(self, nodes, logfiles, ssh_user, ssh_key=None,
+                 patterns=('ERROR', 'TRACE'), max_workers=10):
+        self.nodes = list(nodes)
+        self.logfiles = logfiles
+        self.max_workers = max_workers
+        self.pattern = re.compile('|'.join('(?:%s)' % pattern
+                                           for pattern in patterns))
+        self._grep_pattern = moves.shlex_quote('|'.join(patterns))
+        self._clients = dict(
+            (node, ssh.Client(node, ssh_user, key_filename=ssh_key,
+                              keep_connection=True))
+            for node in self.nodes)
+        self._lock = threading.Lock()
+        # (node, log file) -> (inode, offset scanned up to)
+        self.offsets = {}
+
+    def _command(self, node, scan):
+        """Returns the shell command reading the new lines of the node
+
+        For each log file, the command prints a marker line with the name,
+        inode and size of the file, then, when scan is True, the lines
+        written since the offset which match the patterns. A file which was
+        rotated or truncated is read from the start.
+        """
+        with self._lock:
+            offsets = dict((path, offset)
+                           for (offset_node, path), offset
+                           in self.offsets.items() if offset_node == node)
+        cases = ''.join('%s) i=%s; o=%d;; ' % (moves.shlex_quote(path),
+                                               inode, offset)
+                        for path, (inode, offset) in sorted(offsets.items()))
+        command = ('for f in %s; do [ -f "$f" ] || continue; '
+                   'n=$(stat -c %%i "$f"); s=$(stat -c %%s "$f"); i=; o=0; '
+                   'case "$f" in %s*) ;; esac; '
+                   '[ "$n" != "$i" -o "$s" -lt "$o" ] && o=0; '
+                   'echo "%s $n $s $f"; ' % (self.logfiles, cases, MARKER))
+        if scan:
+            command += ('tail -c +$((o + 1)) "$f" | head -c $((s - o)) | '
+                        'grep -aE %s; ' % self._grep_pattern)
+        # grep fails when nothing matches
+        return command + 'done; true'
+
+    def _read_node(self, node, scan=True):
+        output = self._clients[node].exec_command(self._command(node, scan))
+        errors = []
+        sizes = {}
+        path = None
+        for line in output.splitlines():
+            if line.startswith(MARKER + ' '):
+                inode, size, path = line[len(MARKER) + 1:].split(' ', 2)
+                sizes[path] = (inode, int(size))
+            elif path is not None and self.pattern.search(line):
+                errors.append('%s: %s' % (path, line))
+        with self._lock:
+            for path, size in sizes.items():
+                self.offsets[(node, path)] = size
+        return errors
+
+    def start(self):
+        """Skips what the log files already contain"""
+        misc.run_concurrently(lambda node: self._read_node(node, scan=False),
+                              self.nodes, max_workers=self.max_workers,
+                              raise_on_error=False)
+
+    def check(self):
+        """Returns the new errors of each node, as a dict node -> errors"""
+        results = misc.run_concurrently(self._read_node, self.nodes,
+                                        max_workers=self.max_workers,
+                                        raise_on_error=False)
+        errors = {}
+        for node, result in zip(self.nodes, results):
+            if isinstance(result, Exception):
+                LOG.error("Failed to check the logs of %s: %s" % (node,
+                                                                  result))
+            elif result:
+                errors[node] = result
+        return errors
+
+    def has_errors(self):
+        errors = self.check()
+        for node, node_errors in sorted(errors.items()):
+            LOG.error('%s: %s' % (node, '\n'.join(node_errors)))
+        return bool(errors)
+
+    def close(self):
+        for client in self._clients.values():
+            client.close()
@@ -0,0 +1,354 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ctypes
+import json
+import multiprocessing
+import time
+
+# Latencies are recorded in microseconds in log-linear buckets: values below
+# 2 ** SUB_BUCKET_BITS have a bucket each, then each power of two is split
+# in 2 ** (SUB_BUCKET_BITS - 1) buckets, which keeps the relative error of
+# any recorded value under 2%.
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 2 ** SUB_BUCKET_BITS
+HALF_SUB_BUCKETS = SUB_BUCKETS // 2
+# Up to 2 ** 32 us, i.e. more than an hour
+MAX_SHIFT = 32 - SUB_BUCKET_BITS + 1
+BUCKETS = SUB_BUCKETS + MAX_SHIFT * HALF_SUB_BUCKETS
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def _bucket_index(value):
+    if value < SUB_BUCKETS:
+        return max(int(value), 0)
+    shift = int(value).bit_length() - SUB_BUCKET_BITS
+    if shift > MAX_SHIFT:
+        return BUCKETS - 1
+    return (SUB_BUCKETS + (shift - 1) * HALF_SUB_BUCKETS +
+            (int(value) >> shift) - HALF_SUB_BUCKETS)
+
+
+def _bucket_value(index):
+    """Returns the highest value of the bucket index"""
+    if index < SUB_BUCKETS:
+        return index
+    shift, sub_bucket = divmod(index - SUB_BUCKETS, HALF_SUB_BUCKETS)
+    shift += 1
+    return ((sub_bucket + HALF_SUB_BUCKETS + 1) << shift) - 1
+
+
+class LatencyHistogram(object):
+    """HDR style histogram of latencies
+
+    Histograms have the same buckets and can be merged, e.g. the histograms
+    of all the processes running an action. The counts are either a list of
+    their own or a part of a shared array, starting at offset.
+    """
+
+    def __init__(self, counts=None, offset=0):
+        self._counts = [0] * BUCKETS if counts is None else counts
+        self._offset = offset
+
+    def record(self, seconds):
+        self._counts[self._offset + _bucket_index(seconds * 1000000)] += 1
+
+    def counts(self):
+        return self._counts[self._offset:self._offset + BUCKETS]
+
+    @property
+    def count(self):
+        return sum(self.counts())
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts()):
+            if count:
+                self._counts[self._offset + index] += count
+        return self
+
+    def percentile(self, percentile):
+        """Returns the latency of the percentile in seconds, or None"""
+        counts = self.counts()
+        total = sum(counts)
+        if not total:
+            return None
+        threshold = max(total * percentile / 100.0, 1)
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= threshold:
+                return _bucket_value(index) / 1000000.0
+
+    def to_dict(self):
+        return dict((str(index), count)
+                    for index, count in enumerate(self.counts()) if count)
+
+    @classmethod
+    def from_dict(cls, counts):
+        histogram = cls()
+        for index, count in counts.items():
+            histogram._counts[int(index)] = count
+        return histogram
+
+
+class SharedStatistics(object):
+    """Counters of all the stress processes in a shared memory block
+
+    The block is allocated by the driver before forking the processes,
+    which inherit it. Each process gets its own slot of counters and is the
+    only one writing to it, so neither the processes nor the driver reading
+    the counters need any lock.
+    """
+
+    fields = ('runs', 'fails', 'bytes')
+
+    def __init__(self, size):
+        self.size = size
+        self._counters = multiprocessing.RawArray(ctypes.c_long,
+                                                  size * len(self.fields))
+        self._histograms = multiprocessing.RawArray(ctypes.c_long,
+                                                    size * BUCKETS)
+
+    def slot(self, index):
+        """Returns the counters of the process number index"""
+        if not 0 <= index < self.size:
+            raise IndexError("No statistics slot %d" % index)
+        return StatisticsSlot(self._counters, index * len(self.fields),
+                              self.fields,
+                              LatencyHistogram(self._histograms,
+                                               index * BUCKETS))
+
+    def total(self, field):
+        offset = self.fields.index(field)
+        return sum(self._counters[offset::len(self.fields)])
+
+
+class StatisticsSlot(object):
+    """Counters of one stress process, used as a dict of field -> count"""
+
+    def __init__(self, counters, start, fields, histogram=None):
+        self._counters = counters
+        self._start = start
+        self._fields = fields
+        self.histogram = histogram
+
+    def _index(self, field):
+        try:
+            return self._start + self._fields.index(field)
+        except ValueError:
+            raise KeyError(field)
+
+    def __getitem__(self, field):
+        return self._counters[self._index(field)]
+
+    def __setitem__(self, field, value):
+        self._counters[self._index(field)] = value
+
+    def __contains__(self, field):
+        return field in self._fields
+
+    def keys(self):
+        return list(self._fields)
+
+    def to_dict(self):
+        return dict((field, self[field]) for field in self._fields)
+
+
+class StressResults(object):
+    """Runs, failures and latencies of the actions of stress runs"""
+
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        # action -> {'runs': runs, 'fails': fails, 'bytes': bytes
+        #            transferred, 'histogram': histogram}
+        self.actions = {}
+
+    def add(self, action, runs, fails, histogram=None, transferred=0):
+        result = self.actions.setdefault(
+            action, {'runs': 0, 'fails': 0, 'bytes': 0,
+                     'histogram': LatencyHistogram()})
+        result['runs'] += runs
+        result['fails'] += fails
+        result['bytes'] += transferred
+        if histogram is not None:
+            result['histogram'].merge(histogram)
+
+    def merge(self, other, concurrent=False):
+        """Adds the results of another run
+
+        :param concurrent: whether the other run ran at the same time, e.g.
+                           on another host, rather than after this one
+        """
+        if concurrent:
+            self.duration = max(self.duration, other.duration)
+        else:
+            self.duration += other.duration
+        for action, result in other.actions.items():
+            self.add(action, result['runs'], result['fails'],
+                     result['histogram'], result['bytes'])
+        return self
+
+    def summary(self, action):
+        """Returns the throughput, error rate and percentiles of an action"""
+        result = self.actions[action]
+        summary = {
+            'runs': result['runs'],
+            'fails': result['fails'],
+            'ops_per_sec': (result['runs'] / self.duration
+                            if self.duration else 0.0),
+            'bytes_per_sec': (result['bytes'] / self.duration
+                              if self.duration else 0.0),
+            'error_rate': (float(result['fails']) / result['runs']
+                           if result['runs'] else 0.0),
+        }
+        for percentile in PERCENTILES:
+            summary['p%s' % percentile] = result['histogram'].percentile(
+                percentile)
+        return summary
+
+    def format_summary(self):
+        lines = []
+        for action in sorted(self.actions):
+            summary = self.summary(action)
+            latencies = ', '.join(
+                'p%s %s' % (percentile, _format_latency(
+                    summary['p%s' % percentile]))
+                for percentile in PERCENTILES)
+            throughput = '%.2f ops/s' % summary['ops_per_sec']
+            if self.actions[action]['bytes']:
+                throughput += ', %s' % _format_bytes_rate(
+                    summary['bytes_per_sec'])
+            lines.append("%s: %d runs (%d failed, %.1f%%), %s, %s" % (
+                action, summary['runs'], summary['fails'],
+                summary['error_rate'] * 100, throughput, latencies))
+        return lines
+
+    def to_dict(self):
+        return {'duration': self.duration,
+                'actions': dict(
+                    (action, {'runs': result['runs'],
+                              'fails': result['fails'],
+                              'bytes': result['bytes'],
+                              'histogram': result['histogram'].to_dict()})
+                    for action, result in self.actions.items())}
+
+    @classmethod
+    def from_dict(cls, results_dict):
+        results = cls(results_dict['duration'])
+        for action, result in results_dict['actions'].items():
+            results.add(action, result['runs'], result['fails'],
+                        LatencyHistogram.from_dict(result['histogram']),
+                        result.get('bytes', 0))
+        return results
+
+    def save(self, path):
+        with open(path, 'w') as results_file:
+            json.dump(self.to_dict(), results_file, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as results_file:
+            return cls.from_dict(json.load(results_file))
+
+
+def _format_latency(seconds):
+    if seconds is None:
+        return '-'
+    return '%.1fms' % (seconds * 1000)
+
+
+def _format_bytes_rate(bytes_per_sec):
+    for unit in ('B', 'KB', 'MB'):
+        if bytes_per_sec < 1024:
+            return '%.1f %s/s' % (bytes_per_sec, unit)
+        bytes_per_sec /= 1024.0
+    return '%.1f GB/s' % bytes_per_sec
+
+
+def compare_results(baseline, results, threshold=10.0):
+    """Returns the regressions of results compared to baseline
+
+    A regression is a percentile latency or error rate higher, or a
+    throughput lower, by more than threshold percent.
+    """
+    regressions = []
+    for action in sorted(set(baseline.actions) & set(results.actions)):
+        old = baseline.summary(action)
+        new = results.summary(action)
+        for percentile in PERCENTILES:
+            key = 'p%s' % percentile
+            if old[key] and new[key] and (
+                    new[key] > old[key] * (1 + threshold / 100.0)):
+                regressions.append("%s: %s latency %s -> %s" % (
+                    action, key, _format_latency(old[key]),
+                    _format_latency(new[key])))
+        if new['error_rate'] > old['error_rate'] * (1 + threshold / 100.0):
+            regressions.append("%s: error rate %.1f%% -> %.1f%%" % (
+                action, old['error_rate'] * 100, new['error_rate'] * 100))
+        if new['ops_per_sec'] < old['ops_per_sec'] * (1 - threshold / 100.0):
+            regressions.append("%s: throughput %.2f -> %.2f ops/s" % (
+                action, old['ops_per_sec'], new['ops_per_sec']))
+        if new['bytes_per_sec'] < old['bytes_per_sec'] * (
+                1 - threshold / 100.0):
+            regressions.append("%s: throughput %s -> %s" % (
+                action, _format_bytes_rate(old['bytes_per_sec']),
+                _format_bytes_rate(new['bytes_per_sec'])))
+    return regressions
+
+
+class TimeSeries(object):
+    """Writes the throughput and error rate of the actions at intervals
+
+    Each sample is a CSV line with the time, the action, the runs and
+    failures since the previous sample, the throughput in ops/sec and the
+    error rate of the interval.
+    """
+
+    header = 'time,action,runs,fails,ops_per_sec,error_rate\n'
+
+    def __init__(self, path):
+        self._file = open(path, 'w')
+        self._file.write(self.header)
+        self.start()
+
+    def start(self):
+        """Starts sampling a new stress run, with its totals back to 0"""
+        self._last_time = time.time()
+        # action -> (runs, fails) at the previous sample
+        self._last = {}
+
+    def sample(self, totals):
+        """Writes a sample from the current totals
+
+        :param totals: dict of action -> (runs, fails) since the start
+        """
+        now = time.time()
+        interval = now - self._last_time
+        for action in sorted(totals):
+            runs, fails = totals[action]
+            last_runs, last_fails = self._last.get(action, (0, 0))
+            runs -= last_runs
+            fails -= last_fails
+            self._file.write('%.3f,%s,%d,%d,%.3f,%.4f\n' % (
+                now, action, runs, fails,
+                runs / interval if interval > 0 else 0.0,
+                float(fails) / runs if runs else 0.0))
+        self._file.flush()
+        self._last = dict(totals)
+        self._last_time = now
+
+    def close(self):
+        self._file.close()
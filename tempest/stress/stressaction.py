@@ -15,6 +15,7 @@
 import abc
 import signal
 import sys
+import time
 
 import six
 
@@ -24,12 +25,17 @@ from tempest.openstack.common import log as logging
 @six.add_metaclass(abc.ABCMeta)
 class StressAction(object):
 
-    def __init__(self, manager, max_runs=None, stop_on_error=False):
+    def __init__(self, manager, max_runs=None, stop_on_error=False,
+                 load_profile=None, phase=0.0):
         full_cname = self.__module__ + "." + self.__class__.__name__
         self.logger = logging.getLogger(full_cname)
         self.manager = manager
         self.max_runs = max_runs
         self.stop_on_error = stop_on_error
+        # Runs in open loop, at the rate of the LoadProfile, when set
+        self.load_profile = load_profile
+        self.phase = phase
+        self._statistic = None
 
     def _shutdown_handler(self, signal, frame):
         try:
@@ -55,6 +61,11 @@ class StressAction(object):
         """
         self.logger.debug("setUp")
 
+    def count_bytes(self, size):
+        """Counts bytes transferred by the run, for the throughput"""
+        if self._statistic is not None and 'bytes' in self._statistic:
+            self._statistic['bytes'] += size
+
     def tearDown(self):
         """This method is called to do any cleanup
         after the test is complete.
@@ -65,21 +76,55 @@ class StressAction(object):
         """This is the main execution entry point called
         by the driver.   We register a signal handler to
         allow us to tearDown gracefully, and then exit.
-        We also keep track of how many runs we do.
         """
         signal.signal(signal.SIGHUP, self._shutdown_handler)
         signal.signal(signal.SIGTERM, self._shutdown_handler)
+        self.run_loop(shared_statistic)
+
+    def run_loop(self, shared_statistic, stopping=None):
+        """Runs the action until max_runs, or until stopping is set
+
+        We keep track of how many runs we do, and of their
+        latency when the statistics have a histogram.
+
+        With a load profile, the runs start on the time slots of its
+        schedule instead of back to back. Their latency is then measured
+        from the start of their slot, so that the time a run waited for the
+        previous ones to finish is accounted for (coordinated omission).
+
+        :param stopping: threading.Event telling the loop to stop, for the
+                         actions run in threads
+        """
+        self._statistic = shared_statistic
+        histogram = getattr(shared_statistic, 'histogram', None)
+        schedule = None
+        if self.load_profile is not None:
+            schedule = self.load_profile.schedule(time.time(), self.phase)
 
         while self.max_runs is None or (shared_statistic['runs'] <
                                         self.max_runs):
+            if stopping is not None and stopping.is_set():
+                return
             self.logger.debug("Trigger new run (run %d)" %
                               shared_statistic['runs'])
+            if schedule is None:
+                start = time.time()
+            else:
+                start = next(schedule)
+                delay = start - time.time()
+                if delay > 0:
+                    if stopping is None:
+                        time.sleep(delay)
+                    elif stopping.wait(delay):
+                        return
             try:
                 self.run()
             except Exception:
                 shared_statistic['fails'] += 1
                 self.logger.exception("Failure in run")
             finally:
+                if histogram is not None:
+                    histogram.record(time.time() - start)
                 shared_statistic['runs'] += 1
                 if self.stop_on_error and (shared_statistic['fails'] > 1):
                     self.logger.warn("Stop process due to"
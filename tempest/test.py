@@ -29,8 +29,14 @@ import testscenarios
 import testtools
 
 from tempest import clients
+from tempest.common import accounts
 from tempest.common import credentials
+from tempest.common import discovery_cache
 import tempest.common.generator.valid_generator as valid
+from tempest.common import http
+from tempest.common import polling
+from tempest.common import rest_client
+from tempest.common import token_cache
 from tempest import config
 from tempest import exceptions
 from tempest.openstack.common import importutils
@@ -203,6 +209,10 @@ def is_extension_enabled(extension_name, service):
     if len(config_dict[service]) == 0:
         return False
     if config_dict[service][0] == 'all':
+        if CONF.discovery.check_extensions:
+            extensions = discovery_cache.get_discovered_extensions(service)
+            if extensions is not None:
+                return extension_name in extensions
         return True
     if extension_name in config_dict[service]:
         return True
@@ -222,6 +232,23 @@ def validate_tearDownClass():
 
 atexit.register(validate_tearDownClass)
 
+
+def log_run_stats():
+    stats = rest_client.RestClient.validation_stats
+    if stats.validated or stats.skipped:
+        LOG.info("Response validation: %s" % stats)
+    if CONF.auth.token_cache:
+        LOG.info("Token cache: %s" % token_cache.get_token_cache())
+    if polling.wait_stats.to_dict():
+        LOG.info("Waits: %s" % polling.wait_stats)
+    if accounts.allocation_stats.acquires:
+        LOG.info("Test accounts: %s" % accounts.allocation_stats)
+    if http.pool_stats.requests:
+        LOG.info("HTTP connections: %s" % http.pool_stats)
+
+
+atexit.register(log_run_stats)
+
 if sys.version_info >= (2, 7):
     class BaseDeps(testtools.TestCase,
                    testtools.testcase.WithAttributes,
@@ -0,0 +1,213 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import mock
+
+from tempest.cmd import cleanup_service
+from tempest import config
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+def _make_manager(**clients):
+    manager = mock.Mock()
+    for name, client in clients.items():
+        setattr(manager, name, client)
+    return manager
+
+
+class TestDeletionEngine(base.TestCase):
+
+    def setUp(self):
+        super(TestDeletionEngine, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.engine = cleanup_service.DeletionEngine(max_workers=4)
+        self.addCleanup(self.engine.shutdown)
+        self.kwargs = {'data': {}, 'is_dry_run': False,
+                       'saved_state_json': None, 'is_preserve': False,
+                       'is_save_state': False, 'tenant_id': 'tenant'}
+
+    def _network_services(self, client):
+        manager = _make_manager(network_client=client)
+        return [service(manager, **self.kwargs) for service in
+                (cleanup_service.NetworkService,
+                 cleanup_service.NetworkSubnetService,
+                 cleanup_service.NetworkPortService)]
+
+    def test_dependency_order(self):
+        client = mock.Mock()
+        calls = []
+        client.list_networks.return_value = (None, {'networks': [
+            {'id': 'net%d' % i, 'tenant_id': 'tenant'} for i in range(3)]})
+        client.list_subnets.return_value = (None, {'subnets': [
+            {'id': 'subnet%d' % i, 'tenant_id': 'tenant'} for i in range(3)]})
+        client.list_ports.return_value = (None, {'ports': [
+            {'id': 'port%d' % i, 'tenant_id': 'tenant'} for i in range(3)]})
+        client.delete_network.side_effect = lambda id: calls.append(id)
+        client.delete_subnet.side_effect = lambda id: calls.append(id)
+        client.delete_port.side_effect = lambda id: calls.append(id)
+        self.engine.run(self._network_services(client))
+        self.assertEqual(['port'] * 3 + ['subnet'] * 3 + ['net'] * 3,
+                         [call.rstrip('012') for call in calls])
+        self.assertEqual([9, 0, 0], self.engine.stats.totals())
+
+    def test_failures_are_left(self):
+        client = mock.Mock()
+        client.list_ports.return_value = (None, {'ports': [
+            {'id': 'port1'}, {'id': 'port2'}]})
+        client.delete_port.side_effect = [None, Exception('conflict')]
+        manager = _make_manager(network_client=client)
+        service = cleanup_service.NetworkPortService(manager, **self.kwargs)
+        self.engine.run([service])
+        self.assertEqual([1, 1, 1], self.engine.stats.totals())
+        self.assertEqual({'NetworkPortService': 1}, self.engine.stats.left())
+
+    def test_max_concurrency(self):
+        client = mock.Mock()
+        client.list_ports.return_value = (None, {'ports': [
+            {'id': 'port%d' % i} for i in range(8)]})
+        lock = threading.Lock()
+        in_flight = [0, 0]
+        overlapped = threading.Event()
+
+        def delete_port(port_id):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+                if in_flight[0] == 2:
+                    overlapped.set()
+            # Hold the first deletions until two of them overlap
+            overlapped.wait(5)
+            with lock:
+                in_flight[0] -= 1
+
+        client.delete_port.side_effect = delete_port
+        manager = _make_manager(network_client=client)
+        service = cleanup_service.NetworkPortService(manager, **self.kwargs)
+        service.max_concurrency = 2
+        self.engine.run([service])
+        self.assertTrue(overlapped.is_set())
+        self.assertLessEqual(in_flight[1], 2)
+        self.assertEqual(8, client.delete_port.call_count)
+
+    def test_cyclic_dependencies(self):
+        services = self._network_services(mock.Mock())
+        services[2].depends_on = ('NetworkService',)
+        self.assertRaises(ValueError, self.engine.run, services)
+
+    def test_wait_for_deletion_in_bulk(self):
+        client = mock.Mock()
+        client.build_interval = 0
+        client.build_timeout = 10
+        servers = [{'id': 'server%d' % i} for i in range(3)]
+        client.list_servers.side_effect = [
+            (None, {'servers': servers}),
+            (None, {'servers': servers[1:]}),
+            (None, {'servers': []})]
+        manager = _make_manager(servers_client=client)
+        service = cleanup_service.ServerService(manager, **self.kwargs)
+        self.patch('time.sleep')
+        self.engine.run([service])
+        self.assertEqual(3, client.delete_server.call_count)
+        # Listed once to find the servers, then once per poll
+        self.assertEqual(3, client.list_servers.call_count)
+        self.assertEqual([3, 0, 0], self.engine.stats.totals())
+
+    def test_dry_run(self):
+        self.kwargs['is_dry_run'] = True
+        client = mock.Mock()
+        client.list_ports.return_value = (None, {'ports': [{'id': 'port'}]})
+        manager = _make_manager(network_client=client)
+        service = cleanup_service.NetworkPortService(manager, **self.kwargs)
+        self.engine.run([service])
+        self.assertEqual([{'id': 'port'}], self.kwargs['data']['ports'])
+        self.assertFalse(client.delete_port.called)
+
+    def test_router_delete_item(self):
+        client = mock.Mock()
+        client.list_router_interfaces.return_value = (None, {'ports': [
+            {'fixed_ips': [{'subnet_id': 'subnet1'}]},
+            {'fixed_ips': [{'subnet_id': 'subnet2'}]}]})
+        manager = _make_manager(network_client=client)
+        service = cleanup_service.NetworkRouterService(manager,
+                                                       **self.kwargs)
+        service.delete_item({'id': 'router'})
+        self.assertEqual(2, client.remove_router_interface_with_subnet_id.
+                         call_count)
+        client.delete_router.assert_called_once_with('router')
+
+
+class TestListing(base.TestCase):
+
+    def setUp(self):
+        super(TestListing, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.client = mock.Mock()
+        self.kwargs = {'data': {}, 'is_dry_run': False,
+                       'saved_state_json': None, 'is_preserve': False,
+                       'is_save_state': False, 'tenant_id': 'tenant'}
+
+    def _service(self, service_class=cleanup_service.NetworkPortService,
+                 **kwargs):
+        self.kwargs.update(kwargs)
+        manager = _make_manager(network_client=self.client,
+                                servers_client=self.client)
+        service = service_class(manager, **self.kwargs)
+        service.page_size = 2
+        return service
+
+    def test_paginated_listing(self):
+        ports = [{'id': 'port%d' % i, 'tenant_id': 'tenant'}
+                 for i in range(5)]
+        self.client.list_ports.side_effect = [
+            (None, {'ports': ports[:2]}), (None, {'ports': ports[2:4]}),
+            (None, {'ports': ports[4:]})]
+        listed = self._service().list()
+        self.assertEqual(ports[0], next(listed))
+        # The next page is requested before the first one is used up
+        self.assertEqual(2, self.client.list_ports.call_count)
+        self.assertEqual(ports[1:], list(listed))
+        self.assertEqual(
+            [mock.call(limit=2, tenant_id='tenant'),
+             mock.call(limit=2, marker='port1', tenant_id='tenant'),
+             mock.call(limit=2, marker='port3', tenant_id='tenant')],
+            self.client.list_ports.call_args_list)
+
+    def test_pagination_not_supported(self):
+        ports = [{'id': 'port%d' % i} for i in range(3)]
+        self.client.list_ports.return_value = (None, {'ports': ports})
+        self.assertEqual(ports, list(self._service().list()))
+        self.assertEqual(2, self.client.list_ports.call_count)
+
+    def test_filters(self):
+        ports = [{'id': 'port1', 'tenant_id': 'tenant', 'name': 'tempest-1'},
+                 {'id': 'port2', 'tenant_id': 'other', 'name': 'tempest-2'},
+                 {'id': 'port3', 'tenant_id': 'tenant', 'name': 'mine'}]
+        self.client.list_ports.return_value = (None, {'ports': ports})
+        listed = list(self._service(prefix='tempest').list())
+        self.assertEqual([ports[0]], listed)
+
+    def test_server_name_filter(self):
+        self.client.list_servers.return_value = (None, {'servers': [
+            {'id': 'server1', 'name': 'tempest.server'}]})
+        service = self._service(cleanup_service.ServerService,
+                                prefix='tempest.')
+        self.assertEqual(1, len(list(service.list())))
+        self.client.list_servers.assert_called_once_with(
+            {'limit': 2, 'name': '^tempest\\.'})
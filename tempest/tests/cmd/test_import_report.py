@@ -0,0 +1,57 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+
+from six.moves import builtins
+
+from tempest.cmd import import_report
+from tempest.tests import base
+
+
+class TestImportTimer(base.TestCase):
+
+    def setUp(self):
+        super(TestImportTimer, self).setUp()
+        # Make sure colorsys is imported by the tests
+        colorsys = sys.modules.pop('colorsys', None)
+        if colorsys is not None:
+            self.addCleanup(sys.modules.__setitem__, 'colorsys', colorsys)
+        self.import_func = builtins.__import__
+
+    def test_time_imports(self):
+        with import_report.ImportTimer() as timer:
+            import colorsys  # noqa
+            import colorsys  # noqa
+            import os  # noqa
+        self.assertIs(self.import_func, builtins.__import__)
+        self.assertEqual(['colorsys'], timer.times.keys())
+        (name, cumulative, own), = timer.slowest()
+        self.assertEqual('colorsys', name)
+        self.assertTrue(cumulative >= own >= 0)
+
+    def test_slowest(self):
+        timer = import_report.ImportTimer()
+        timer.times = {'colorsys': [1.0, 1.0], 'json': [2.0, 0.5]}
+        self.assertEqual([('json', 2.0, 0.5), ('colorsys', 1.0, 1.0)],
+                         timer.slowest())
+        self.assertEqual([('json', 2.0, 0.5)], timer.slowest(1))
+
+    def test_restored_on_error(self):
+        def _import():
+            with import_report.ImportTimer():
+                import tempest_no_such_module  # noqa
+        self.assertRaises(ImportError, _import)
+        self.assertIs(self.import_func, builtins.__import__)
@@ -0,0 +1,122 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import mock
+
+from tempest.cmd import javelin
+from tempest import config
+from tempest import exceptions
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestTaskGraph(base.TestCase):
+
+    def setUp(self):
+        super(TestTaskGraph, self).setUp()
+        self.patch('tempest.cmd.javelin.LOG')
+        self.graph = javelin.TaskGraph()
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def _task(self, name):
+        def task():
+            with self.lock:
+                self.calls.append(name)
+        return task
+
+    def test_dependency_order(self):
+        self.graph.add('servers', self._task('servers'), ['user', 'image'])
+        self.graph.add('image', self._task('image'), ['user'])
+        self.graph.add('user', self._task('user'), ['tenant'])
+        self.graph.add('tenant', self._task('tenant'))
+        self.graph.run(4)
+        self.assertEqual(['tenant', 'user', 'image', 'servers'], self.calls)
+
+    def test_unknown_dependencies_are_ignored(self):
+        self.graph.add('image', self._task('image'), ['user:nobody'])
+        self.graph.run(4)
+        self.assertEqual(['image'], self.calls)
+
+    def test_failed_dependency_skips(self):
+        self.graph.add('user', mock.Mock(side_effect=Exception('boom')))
+        self.graph.add('image', self._task('image'), ['user'])
+        self.graph.add('object', self._task('object'))
+        self.assertRaises(exceptions.TempestException, self.graph.run, 4)
+        self.assertEqual(['object'], self.calls)
+
+    def test_cyclic_dependencies(self):
+        self.graph.add('a', self._task('a'), ['b'])
+        self.graph.add('b', self._task('b'), ['a'])
+        self.assertRaises(ValueError, self.graph.run, 4)
+        self.assertEqual([], self.calls)
+
+
+class TestNameCache(base.TestCase):
+
+    def test_listed_once(self):
+        list_images = mock.Mock(return_value=[
+            {'name': 'cirros', 'id': '1'}, {'name': 'cirros', 'id': '2'}])
+        cache = javelin.NameCache({'images': (list_images, 'name')})
+        self.assertEqual('1', cache.get('images', 'cirros')['id'])
+        self.assertIsNone(cache.get('images', 'fedora'))
+        cache.add('images', 'fedora', {'id': '3'})
+        self.assertEqual('3', cache.get('images', 'fedora')['id'])
+        cache.remove('images', 'cirros')
+        self.assertIsNone(cache.get('images', 'cirros'))
+        list_images.assert_called_once_with()
+
+
+class TestBulkWait(base.TestCase):
+
+    def setUp(self):
+        super(TestBulkWait, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.patch('time.sleep')
+        self.client = mock.Mock(build_interval=1, build_timeout=10)
+
+    def test_wait_for_status(self):
+        list_volumes = mock.Mock(side_effect=[
+            [{'id': '1', 'status': 'creating'},
+             {'id': '2', 'status': 'available'}],
+            [{'id': '1', 'status': 'available'},
+             {'id': '2', 'status': 'available'}]])
+        javelin._bulk_wait(self.client, list_volumes, ['1', '2'],
+                           'available', 'volume')
+        self.assertEqual(2, list_volumes.call_count)
+
+    def test_wait_for_deletion(self):
+        list_servers = mock.Mock(side_effect=[[{'id': '1'}], []])
+        javelin._bulk_wait(self.client, list_servers, ['1', '2'], None,
+                           'server')
+        self.assertEqual(2, list_servers.call_count)
+
+    def test_error_status(self):
+        list_volumes = mock.Mock(return_value=[{'id': '1',
+                                                'status': 'error'}])
+        self.assertRaises(exceptions.TempestException, javelin._bulk_wait,
+                          self.client, list_volumes, ['1'], 'available',
+                          'volume')
+
+    def test_timeout(self):
+        self.client.build_timeout = 0
+        list_volumes = mock.Mock(return_value=[{'id': '1',
+                                                'status': 'creating'}])
+        self.assertRaises(exceptions.TimeoutException, javelin._bulk_wait,
+                          self.client, list_volumes, ['1'], 'available',
+                          'volume')
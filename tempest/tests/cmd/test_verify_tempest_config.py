@@ -13,11 +13,14 @@
 #    under the License.
 
 import json
+import os
 
+import fixtures
 import mock
 from oslo.config import cfg
 
 from tempest.cmd import verify_tempest_config
+from tempest.common import discovery_cache
 from tempest import config
 from tempest.openstack.common.fixture import mockpatch
 from tempest.tests import base
@@ -415,3 +418,56 @@ class TestDiscovery(base.TestCase):
         self.assertIn('extensions', results['swift'])
         self.assertEqual(sorted(['not_fake', 'fake1', 'fake2']),
                          sorted(results['swift']['extensions']))
+
+
+class TestParallelDiscovery(base.TestCase):
+
+    def setUp(self):
+        super(TestParallelDiscovery, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'discovery_cache.json')
+        self.useFixture(mockpatch.PatchObject(
+            discovery_cache, '_discovery_cache',
+            discovery_cache.DiscoveryCache(path, ttl=60)))
+        self.useFixture(mockpatch.PatchObject(
+            verify_tempest_config, 'DISCOVERY',
+            {'versions': {}, 'extensions': {}}))
+        self.list_extensions = self.useFixture(mockpatch.PatchObject(
+            verify_tempest_config, '_list_extensions',
+            side_effect=lambda os, service: ['%s-ext' % service])).mock
+        self.get_api_versions = self.useFixture(mockpatch.PatchObject(
+            verify_tempest_config, '_get_api_versions',
+            return_value=['v2.0'])).mock
+        self.fake_os = mock.MagicMock()
+        self.fake_os.image_client.get_versions.return_value = (None,
+                                                               ['v1.0'])
+
+    def _discover(self, catalog_key='catalog', use_cache=True):
+        return verify_tempest_config.discover(
+            self.fake_os, ['nova', 'neutron'],
+            ['nova', 'neutron', 'glance', 'keystone'], catalog_key,
+            use_cache=use_cache)
+
+    def test_discover(self):
+        discovery = self._discover()
+        self.assertEqual({'nova': ['nova-ext'], 'neutron': ['neutron-ext']},
+                         discovery['extensions'])
+        self.assertEqual({'nova': ['v2.0'], 'keystone': ['v2.0'],
+                          'glance': ['v1.0']}, discovery['versions'])
+        # The verifications use the discovered results
+        results = verify_tempest_config.verify_extensions(self.fake_os,
+                                                          'nova', {})
+        self.assertEqual(['nova-ext'], results['nova']['extensions'])
+        self.assertEqual(2, self.list_extensions.call_count)
+        self.assertEqual(2, self.get_api_versions.call_count)
+
+    def test_discover_cached(self):
+        discovery = self._discover()
+        self.assertEqual(discovery, self._discover())
+        self.assertEqual(2, self.list_extensions.call_count)
+        # Another catalog or no cache: the services are queried again
+        self._discover(catalog_key='other_catalog')
+        self._discover(use_cache=False)
+        self.assertEqual(6, self.list_extensions.call_count)
@@ -14,9 +14,9 @@
 
 import hashlib
 import os
+import shutil
 import tempfile
 
-import mock
 from oslo.config import cfg
 from oslotest import mockpatch
 
@@ -38,7 +38,7 @@ class TestAccount(base.TestCase):
         self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
         self.temp_dir = tempfile.mkdtemp()
         cfg.CONF.set_default('lock_path', self.temp_dir)
-        self.addCleanup(os.rmdir, self.temp_dir)
+        self.addCleanup(shutil.rmtree, self.temp_dir)
         self.test_accounts = [
             {'username': 'test_user1', 'tenant_name': 'test_tenant1',
              'password': 'p'},
@@ -85,107 +85,72 @@ class TestAccount(base.TestCase):
             self.assertIn(hash, hash_dict.keys())
             self.assertIn(hash_dict[hash], self.test_accounts)
 
-    def test_create_hash_file_previous_file(self):
-        # Emulate the lock existing on the filesystem
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        with mock.patch('__builtin__.open', mock.mock_open(), create=True):
-            test_account_class = accounts.Accounts('test_name')
-            res = test_account_class._create_hash_file('12345')
-        self.assertFalse(res, "_create_hash_file should return False if the "
-                         "pseudo-lock file already exists")
-
-    def test_create_hash_file_no_previous_file(self):
-        # Emulate the lock not existing on the filesystem
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=False))
-        with mock.patch('__builtin__.open', mock.mock_open(), create=True):
-            test_account_class = accounts.Accounts('test_name')
-            res = test_account_class._create_hash_file('12345')
-        self.assertTrue(res, "_create_hash_file should return True if the "
-                        "pseudo-lock doesn't already exist")
-
-    @mock.patch('tempest.openstack.common.lockutils.lock')
-    def test_get_free_hash_no_previous_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=False))
+    def _hold_hashes(self, hashes):
+        holder = accounts.Accounts('holder')
+        self.addCleanup(self._release_hashes, holder)
+        for _hash in hashes:
+            self.assertEqual(_hash, holder._get_free_hash([_hash]))
+        return holder
+
+    def _release_hashes(self, holder):
+        for _hash in list(holder._lock_files):
+            holder.remove_hash(_hash)
+
+    def test_get_free_hash_no_previous_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        mkdir_mock = self.useFixture(mockpatch.Patch('os.mkdir'))
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=False))
         test_account_class = accounts.Accounts('test_name')
-        with mock.patch('__builtin__.open', mock.mock_open(),
-                        create=True) as open_mock:
-            test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(accounts.CONF.lock_path, 'test_accounts',
-                                     hash_list[0])
-            open_mock.assert_called_once_with(lock_path, 'w')
-        mkdir_path = os.path.join(accounts.CONF.lock_path, 'test_accounts')
-        mkdir_mock.mock.assert_called_once_with(mkdir_path)
-
-    @mock.patch('tempest.openstack.common.lockutils.lock')
-    def test_get_free_hash_no_free_accounts(self, lock_mock):
+        free_hash = test_account_class._get_free_hash(hash_list)
+        self.assertIn(free_hash, hash_list)
+        self.assertTrue(os.path.isdir(test_account_class.accounts_dir))
+        self.assertIn(free_hash, test_account_class._lock_files)
+
+    def test_get_free_hash_no_free_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Emulate pre-existing lock dir
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=True))
-        # Emulate all lcoks in list are in use
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
+        self._hold_hashes(hash_list)
         test_account_class = accounts.Accounts('test_name')
         self.assertRaises(exceptions.InvalidConfiguration,
                           test_account_class._get_free_hash, hash_list)
 
-    @mock.patch('tempest.openstack.common.lockutils.lock')
-    def test_get_free_hash_some_in_use_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=True))
+    def test_get_free_hash_some_in_use_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
+        self._hold_hashes(hash_list[:3] + hash_list[4:])
         test_account_class = accounts.Accounts('test_name')
+        self.assertEqual(hash_list[3],
+                         test_account_class._get_free_hash(hash_list))
 
-        def _fake_is_file(path):
-            # Fake isfile() to return that the path exists unless a specific
-            # hash is in the path
-            if hash_list[3] in path:
-                return False
-            return True
-
-        self.stubs.Set(os.path, 'isfile', _fake_is_file)
-        with mock.patch('__builtin__.open', mock.mock_open(),
-                        create=True) as open_mock:
-            test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(accounts.CONF.lock_path, 'test_accounts',
-                                     hash_list[3])
-            open_mock.assert_called_once_with(lock_path, 'w')
-
-    @mock.patch('tempest.openstack.common.lockutils.lock')
-    def test_remove_hash_last_account(self, lock_mock):
+    def test_remove_hash(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Pretend the pseudo-lock is there
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        # Pretend the lock dir is empty
-        self.useFixture(mockpatch.Patch('os.listdir', return_value=[]))
+        holder = self._hold_hashes(hash_list)
+        holder.remove_hash(hash_list[2])
+        self.assertNotIn(hash_list[2], holder._lock_files)
+        test_account_class = accounts.Accounts('test_name')
+        self.assertEqual(hash_list[2],
+                         test_account_class._get_free_hash(hash_list))
+
+    def test_remove_hash_not_held(self):
         test_account_class = accounts.Accounts('test_name')
-        remove_mock = self.useFixture(mockpatch.Patch('os.remove'))
-        rmdir_mock = self.useFixture(mockpatch.Patch('os.rmdir'))
-        test_account_class.remove_hash(hash_list[2])
-        hash_path = os.path.join(accounts.CONF.lock_path, 'test_accounts',
-                                 hash_list[2])
-        lock_path = os.path.join(accounts.CONF.lock_path, 'test_accounts')
-        remove_mock.mock.assert_called_once_with(hash_path)
-        rmdir_mock.mock.assert_called_once_with(lock_path)
-
-    @mock.patch('tempest.openstack.common.lockutils.lock')
-    def test_remove_hash_not_last_account(self, lock_mock):
+        log_mock = self.patch('tempest.common.accounts.LOG')
+        test_account_class.remove_hash('12345')
+        self.assertTrue(log_mock.warning.called)
+
+    def test_released_on_crash(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Pretend the pseudo-lock is there
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        # Pretend the lock dir is empty
-        self.useFixture(mockpatch.Patch('os.listdir', return_value=[
-            hash_list[1], hash_list[4]]))
+        holder = self._hold_hashes(hash_list)
+        # The lock is released when the file is closed, e.g. on exit
+        holder._lock_files.pop(hash_list[1]).close()
         test_account_class = accounts.Accounts('test_name')
-        remove_mock = self.useFixture(mockpatch.Patch('os.remove'))
-        rmdir_mock = self.useFixture(mockpatch.Patch('os.rmdir'))
-        test_account_class.remove_hash(hash_list[2])
-        hash_path = os.path.join(accounts.CONF.lock_path, 'test_accounts',
-                                 hash_list[2])
-        remove_mock.mock.assert_called_once_with(hash_path)
-        rmdir_mock.mock.assert_not_called()
+        self.assertEqual(hash_list[1],
+                         test_account_class._get_free_hash(hash_list))
+
+    def test_allocation_stats(self):
+        stats = accounts.AllocationStats()
+        self.assertIsNone(stats.free_accounts())
+        stats.record_acquire(0.5, 1, 10)
+        stats.record_acquire(1.5, 4, 10)
+        stats.record_release()
+        self.assertEqual(3, stats.free_accounts())
+        self.assertEqual(1.5, stats.max_wait_time)
+        self.assertIn('acquires: 2, releases: 1', str(stats))
 
     def test_is_multi_user(self):
         test_accounts_class = accounts.Accounts('test_name')
@@ -208,7 +173,7 @@ class TestNotLockingAccount(base.TestCase):
         self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
         self.temp_dir = tempfile.mkdtemp()
         cfg.CONF.set_default('lock_path', self.temp_dir)
-        self.addCleanup(os.rmdir, self.temp_dir)
+        self.addCleanup(shutil.rmtree, self.temp_dir)
         self.test_accounts = [
             {'username': 'test_user1', 'tenant_name': 'test_tenant1',
              'password': 'p'},
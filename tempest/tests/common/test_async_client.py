@@ -0,0 +1,141 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+import threading
+
+import httplib2
+from oslotest import mockpatch
+
+from tempest.common import async_client
+from tempest.common import rest_client
+from tempest import config
+from tempest import exceptions
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+from tempest.tests import fake_http
+
+
+class TestFuture(base.TestCase):
+
+    def test_result(self):
+        future = async_client.Future()
+        self.assertFalse(future.done())
+        future._complete(result='fake_result')
+        self.assertTrue(future.done())
+        self.assertEqual('fake_result', future.result())
+        self.assertIsNone(future.exception())
+
+    def test_exception(self):
+        future = async_client.Future()
+        try:
+            raise exceptions.NotFound()
+        except exceptions.NotFound:
+            future._complete(exc_info=sys.exc_info())
+        self.assertRaises(exceptions.NotFound, future.result)
+        self.assertIsInstance(future.exception(), exceptions.NotFound)
+
+    def test_timeout(self):
+        future = async_client.Future()
+        self.assertRaises(exceptions.TimeoutException, future.result, 0.01)
+
+    def test_done_callback(self):
+        future = async_client.Future()
+        done = []
+        future.add_done_callback(done.append)
+        self.assertEqual([], done)
+        future._complete(result=None)
+        self.assertEqual([future], done)
+        future.add_done_callback(done.append)
+        self.assertEqual([future, future], done)
+
+
+class TestExecutor(base.TestCase):
+
+    def setUp(self):
+        super(TestExecutor, self).setUp()
+        self.executor = async_client.Executor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_submit(self):
+        futures = [self.executor.submit(lambda x: x * 2, i)
+                   for i in range(10)]
+        self.assertEqual([i * 2 for i in range(10)],
+                         async_client.gather(futures, timeout=10))
+        self.assertEqual(2, len(self.executor._threads))
+
+    def test_concurrent_calls(self):
+        barrier = threading.Event()
+        blocked = self.executor.submit(barrier.wait, 10)
+        other = self.executor.submit(lambda: 'fake_result')
+        self.assertEqual('fake_result', other.result(10))
+        barrier.set()
+        self.assertTrue(blocked.result(10))
+
+    def test_gather_errors(self):
+        def func(item):
+            if item == 1:
+                raise ValueError(item)
+            return item
+        futures = [self.executor.submit(func, i) for i in range(3)]
+        self.assertRaises(ValueError, async_client.gather, futures, 10)
+        results = async_client.gather(futures, 10, raise_on_error=False)
+        self.assertEqual(0, results[0])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(2, results[2])
+
+
+class TestAsyncClient(base.TestCase):
+
+    def setUp(self):
+        super(TestAsyncClient, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.fake_http = fake_http.fake_httplib2()
+        self.stubs.Set(httplib2.Http, 'request', self.fake_http.request)
+        self.rest_client = rest_client.RestClient(
+            fake_auth_provider.FakeAuthProvider())
+        self.useFixture(mockpatch.PatchObject(self.rest_client,
+                                              '_get_region',
+                                              return_value='fake_region'))
+        self.useFixture(mockpatch.PatchObject(self.rest_client,
+                                              '_log_request'))
+        self.useFixture(mockpatch.PatchObject(self.rest_client,
+                                              '_error_checker'))
+        self.executor = async_client.Executor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+        self.client = async_client.AsyncClient(self.rest_client,
+                                               executor=self.executor)
+
+    def test_methods_return_futures(self):
+        future = self.client.get('fake_url')
+        self.assertIsInstance(future, async_client.Future)
+        __, return_dict = future.result(10)
+        self.assertEqual('GET', return_dict['method'])
+
+    def test_many_calls(self):
+        futures = [self.client.delete('servers/%d' % i) for i in range(10)]
+        results = async_client.gather(futures, timeout=10)
+        self.assertEqual(['DELETE'] * 10,
+                         [body['method'] for __, body in results])
+
+    def test_attributes(self):
+        self.assertEqual(self.rest_client.TYPE, self.client.TYPE)
+
+    def test_error_checker(self):
+        self.rest_client._error_checker.side_effect = exceptions.NotFound
+        future = self.client.get('fake_url')
+        self.assertRaises(exceptions.NotFound, future.result, 10)
@@ -0,0 +1,242 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+import mock
+from oslo.config import cfg
+
+from tempest import auth
+from tempest.common import cred_pool
+from tempest.common import credentials
+from tempest.common import isolated_creds
+from tempest import config
+from tempest import exceptions
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestCredentialPool(base.TestCase):
+
+    def setUp(self):
+        super(TestCredentialPool, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        cfg.CONF.set_default('neutron', True, group='service_available')
+        cfg.CONF.set_default('nova', True, group='service_available')
+        cfg.CONF.set_default('cinder', True, group='service_available')
+        self.identity_client = mock.Mock()
+        self.identity_client.list_user_roles.return_value = (
+            None, [{'name': 'member'}])
+        self.admin_manager = mock.Mock()
+        self.admin_manager.servers_client.list_servers.return_value = (
+            None, {'servers': []})
+        self.list_volumes = (
+            self.admin_manager.volumes_client.list_volumes_with_detail)
+        self.list_volumes.return_value = (
+            None, [{'os-vol-tenant-attr:tenant_id': 'other'}])
+        self.list_snapshots = (
+            self.admin_manager.snapshots_client.list_snapshots_with_detail)
+        self.list_snapshots.return_value = (None, [])
+        self.patch('tempest.clients.AdminManager',
+                   return_value=self.admin_manager)
+        self.user_manager = mock.Mock()
+        self.user_manager.keypairs_client.list_keypairs.return_value = (
+            None, [])
+        self.patch('tempest.clients.Manager',
+                   return_value=self.user_manager)
+        self.network_client = mock.Mock()
+        self.network_client.list_ports.return_value = (
+            None, {'ports': [{'device_owner': 'network:dhcp'}]})
+        self.network_client.list_floatingips.return_value = (
+            None, {'floatingips': []})
+        self.network_client.list_security_groups.return_value = (
+            None, {'security_groups': [{'name': 'default'}]})
+        self.patch('tempest.common.isolated_creds.IsolatedCreds.'
+                   '_get_admin_clients',
+                   return_value=(self.identity_client, self.network_client))
+        ids = itertools.count()
+        self.create_creds = self.patch(
+            'tempest.common.isolated_creds.IsolatedCreds._create_creds',
+            side_effect=lambda admin: auth.get_credentials(
+                username='user%d' % next(ids), user_id='user_id',
+                tenant_name='tenant', tenant_id='tenant_id',
+                password='pass', fill_in=False))
+        self.create_net = self.patch(
+            'tempest.common.isolated_creds.IsolatedCreds.'
+            '_create_network_resources',
+            return_value=({'id': 'net'}, {'id': 'subnet'}, {'id': 'router'}))
+        self.clear_net = self.patch(
+            'tempest.common.isolated_creds.IsolatedCreds._clear_net_resources')
+        self.clear_creds = self.patch(
+            'tempest.common.isolated_creds.IsolatedCreds._clear_creds')
+        self.pool = cred_pool.CredentialPool(2)
+
+    def _wait(self):
+        # Shutting down waits for the queued jobs
+        self.pool._executor.shutdown(wait=True)
+
+    def test_fill(self):
+        self.pool.fill()
+        self._wait()
+        self.assertEqual(2, len(self.pool._idle[False]))
+        self.assertEqual(0, self.pool._provisioning[False])
+        self.pool.fill()
+        self._wait()
+        self.assertEqual(2, self.create_creds.call_count)
+
+    def test_acquire_miss(self):
+        creds, net_resources = self.pool.acquire()
+        self.assertEqual('pass', creds.password)
+        self.assertEqual({'id': 'net'}, net_resources[0])
+        self.assertEqual(1, self.pool.misses)
+        self._wait()
+        self.assertEqual(2, len(self.pool._idle[False]))
+        self.assertEqual(0, len(self.pool._idle[True]))
+
+    def test_acquire_reused(self):
+        self.pool.fill()
+        self._wait()
+        creds, _ = self.pool.acquire()
+        self.assertEqual(1, self.pool.reused)
+        self.assertEqual(0, self.pool.misses)
+        self._wait()
+        self.assertEqual(3, self.create_creds.call_count)
+
+    def test_release_clean(self):
+        creds, net_resources = self.pool.acquire()
+        self.pool.release(creds, net_resources)
+        self._wait()
+        self.identity_client.update_user_password.assert_called_once_with(
+            'user_id', 'pass')
+        # The pool was already full
+        self.assertEqual(2, len(self.pool._idle[False]))
+        self.clear_creds.assert_called_once_with(creds)
+
+    def test_release_not_clean(self):
+        self.network_client.list_ports.return_value = (
+            None, {'ports': [{'device_owner': 'compute:None'}]})
+        creds, net_resources = self.pool.acquire()
+        self._wait()
+        self.pool._idle[False] = []
+        self.pool.release(creds, net_resources)
+        self._wait()
+        self.assertEqual([], self.pool._idle[False])
+        self.clear_net.assert_called_once_with(*net_resources)
+        self.clear_creds.assert_called_once_with(creds)
+
+    def _assert_not_recycled(self):
+        creds, net_resources = self.pool.acquire()
+        self._wait()
+        self.pool._idle[False] = []
+        self.pool.release(creds, net_resources)
+        self._wait()
+        self.assertEqual([], self.pool._idle[False])
+        self.clear_creds.assert_called_once_with(creds)
+
+    def test_release_server_left(self):
+        self.admin_manager.servers_client.list_servers.return_value = (
+            None, {'servers': [{'id': 'server'}]})
+        self._assert_not_recycled()
+        self.admin_manager.servers_client.list_servers.assert_called_with(
+            {'all_tenants': 1, 'tenant_id': 'tenant_id'})
+
+    def test_release_keypair_left(self):
+        self.user_manager.keypairs_client.list_keypairs.return_value = (
+            None, [{'keypair': {'name': 'key'}}])
+        self._assert_not_recycled()
+
+    def test_release_volume_left(self):
+        self.list_volumes.return_value = (
+            None, [{'os-vol-tenant-attr:tenant_id': 'tenant_id'}])
+        self._assert_not_recycled()
+
+    def test_release_snapshot_left(self):
+        self.list_snapshots.return_value = (
+            None, [{'os-extended-snapshot-attributes:project_id':
+                    'tenant_id'}])
+        self._assert_not_recycled()
+
+    def test_release_role_added(self):
+        creds, net_resources = self.pool.acquire()
+        self._wait()
+        self.pool._idle[False] = []
+        self.identity_client.list_user_roles.return_value = (
+            None, [{'name': 'member'}, {'name': 'admin'}])
+        self.pool.release(creds, net_resources)
+        self._wait()
+        self.assertEqual([], self.pool._idle[False])
+
+    def test_release_without_neutron(self):
+        cfg.CONF.set_default('neutron', False, group='service_available')
+        self.admin_manager.servers_client.list_servers.return_value = (
+            None, {'servers': [{'id': 'server'}]})
+        self._assert_not_recycled()
+
+    def test_release_resets_quotas(self):
+        creds, net_resources = self.pool.acquire()
+        self._wait()
+        self.pool._idle[False] = []
+        self.pool.release(creds, net_resources)
+        self._wait()
+        self.assertEqual([(creds, net_resources)], self.pool._idle[False])
+        for quotas_client in (self.admin_manager.quotas_client,
+                              self.admin_manager.volume_quotas_client):
+            quotas_client.delete_quota_set.assert_called_once_with(
+                'tenant_id')
+
+    def test_release_network_deleted(self):
+        self.network_client.show_network.side_effect = exceptions.NotFound
+        creds, net_resources = self.pool.acquire()
+        self._wait()
+        self.pool._idle[False] = []
+        self.pool.release(creds, net_resources)
+        self._wait()
+        self.assertEqual([], self.pool._idle[False])
+
+    def test_delete_all(self):
+        self.pool.fill()
+        self.pool.delete_all()
+        self.assertEqual(2, self.clear_creds.call_count)
+        self.assertEqual(2, self.pool.deleted)
+        self.assertEqual({False: [], True: []}, self.pool._idle)
+
+    def test_pooled_isolated_creds(self):
+        self.stubs.Set(cred_pool, 'get_credential_pool',
+                       lambda interface: self.pool)
+        cfg.CONF.set_default('allow_tenant_isolation', True, group='auth')
+        cfg.CONF.set_default('isolated_creds_pool_size', 2, group='auth')
+        creds_provider = credentials.get_isolated_credentials('fake')
+        self.assertIsInstance(creds_provider, cred_pool.PooledIsolatedCreds)
+        primary = creds_provider.get_primary_creds()
+        self.assertIs(primary, creds_provider.get_primary_creds())
+        self.assertEqual({'id': 'net'}, creds_provider.get_primary_network())
+        creds_provider.clear_isolated_creds()
+        self._wait()
+        self.assertEqual({}, creds_provider.isolated_creds)
+        self.assertEqual(1, self.identity_client.update_user_password.
+                         call_count)
+
+    def test_not_pooled(self):
+        self.stubs.Set(cred_pool, 'get_credential_pool',
+                       lambda interface: self.pool)
+        creds_provider = cred_pool.PooledIsolatedCreds(
+            'fake', network_resources={'network': False, 'router': False,
+                                       'subnet': False, 'dhcp': False})
+        self.assertIsNone(creds_provider._pool)
+        creds_provider = cred_pool.PooledIsolatedCreds('fake',
+                                                       password='other')
+        self.assertIsNone(creds_provider._pool)
+        self.assertIsInstance(creds_provider, isolated_creds.IsolatedCreds)
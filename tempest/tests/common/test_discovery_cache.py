@@ -0,0 +1,86 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import time
+
+import fixtures
+from oslo.config import cfg
+
+from tempest.common import discovery_cache
+from tempest import config
+from tempest.openstack.common.fixture import mockpatch
+from tempest import test
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestDiscoveryCache(base.TestCase):
+
+    discovery = {'versions': {'nova': ['v2.0']},
+                 'extensions': {'nova': ['os-fake'], 'neutron': ['router']}}
+
+    def setUp(self):
+        super(TestDiscoveryCache, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'discovery_cache.json')
+        self.cache = discovery_cache.DiscoveryCache(self.path, ttl=60)
+        self.catalog_key = self.cache.get_catalog_key(
+            [{'id': '2', 'url': 'http://fake:8774'},
+             {'id': '1', 'url': 'http://fake:5000'}])
+
+    def test_catalog_key(self):
+        self.assertEqual(self.catalog_key, self.cache.get_catalog_key(
+            [{'id': '1', 'url': 'http://fake:5000'},
+             {'id': '2', 'url': 'http://fake:8774'}]))
+        self.assertNotEqual(self.catalog_key, self.cache.get_catalog_key(
+            [{'id': '1', 'url': 'http://fake:5000'}]))
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get('identity', self.catalog_key))
+        self.cache.set('identity', self.catalog_key, self.discovery)
+        self.assertEqual(self.discovery,
+                         self.cache.get('identity', self.catalog_key))
+        self.assertEqual(self.discovery, self.cache.get('identity'))
+        self.assertIsNone(self.cache.get('identity', 'other_catalog'))
+        self.assertIsNone(self.cache.get('other_identity'))
+
+    def test_expired(self):
+        self.cache.set('identity', self.catalog_key, self.discovery)
+        now = time.time()
+        self.patch('time.time', return_value=now + 61)
+        self.assertIsNone(self.cache.get('identity', self.catalog_key))
+
+    def test_disabled(self):
+        cache = discovery_cache.DiscoveryCache(self.path, ttl=0)
+        cache.set('identity', self.catalog_key, self.discovery)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_is_extension_enabled(self):
+        cfg.CONF.set_default('check_extensions', True, group='discovery')
+        cfg.CONF.set_default('api_extensions', ['all'],
+                             group='network-feature-enabled')
+        self.cache.set(self.cache.get_identity_key(), self.catalog_key,
+                       self.discovery)
+        self.useFixture(mockpatch.PatchObject(
+            discovery_cache, '_discovery_cache', self.cache))
+        self.useFixture(mockpatch.PatchObject(
+            discovery_cache, '_discovered_extensions', None))
+        self.assertTrue(test.is_extension_enabled('router', 'network'))
+        self.assertFalse(test.is_extension_enabled('lbaas', 'network'))
+        # Not in the cache, trust the configuration
+        self.assertTrue(test.is_extension_enabled('os-fake', 'volume'))
@@ -0,0 +1,119 @@
+# Copyright 2014 IBM Corp.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import httplib2
+import mock
+
+from tempest.common import http
+from tempest.tests import base
+from tempest.tests import fake_http
+
+
+class TestHttpConnectionPool(base.TestCase):
+
+    def setUp(self):
+        super(TestHttpConnectionPool, self).setUp()
+        self.fake_http = fake_http.fake_httplib2()
+        self.stubs.Set(httplib2.Http, 'request', self.fake_http.request)
+        self.pool = http.HttpConnectionPool(pool_size=1, idle_timeout=60)
+
+    def _request(self, url):
+        return self.pool.request(url, headers={})
+
+    def _idle(self, scheme='https', netloc='fake:443'):
+        return self.pool._idle[(scheme, netloc)]
+
+    def test_request_keeps_connection(self):
+        __, return_dict = self._request('https://fake:443/v2/servers')
+        self.assertEqual('GET', return_dict['method'])
+        self.assertEqual(1, len(self._idle()))
+
+    def test_connection_reused_per_endpoint(self):
+        self._request('https://fake:443/v2/servers')
+        http_obj = self._idle()[0]
+        self._request('https://fake:443/v2/flavors')
+        self.assertEqual([http_obj], self._idle())
+        self._request('http://other:80/v1/volumes')
+        self.assertEqual(1, len(self._idle('http', 'other:80')))
+        self.assertIsNot(http_obj, self._idle('http', 'other:80')[0])
+
+    def test_pool_size(self):
+        first = self.pool._acquire(('https', 'fake:443'))
+        second = self.pool._acquire(('https', 'fake:443'))
+        self.assertIsNot(first, second)
+        second.close = mock.Mock()
+        self.pool._release(('https', 'fake:443'), first)
+        self.pool._release(('https', 'fake:443'), second)
+        self.assertEqual([first], self._idle())
+        second.close.assert_called_once_with()
+
+    def test_idle_timeout(self):
+        self._request('https://fake:443/v2/servers')
+        http_obj = self._idle()[0]
+        http_obj.last_used -= 120
+        http_obj.close = mock.Mock()
+        self._request('https://fake:443/v2/servers')
+        http_obj.close.assert_called_once_with()
+        self.assertIsNot(http_obj, self._idle()[0])
+        self.assertEqual(1, self.pool.stats.expired)
+
+    def test_connection_dropped_on_error(self):
+        self.stubs.Set(httplib2.Http, 'request',
+                       mock.Mock(side_effect=httplib2.HttpLib2Error))
+        self.assertRaises(httplib2.HttpLib2Error, self.pool.request,
+                          'https://fake:443/v2/servers')
+        self.assertEqual([], self._idle())
+
+
+class TestKeepAliveHttp(base.TestCase):
+
+    def setUp(self):
+        super(TestKeepAliveHttp, self).setUp()
+        self.stubs.Set(httplib2.Http, '_conn_request',
+                       mock.Mock(return_value=('resp', 'body')))
+        self.http_obj = http.KeepAliveHttp()
+
+    def test_new_connection(self):
+        conn = mock.Mock(sock=None)
+        self.http_obj._conn_request(conn, '/', 'GET', None, {})
+        conn.connect.assert_called_once_with()
+        stats = self.http_obj.stats.to_dict()
+        self.assertEqual(1, stats['requests'])
+        self.assertEqual(1, stats['connections'])
+        self.assertEqual(0, stats['reused'])
+
+    def test_reused_connection(self):
+        conn = mock.Mock(sock='fake_socket')
+        self.http_obj._conn_request(conn, '/', 'GET', None, {})
+        self.assertFalse(conn.connect.called)
+        stats = self.http_obj.stats.to_dict()
+        self.assertEqual(1, stats['reused'])
+        self.assertEqual(0, stats['connections'])
+
+
+class TestClosingHttp(base.TestCase):
+
+    def test_connections_per_thread(self):
+        http_obj = http.ClosingHttp()
+        http_obj.connections['https:fake'] = 'fake_connection'
+        connections = []
+        thread = threading.Thread(
+            target=lambda: connections.append(http_obj.connections))
+        thread.start()
+        thread.join()
+        self.assertEqual([{}], connections)
+        self.assertEqual({'https:fake': 'fake_connection'},
+                         http_obj.connections)
@@ -0,0 +1,100 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo.config import cfg
+
+from tempest.common import polling
+from tempest import config
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestPoller(base.TestCase):
+
+    def setUp(self):
+        super(TestPoller, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        cfg.CONF.set_default('jitter', 0, group='polling')
+        cfg.CONF.set_default('max_interval', 5, group='polling')
+        self.wait_stats = polling.WaitStats()
+        self.stubs.Set(polling, 'wait_stats', self.wait_stats)
+        self.now = 1000.0
+        self.patch('time.time', side_effect=lambda: self.now)
+        self.sleep = self.patch('time.sleep', side_effect=self._sleep)
+
+    def _sleep(self, seconds):
+        self.now += seconds
+
+    def _intervals(self, poller, count):
+        return [poller.next_interval() for _ in range(count)]
+
+    def test_fixed_interval(self):
+        cfg.CONF.set_default('adaptive', False, group='polling')
+        poller = polling.Poller(3, 60)
+        self.assertEqual([3, 3, 3], self._intervals(poller, 3))
+
+    def test_backoff(self):
+        poller = polling.Poller(3, 60)
+        self.assertEqual([1, 1.5, 2.25, 3.375, 5, 5],
+                         self._intervals(poller, 6))
+
+    def test_jitter(self):
+        cfg.CONF.set_default('jitter', 0.5, group='polling')
+        poller = polling.Poller(3, 60)
+        for interval in self._intervals(poller, 10):
+            self.assertTrue(0 <= interval <= 7.5)
+
+    def test_timeout(self):
+        poller = polling.Poller(3, 2)
+        self.assertFalse(poller.timed_out())
+        poller.sleep()
+        poller.sleep()
+        self.assertEqual(2, self.now - 1000.0)
+        self.assertTrue(poller.timed_out())
+        self.assertEqual(0, poller.next_interval())
+
+    def test_done(self):
+        poller = polling.Poller(3, 60, 'server', 'ACTIVE')
+        poller.sleep()
+        poller.sleep()
+        poller.done()
+        polling.Poller(3, 60, 'server', 'ACTIVE').done(success=False)
+        self.assertEqual({'server:ACTIVE': {'waits': 2, 'timeouts': 1,
+                                            'polls': 2, 'time': 2.5}},
+                         self.wait_stats.to_dict())
+        self.assertEqual(2.5, self.wait_stats.transition_time('server',
+                                                              'ACTIVE'))
+        self.assertIn('server:ACTIVE: 2 waits (1 timed out)',
+                      str(self.wait_stats))
+
+    def test_learned_transition_time(self):
+        self.wait_stats.record('server', 'ACTIVE', 4, 3)
+        poller = polling.Poller(3, 60, 'server', 'ACTIVE')
+        # Waits until the server is expected to be ready, then backs off
+        # from the initial interval again once the server is late
+        self.assertEqual(4, poller.next_interval())
+        poller.sleep()
+        self.assertEqual(4, self.now - 1000.0)
+        self.assertEqual([2.25, 3.375], self._intervals(poller, 2))
+        self.now += 1
+        self.assertEqual([1, 1.5], self._intervals(poller, 2))
+
+    def test_learning_disabled(self):
+        cfg.CONF.set_default('learn_transition_times', False,
+                             group='polling')
+        self.wait_stats.record('server', 'ACTIVE', 4, 3)
+        poller = polling.Poller(3, 60, 'server', 'ACTIVE')
+        self.assertEqual(1, poller.next_interval())
@@ -0,0 +1,88 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import stat
+
+import fixtures
+import mock
+
+from tempest.common import token_cache
+from tempest import config
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestTokenCache(base.TestCase):
+
+    auth_data = ('fake_token', {'token': {'id': 'fake_token'}})
+
+    def setUp(self):
+        super(TestTokenCache, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.path = self.useFixture(fixtures.TempDir()).path
+        self.cache = token_cache.TokenCache(
+            os.path.join(self.path, 'token_cache'))
+        self.fetch = mock.Mock(return_value=self.auth_data)
+        self.key = token_cache.TokenCache.get_key('fake_user', 'fake_pass')
+
+    def _get_auth(self, cache=None, expired=False, needs_refresh=False):
+        cache = cache or self.cache
+        return cache.get_auth(self.key, self.fetch,
+                              mock.Mock(return_value=expired),
+                              mock.Mock(return_value=needs_refresh))
+
+    def test_key(self):
+        self.assertEqual(self.key, token_cache.TokenCache.get_key(
+            'fake_user', 'fake_pass'))
+        self.assertNotEqual(self.key, token_cache.TokenCache.get_key(
+            'fake_user', 'other_pass'))
+
+    def test_miss_then_hit(self):
+        self.assertEqual(self.auth_data, self._get_auth())
+        self.assertEqual(self.auth_data, self._get_auth())
+        self.assertEqual(1, self.fetch.call_count)
+        self.assertEqual(1, self.cache.misses)
+        self.assertEqual(1, self.cache.hits)
+
+    def test_shared_between_caches(self):
+        self._get_auth()
+        other_cache = token_cache.TokenCache(self.cache.path)
+        self.assertEqual(self.auth_data, self._get_auth(other_cache))
+        self.assertEqual(1, self.fetch.call_count)
+        self.assertEqual(1, other_cache.hits)
+
+    def test_expired(self):
+        self._get_auth()
+        self._get_auth(expired=True)
+        self.assertEqual(2, self.fetch.call_count)
+        self.assertEqual(2, self.cache.misses)
+
+    def test_file_mode(self):
+        self._get_auth()
+        mode = os.stat(os.path.join(self.cache.path, self.key)).st_mode
+        self.assertEqual(stat.S_IRUSR | stat.S_IWUSR, stat.S_IMODE(mode))
+
+    def test_background_refresh(self):
+        self._get_auth()
+        new_auth_data = ('new_token', {'token': {'id': 'new_token'}})
+        self.fetch.return_value = new_auth_data
+        self.patch('threading.Thread.start', autospec=True,
+                   side_effect=lambda thread: thread.run())
+        self.assertEqual(self.auth_data, self._get_auth(needs_refresh=True))
+        self.assertEqual(1, self.cache.refreshes)
+        self.assertEqual(new_auth_data, self._get_auth())
+        self.assertEqual(set(), self.cache._refreshing)
@@ -86,3 +86,28 @@ class TestMisc(base.TestCase):
             return misc.find_test_caller()
         self.assertEqual('TestMisc:tearDownClass',
                          tearDownClass(self.__class__))
+
+    def test_run_concurrently(self):
+        self.assertEqual([2, 4, 6],
+                         misc.run_concurrently(lambda x: x * 2, [1, 2, 3]))
+
+    def test_run_concurrently_no_items(self):
+        self.assertEqual([], misc.run_concurrently(lambda x: x, []))
+
+    def test_run_concurrently_raise_on_error(self):
+        def func(item):
+            if item == 2:
+                raise ValueError(item)
+            return item
+        self.assertRaises(ValueError, misc.run_concurrently, func, [1, 2, 3])
+
+    def test_run_concurrently_return_errors(self):
+        def func(item):
+            if item == 2:
+                raise ValueError(item)
+            return item
+        results = misc.run_concurrently(func, [1, 2, 3],
+                                        raise_on_error=False)
+        self.assertEqual(1, results[0])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(3, results[2])
@@ -0,0 +1,98 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+import threading
+
+from tempest.stress import actor_runner
+from tempest.stress import driver
+from tempest.stress import stats
+from tempest.tests import base
+from tempest.tests.stress import test_stressaction
+
+
+class TestActorRunner(base.TestCase):
+
+    def test_actor_statistics(self):
+        slot = stats.SharedStatistics(1).slot(0)
+        lock = threading.Lock()
+        first = actor_runner.ActorStatistics(slot, lock)
+        second = actor_runner.ActorStatistics(slot, lock)
+        first['runs'] += 2
+        second['runs'] += 1
+        second['fails'] += 1
+        first.histogram.record(0.01)
+        self.assertEqual(2, first['runs'])
+        self.assertEqual(1, second['runs'])
+        self.assertEqual({'runs': 3, 'fails': 1, 'bytes': 0}, slot.to_dict())
+        self.assertEqual(1, slot.histogram.count)
+
+    def test_shard(self):
+        actions = list(enumerate('abcde'))
+        self.assertEqual([[(0, 'a'), (2, 'c'), (4, 'e')],
+                          [(1, 'b'), (3, 'd')]],
+                         actor_runner.shard(actions, 2))
+        self.assertEqual(2, len(actor_runner.shard(actions[:2], 4)))
+        self.assertEqual([[]], actor_runner.shard([], 4))
+
+    def test_worker(self):
+        statistics = stats.SharedStatistics(2)
+        actors = []
+        for __ in range(10):
+            actors.append((test_stressaction.FakeStressAction(
+                manager=None, max_runs=5), statistics.slot(0)))
+            actors.append((test_stressaction.FakeStressActionFailing(
+                manager=None, max_runs=5), statistics.slot(1)))
+        process = multiprocessing.Process(
+            target=actor_runner.Worker(actors).run)
+        process.start()
+        process.join(30)
+        self.assertEqual(0, process.exitcode)
+        self.assertEqual({'runs': 50, 'fails': 0, 'bytes': 0},
+                         statistics.slot(0).to_dict())
+        self.assertEqual({'runs': 50, 'fails': 50, 'bytes': 0},
+                         statistics.slot(1).to_dict())
+        self.assertEqual(50, statistics.slot(1).histogram.count)
+
+    def test_run_loop_stopping(self):
+        action = test_stressaction.FakeStressAction(manager=None)
+        stopping = threading.Event()
+        stopping.set()
+        statistic = {'runs': 0, 'fails': 0}
+        action.run_loop(statistic, stopping)
+        self.assertFalse(action.run_called)
+        self.assertEqual(0, statistic['runs'])
+
+    def test_start_actors(self):
+        test_runs = []
+        for index, action in enumerate(
+                (test_stressaction.FakeStressAction,
+                 test_stressaction.FakeStressActionFailing)):
+            for p_number in range(3):
+                test_runs.append((index, p_number,
+                                  action(manager=None, max_runs=2)))
+        statistics = stats.SharedStatistics(len(test_runs))
+        started = driver._start_actors(test_runs, statistics, 2)
+        # A slot per test in each worker
+        self.assertEqual(4, len(started))
+        self.assertEqual([0, 0, 1, 1],
+                         [process['p_number'] for process in started])
+        self.assertEqual(2, len(set(process['process']
+                                    for process in started)))
+        for process in set(process['process'] for process in started):
+            process.start()
+            process.join(30)
+        self.assertEqual(12, statistics.total('runs'))
+        self.assertEqual(6, statistics.total('fails'))
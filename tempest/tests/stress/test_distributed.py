@@ -0,0 +1,168 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from multiprocessing import connection
+import threading
+import time
+
+from oslo.config import cfg
+
+from tempest import config
+from tempest import exceptions
+from tempest.stress import distributed
+from tempest.stress import stats
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestSplitTests(base.TestCase):
+
+    def test_split_threads(self):
+        tests = [{'action': 'a', 'threads': 5},
+                 {'action': 'b', 'threads': 1},
+                 {'action': 'c'}]
+        shares = distributed.split_tests(tests, 2, default_threads=4)
+        self.assertEqual([[('a', 3), ('c', 2)],
+                          [('a', 2), ('b', 1), ('c', 2)]],
+                         [[(test['action'], test['threads'])
+                           for test in share] for share in shares])
+
+    def test_split_rate(self):
+        tests = [{'action': 'a', 'threads': 4,
+                  'rate': {'profile': 'ramp', 'ops_per_sec': 8,
+                           'ramp_time': 60}}]
+        shares = distributed.split_tests(tests, 4, default_threads=4)
+        for share in shares:
+            self.assertEqual({'profile': 'ramp', 'ops_per_sec': 2,
+                              'ramp_time': 60}, share[0]['rate'])
+
+
+class TestDistributed(base.TestCase):
+
+    def setUp(self):
+        super(TestDistributed, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        cfg.CONF.set_default('distributed_authkey', 'secret', group='stress')
+        cfg.CONF.set_default('stats_interval', 1, group='stress')
+        cfg.CONF.set_default('full_clean_stack', False, group='stress')
+        self.coordinator = distributed.Coordinator(('localhost', 0), 2,
+                                                   agent_timeout=10)
+        self.addCleanup(self.coordinator.listener.close)
+        self.runs = []
+
+    def _fake_stress_openstack(self, tests, duration, max_runs,
+                               stop_on_error, results, timeseries, runner,
+                               stopping, clean):
+        self.runs.append((tests, runner, clean))
+        for test in tests:
+            histogram = stats.LatencyHistogram()
+            for __ in range(test['threads']):
+                histogram.record(0.1)
+            fails = test['threads'] if test.get('fail') else 0
+            results.add(test['action'], test['threads'], fails, histogram)
+            timeseries.sample({test['action']: (test['threads'], fails)})
+        if any(test.get('wait') for test in tests):
+            stopping.wait(30)
+        return 0
+
+    def _client(self, address):
+        client = connection.Client(address, authkey='secret')
+        self.addCleanup(client.close)
+        return client
+
+    def _start_agents(self, hellos=()):
+        """Starts two agents, after clients sending the hellos"""
+        self.patch('tempest.stress.driver.stress_openstack',
+                   side_effect=self._fake_stress_openstack)
+        waiter = threading.Thread(target=self.coordinator.wait_for_agents)
+        waiter.daemon = True
+        waiter.start()
+        for hello in hellos:
+            self._client(self.coordinator.listener.address).send_bytes(hello)
+        threads = []
+        for __ in range(2):
+            agent = distributed.Agent(self.coordinator.listener.address,
+                                      connect_timeout=10)
+            thread = threading.Thread(target=agent.run)
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        waiter.join(10)
+        self.assertEqual(2, len(self.coordinator.agents))
+        return threads
+
+    def _close(self, threads):
+        self.coordinator.close()
+        for thread in threads:
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+
+    def test_invalid_hello(self):
+        # Skipped, the two agents connecting next are still waited for
+        threads = self._start_agents(['not json', '{"type": "hello"}'])
+        self.assertEqual([0, 1], [agent.number
+                                  for agent in self.coordinator.agents])
+        self._close(threads)
+
+    def test_late_hello(self):
+        coordinator = distributed.Coordinator(('localhost', 0), 1,
+                                              agent_timeout=1)
+        self.addCleanup(coordinator.close)
+        connecting = threading.Thread(target=self._client,
+                                      args=(coordinator.listener.address,))
+        connecting.daemon = True
+        connecting.start()
+        self.assertRaises(exceptions.TimeoutException,
+                          coordinator.wait_for_agents)
+        self.assertEqual([], coordinator.agents)
+
+    def test_run(self):
+        threads = self._start_agents()
+        results = stats.StressResults()
+        result = self.coordinator.run([{'action': 'a', 'threads': 3},
+                                       {'action': 'b', 'threads': 1}],
+                                      duration=30, max_runs=1,
+                                      results=results, runner='actor')
+        self._close(threads)
+        self.assertEqual(0, result)
+        self.assertEqual(2, len(self.runs))
+        for tests, runner, clean in self.runs:
+            self.assertEqual('actor', runner)
+            self.assertFalse(clean)
+        self.assertEqual(3, results.summary('a')['runs'])
+        self.assertEqual(1, results.summary('b')['runs'])
+        self.assertEqual(3, results.actions['a']['histogram'].count)
+
+    def test_duration(self):
+        threads = self._start_agents()
+        start = time.time()
+        result = self.coordinator.run([{'action': 'a', 'threads': 2,
+                                        'wait': True}], duration=1)
+        self._close(threads)
+        self.assertEqual(0, result)
+        self.assertLess(time.time() - start, 10)
+
+    def test_stop_on_error(self):
+        threads = self._start_agents()
+        start = time.time()
+        result = self.coordinator.run([{'action': 'a', 'threads': 1,
+                                        'fail': True},
+                                       {'action': 'b', 'threads': 1,
+                                        'wait': True}],
+                                      duration=60, stop_on_error=True)
+        self._close(threads)
+        self.assertEqual(1, result)
+        self.assertLess(time.time() - start, 10)
@@ -0,0 +1,118 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+from tempest.stress import load_profile
+from tempest.stress import stats
+from tempest.tests import base
+from tempest.tests.stress import test_stressaction
+
+
+class TestLoadProfile(base.TestCase):
+
+    def test_constant(self):
+        profile = load_profile.LoadProfile({'ops_per_sec': 10}, share=0.5)
+        self.assertEqual(5, profile.rate_at(0))
+        self.assertEqual(5, profile.rate_at(1000))
+        self.assertEqual([100.0, 100.2, 100.4],
+                         [round(t, 3) for t in itertools.islice(
+                             profile.schedule(100.0), 3)])
+
+    def test_ramp(self):
+        profile = load_profile.LoadProfile(
+            {'profile': 'ramp', 'ops_per_sec': 10, 'ramp_time': 100})
+        self.assertEqual(0, profile.rate_at(0))
+        self.assertEqual(5, profile.rate_at(50))
+        self.assertEqual(10, profile.rate_at(150))
+        # Nothing to run until the rate is over 0
+        self.assertTrue(next(profile.schedule(0)) > 0)
+
+    def test_step(self):
+        profile = load_profile.LoadProfile(
+            {'profile': 'step', 'ops_per_sec': 10, 'step_ops_per_sec': 3,
+             'step_time': 10})
+        self.assertEqual([3, 3, 6, 9, 10],
+                         [profile.rate_at(t) for t in (0, 9, 10, 25, 40)])
+
+    def test_spike(self):
+        profile = load_profile.LoadProfile(
+            {'profile': 'spike', 'ops_per_sec': 1, 'spike_ops_per_sec': 20,
+             'spike_time': 30, 'spike_duration': 5})
+        self.assertEqual([1, 20, 20, 1],
+                         [profile.rate_at(t) for t in (29, 30, 34, 35)])
+
+    def test_phase(self):
+        profile = load_profile.LoadProfile({'ops_per_sec': 1})
+        self.assertEqual(0.25, next(profile.schedule(0, phase=0.25)))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, load_profile.LoadProfile,
+                          {'profile': 'sine', 'ops_per_sec': 1})
+        self.assertRaises(ValueError, load_profile.LoadProfile,
+                          {'profile': 'ramp'})
+        self.assertRaises(ValueError, load_profile.LoadProfile,
+                          {'ops_per_sec': 0})
+        self.assertRaises(ValueError, load_profile.LoadProfile,
+                          {'profile': 'step', 'ops_per_sec': 4,
+                           'step_ops_per_sec': 0})
+
+    def test_idle_start(self):
+        # Idle until the first step, then the rate of the step
+        profile = load_profile.LoadProfile({'profile': 'step',
+                                            'ops_per_sec': 4,
+                                            'start_ops_per_sec': 0,
+                                            'step_time': 10})
+        self.assertEqual(10, profile.positive_after())
+        self.assertTrue(10 <= next(profile.schedule(0)) < 11)
+        profile = load_profile.LoadProfile({'ops_per_sec': 1})
+        profile.rate_at = lambda elapsed: 0
+        self.assertRaises(ValueError, next, profile.schedule(0))
+
+
+class TestOpenLoop(base.TestCase):
+
+    def setUp(self):
+        super(TestOpenLoop, self).setUp()
+        self.now = [1000.0]
+        self.sleeps = []
+        self.patch('time.time', side_effect=lambda: self.now[0])
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now[0] += seconds
+        self.patch('time.sleep', side_effect=sleep)
+        self.patch('signal.signal')
+
+    def test_scheduled_runs(self):
+        action = test_stressaction.FakeStressAction(manager=None, max_runs=3)
+        action.load_profile = load_profile.LoadProfile({'ops_per_sec': 2})
+        action.execute({'runs': 0, 'fails': 0})
+        # Runs are instantaneous, they wait for their slot
+        self.assertEqual([0.5, 0.5], self.sleeps)
+
+    def test_coordinated_omission(self):
+        action = test_stressaction.FakeStressAction(manager=None, max_runs=4)
+        action.load_profile = load_profile.LoadProfile({'ops_per_sec': 1})
+
+        def slow_run():
+            self.now[0] += 2.5
+        action.run = slow_run
+        slot = stats.SharedStatistics(1).slot(0)
+        action.execute(slot)
+        # Late runs start right away and their latency includes the delay
+        self.assertEqual([], self.sleeps)
+        self.assertEqual(4, slot.histogram.count)
+        self.assertAlmostEqual(7, slot.histogram.percentile(100), delta=0.1)
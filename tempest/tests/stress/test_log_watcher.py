@@ -0,0 +1,91 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import subprocess
+
+import fixtures
+import mock
+
+from tempest.stress import log_watcher
+from tempest.tests import base
+
+
+class LocalClient(object):
+    """Runs the commands of a node on the local host"""
+
+    def __init__(self, host, *args, **kwargs):
+        self.host = host
+        self.commands = 0
+
+    def exec_command(self, cmd):
+        self.commands += 1
+        if self.host == 'down':
+            raise IOError('unreachable')
+        return subprocess.check_output(['bash', '-c', cmd])
+
+    def close(self):
+        pass
+
+
+class TestLogWatcher(base.TestCase):
+
+    def setUp(self):
+        super(TestLogWatcher, self).setUp()
+        self.path = self.useFixture(fixtures.TempDir()).path
+        self.patch('tempest.common.ssh.Client', new=LocalClient)
+        self._log('nova.log', 'ERROR old error\n')
+        self.watcher = log_watcher.LogWatcher(
+            ['node1', 'node2'], os.path.join(self.path, '*.log'), 'user')
+        self.watcher.start()
+
+    def _log(self, name, data, mode='a'):
+        with open(os.path.join(self.path, name), mode) as log_file:
+            log_file.write(data)
+
+    def test_only_new_errors(self):
+        self.assertEqual({}, self.watcher.check())
+        self._log('nova.log', 'INFO fine\nERROR new error\n')
+        self._log('cinder.log', 'TRACE in a new file\n')
+        errors = self.watcher.check()
+        self.assertEqual(['node1', 'node2'], sorted(errors))
+        self.assertEqual(
+            ['%s/cinder.log: TRACE in a new file' % self.path,
+             '%s/nova.log: ERROR new error' % self.path],
+            sorted(errors['node1']))
+        # Already scanned
+        self.assertEqual({}, self.watcher.check())
+        # One connection per node for all the checks
+        self.assertEqual(4, self.watcher._clients['node1'].commands)
+
+    def test_rotated_file(self):
+        os.rename(os.path.join(self.path, 'nova.log'),
+                  os.path.join(self.path, 'nova.log.1'))
+        self._log('nova.log', 'ERROR after a rotation, longer than before\n')
+        errors = self.watcher.check()
+        self.assertEqual(['%s/nova.log: ERROR after a rotation, longer than '
+                          'before' % self.path], errors['node1'])
+
+    def test_truncated_file(self):
+        self._log('nova.log', 'ERROR new\n', mode='w')
+        errors = self.watcher.check()
+        self.assertEqual(['%s/nova.log: ERROR new' % self.path],
+                         errors['node1'])
+
+    def test_unreachable_node(self):
+        watcher = log_watcher.LogWatcher(['down'], self.path, 'user')
+        with mock.patch.object(log_watcher.LOG, 'error') as log_error:
+            self.assertFalse(watcher.has_errors())
+        self.assertTrue(log_error.called)
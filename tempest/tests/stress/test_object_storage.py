@@ -0,0 +1,141 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest.stress.actions import object_storage
+from tempest.stress import stats
+from tempest.tests import base
+
+
+class FakeObjectStorage(object):
+    """Objects of the fake object and container clients"""
+
+    def __init__(self):
+        self.objects = {}
+        self.manager = mock.Mock()
+        object_client = self.manager.object_client
+        object_client.create_object.side_effect = self.create_object
+        object_client.create_object_segments.side_effect = (
+            self.create_object_segments)
+        object_client.get_object.side_effect = self.get_object
+        object_client.delete_object.side_effect = self.delete_object
+
+    def create_object(self, container, name, data, metadata=None):
+        self.objects[(container, name)] = data
+        return {}, ''
+
+    def create_object_segments(self, container, name, segment, data):
+        return self.create_object(container, '%s/%s' % (name, segment), data)
+
+    def get_object(self, container, name, metadata=None):
+        data = self.objects[(container, name)]
+        if metadata and 'Range' in metadata:
+            first, last = metadata['Range'][len('bytes='):].split('-')
+            data = data[int(first):int(last) + 1]
+        return {}, data
+
+    def delete_object(self, container, name):
+        del self.objects[(container, name)]
+        return {}, ''
+
+
+class TestSizes(base.TestCase):
+
+    def test_parse_size(self):
+        self.assertEqual(4096, object_storage.parse_size(4096))
+        self.assertEqual(4096, object_storage.parse_size('4k'))
+        self.assertEqual(1536 * 1024, object_storage.parse_size('1.5M'))
+        self.assertEqual(2 * 1024 ** 3, object_storage.parse_size('2G'))
+
+    def test_distributions(self):
+        self.assertEqual(1024, object_storage.SizeDistribution(
+            '1K').next_size())
+        uniform = object_storage.SizeDistribution(
+            {'distribution': 'uniform', 'min': 10, 'max': 20})
+        lognormal = object_storage.SizeDistribution(
+            {'distribution': 'lognormal', 'median': '64K', 'max': '1M'})
+        choice = object_storage.SizeDistribution(
+            {'distribution': 'choice', 'sizes': {'1K': 1, '2K': 0}})
+        for __ in range(100):
+            self.assertTrue(10 <= uniform.next_size() <= 20)
+            self.assertTrue(0 <= lognormal.next_size() <= 1024 ** 2)
+            self.assertEqual(1024, choice.next_size())
+        self.assertRaises(ValueError, object_storage.SizeDistribution,
+                          {'distribution': 'pareto'})
+
+
+class TestObjectStorageActions(base.TestCase):
+
+    def setUp(self):
+        super(TestObjectStorageActions, self).setUp()
+        self.storage = FakeObjectStorage()
+        self.statistic = stats.SharedStatistics(1).slot(0)
+
+    def _run(self, action_class, max_runs, **kwargs):
+        action = action_class(self.storage.manager, max_runs=max_runs)
+        action.setUp(**kwargs)
+        action.run_loop(self.statistic)
+        self.assertEqual(0, self.statistic['fails'])
+        return action
+
+    def test_mixed(self):
+        action = self._run(object_storage.ObjectMixedStress, 50,
+                           object_size='1K', objects=5)
+        self.assertEqual('ObjectMixedStress', action.action)
+        self.assertTrue(0 < len(action.objects) <= 5)
+        self.assertEqual(len(action.objects), len(self.storage.objects))
+        self.assertEqual(0, self.statistic['bytes'] % 1024)
+        self.assertTrue(self.statistic['bytes'] > 0)
+        action.tearDown()
+        self.assertEqual({}, self.storage.objects)
+        container_client = self.storage.manager.container_client
+        container_client.delete_container.assert_called_once_with(
+            action.container)
+
+    def test_mixed_operations(self):
+        action = self._run(object_storage.ObjectMixedStress, 10,
+                           operations={'put': 1}, object_size='1K',
+                           objects=20)
+        self.assertEqual('ObjectMixedStress(put)', action.action)
+        self.assertEqual(10, len(action.objects))
+        self.assertEqual(10 * 1024, self.statistic['bytes'])
+        self.assertRaises(ValueError, action.setUp,
+                          operations={'post': 1})
+
+    def test_segmented_upload(self):
+        action = self._run(object_storage.ObjectSegmentedUploadStress, 3,
+                           segment_size='1K', segments=4, objects=2)
+        # Two large objects of four segments and a manifest
+        self.assertEqual(10, len(self.storage.objects))
+        self.assertEqual(3 * 4 * 1024, self.statistic['bytes'])
+        create_object = self.storage.manager.object_client.create_object
+        manifest = create_object.call_args[1]['metadata']['X-Object-Manifest']
+        self.assertEqual('%s/%s/' % (action.container, action.objects[-1]),
+                         manifest)
+        action.tearDown()
+        self.assertEqual({}, self.storage.objects)
+
+    def test_segmented_upload_verify(self):
+        action = object_storage.ObjectSegmentedUploadStress(
+            self.storage.manager, max_runs=1)
+        action.setUp(segment_size='1K', segments=4, verify=True)
+        # The fake manifest has no data
+        self.assertRaises(RuntimeError, action.run)
+
+    def test_ranged_read(self):
+        self._run(object_storage.ObjectRangedReadStress, 5,
+                  object_size='64K', range_size='1K')
+        self.assertEqual(5 * 1024, self.statistic['bytes'])
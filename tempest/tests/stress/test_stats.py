@@ -0,0 +1,172 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+import os
+
+import fixtures
+
+from tempest.stress import stats
+from tempest.tests import base
+from tempest.tests.stress import test_stressaction
+
+
+class TestSharedStatistics(base.TestCase):
+
+    def test_slots(self):
+        statistics = stats.SharedStatistics(3)
+        slot = statistics.slot(1)
+        slot['runs'] += 2
+        slot['fails'] += 1
+        statistics.slot(2)['runs'] += 3
+        self.assertEqual({'runs': 2, 'fails': 1, 'bytes': 0}, slot.to_dict())
+        self.assertEqual({'runs': 0, 'fails': 0, 'bytes': 0},
+                         statistics.slot(0).to_dict())
+        self.assertEqual(5, statistics.total('runs'))
+        self.assertEqual(1, statistics.total('fails'))
+        self.assertRaises(KeyError, slot.__getitem__, 'other')
+        self.assertRaises(IndexError, statistics.slot, 3)
+
+    def test_shared_with_processes(self):
+        statistics = stats.SharedStatistics(2)
+        processes = []
+        for index, action in enumerate(
+                (test_stressaction.FakeStressAction,
+                 test_stressaction.FakeStressActionFailing)):
+            process = multiprocessing.Process(
+                target=action(manager=None, max_runs=5).execute,
+                args=(statistics.slot(index),))
+            process.start()
+            processes.append(process)
+        for process in processes:
+            process.join()
+        self.assertEqual(10, statistics.total('runs'))
+        self.assertEqual(5, statistics.total('fails'))
+        self.assertEqual({'runs': 5, 'fails': 5, 'bytes': 0},
+                         statistics.slot(1).to_dict())
+
+
+class TestLatencyHistogram(base.TestCase):
+
+    def test_percentiles(self):
+        histogram = stats.LatencyHistogram()
+        for millis in range(1, 101):
+            histogram.record(millis / 1000.0)
+        self.assertEqual(100, histogram.count)
+        # Within the 2% precision of the buckets
+        for percentile, expected in ((50, 0.050), (90, 0.090), (99, 0.099),
+                                     (100, 0.100)):
+            self.assertAlmostEqual(expected, histogram.percentile(percentile),
+                                   delta=expected / 50)
+        self.assertIsNone(stats.LatencyHistogram().percentile(50))
+
+    def test_bounds(self):
+        histogram = stats.LatencyHistogram()
+        histogram.record(0)
+        histogram.record(10 ** 6)
+        self.assertEqual(0, histogram.percentile(50))
+        self.assertEqual(stats.BUCKETS - 1,
+                         int(max(histogram.to_dict(), key=int)))
+
+    def test_merge_and_serialize(self):
+        histogram = stats.LatencyHistogram()
+        histogram.record(0.01)
+        other = stats.LatencyHistogram()
+        other.record(0.02)
+        other.record(0.02)
+        histogram.merge(stats.LatencyHistogram.from_dict(other.to_dict()))
+        self.assertEqual(3, histogram.count)
+        self.assertAlmostEqual(0.02, histogram.percentile(50), delta=0.0004)
+
+    def test_shared(self):
+        statistics = stats.SharedStatistics(2)
+        statistics.slot(1).histogram.record(0.5)
+        self.assertEqual(0, statistics.slot(0).histogram.count)
+        self.assertEqual(1, statistics.slot(1).histogram.count)
+
+
+class TestStressResults(base.TestCase):
+
+    def _results(self, latency, runs=100, fails=0, duration=10.0):
+        results = stats.StressResults(duration)
+        histogram = stats.LatencyHistogram()
+        for _ in range(runs):
+            histogram.record(latency)
+        results.add('action', runs, fails, histogram)
+        return results
+
+    def test_summary(self):
+        results = self._results(0.1, fails=5)
+        results.merge(self._results(0.1))
+        summary = results.summary('action')
+        self.assertEqual(200, summary['runs'])
+        self.assertEqual(10.0, summary['ops_per_sec'])
+        self.assertEqual(0.025, summary['error_rate'])
+        self.assertAlmostEqual(0.1, summary['p99'], delta=0.002)
+        self.assertIn('action: 200 runs (5 failed, 2.5%), 10.00 ops/s',
+                      results.format_summary()[0])
+
+    def test_bytes(self):
+        results = self._results(0.1)
+        results.add('action', 0, 0, transferred=10 * 1024 ** 2)
+        results.merge(self._results(0.1), concurrent=True)
+        summary = results.summary('action')
+        # Concurrent runs of 10 seconds
+        self.assertEqual(10.0, results.duration)
+        self.assertEqual(1024 ** 2, summary['bytes_per_sec'])
+        self.assertIn('20.00 ops/s, 1.0 MB/s', results.format_summary()[0])
+
+    def test_save_load(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'results.json')
+        results = self._results(0.1, fails=5)
+        results.save(path)
+        loaded = stats.StressResults.load(path)
+        self.assertEqual(results.summary('action'), loaded.summary('action'))
+
+    def test_compare(self):
+        baseline = self._results(0.1)
+        self.assertEqual([], stats.compare_results(
+            baseline, self._results(0.105)))
+        regressions = stats.compare_results(
+            baseline, self._results(0.2, fails=10, duration=20.0))
+        self.assertEqual(7, len(regressions))
+        self.assertIn('action: p50 latency', regressions[0])
+        self.assertIn('action: error rate 0.0% -> 10.0%', regressions)
+        self.assertIn('action: throughput 10.00 -> 5.00 ops/s', regressions)
+
+
+class TestTimeSeries(base.TestCase):
+
+    def test_samples(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'timeseries.csv')
+        now = [1000.0]
+        self.patch('time.time', side_effect=lambda: now[0])
+        timeseries = stats.TimeSeries(path)
+        now[0] += 10
+        timeseries.sample({'action': (50, 5)})
+        now[0] += 10
+        timeseries.sample({'action': (150, 5)})
+        timeseries.start()
+        now[0] += 5
+        timeseries.sample({'action': (10, 10)})
+        timeseries.close()
+        with open(path) as timeseries_file:
+            lines = timeseries_file.read().splitlines()
+        self.assertEqual(['time,action,runs,fails,ops_per_sec,error_rate',
+                          '1010.000,action,50,5,5.000,0.1000',
+                          '1020.000,action,100,0,10.000,0.0000',
+                          '1025.000,action,10,10,2.000,1.0000'], lines)
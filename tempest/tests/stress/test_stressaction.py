@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from tempest.stress import stats
 import tempest.stress.stressaction as stressaction
 import tempest.test
 
@@ -61,3 +62,10 @@ class TestStressAction(tempest.test.BaseTestCase):
         stressAction.execute(stats)
         self.assertEqual(stats['runs'], 1)
         self.assertEqual(stats['fails'], 1)
+
+    def testStressTestRunLatency(self):
+        stressAction = FakeStressActionFailing(manager=None, max_runs=3)
+        stats_slot = stats.SharedStatistics(1).slot(0)
+        stressAction.execute(stats_slot)
+        self.assertEqual(3, stats_slot['runs'])
+        self.assertEqual(3, stats_slot.histogram.count)
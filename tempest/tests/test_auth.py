@@ -16,10 +16,13 @@
 import copy
 import datetime
 
+import fixtures
+from oslo.config import cfg
 from oslotest import mockpatch
 
 from tempest import auth
 from tempest.common import http
+from tempest.common import token_cache
 from tempest import config
 from tempest import exceptions
 from tempest.tests import base
@@ -319,6 +322,76 @@ class TestKeystoneV2AuthProvider(BaseAuthTestsSetUp):
         expected = 'http://fake_url/'
         self._test_base_url_helper(expected, self.filters)
 
+    def _mock_base_url(self):
+        self.useFixture(mockpatch.PatchObject(self.auth_provider,
+                                              'is_expired',
+                                              return_value=False))
+        return self.useFixture(mockpatch.PatchObject(
+            self.auth_provider, '_base_url',
+            wraps=self.auth_provider._base_url)).mock
+
+    def test_base_url_indexed(self):
+        self.filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        base_url = self._mock_base_url()
+        url = self.auth_provider.base_url(self.filters)
+        self.assertEqual(url, self.auth_provider.base_url(self.filters))
+        self.assertEqual(1, base_url.call_count)
+        self.filters['skip_path'] = True
+        self.assertNotEqual(url, self.auth_provider.base_url(self.filters))
+        self.assertEqual(2, base_url.call_count)
+
+    def test_base_url_index_discarded_with_auth_data(self):
+        self.filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        base_url = self._mock_base_url()
+        self.auth_provider.base_url(self.filters)
+        self.auth_provider.set_auth()
+        self.auth_provider.base_url(self.filters)
+        self.auth_provider.clear_auth()
+        self.auth_provider.base_url(self.filters)
+        self.assertEqual(3, base_url.call_count)
+
+    def test_base_url_alt_auth_data_not_indexed(self):
+        self.filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        auth_data = self.auth_provider.auth_data
+        alt_auth_data = copy.deepcopy(auth_data)
+        base_url = self._mock_base_url()
+        self.auth_provider.base_url(self.filters, alt_auth_data)
+        self.auth_provider.base_url(self.filters, alt_auth_data)
+        self.assertEqual(2, base_url.call_count)
+        self.assertEqual({}, self.auth_provider._endpoints)
+
+    def test_token_cache(self):
+        cfg.CONF.set_default('token_cache', True, group='auth')
+        cache = token_cache.TokenCache(
+            self.useFixture(fixtures.TempDir()).path)
+        self.stubs.Set(token_cache, 'get_token_cache', lambda: cache)
+        self.useFixture(mockpatch.PatchObject(self._auth_provider_class,
+                                              'is_expired',
+                                              return_value=False))
+        self.useFixture(mockpatch.PatchObject(self._auth_provider_class,
+                                              '_needs_refresh',
+                                              return_value=False))
+        token, _ = self.auth_provider.auth_data
+        other_provider = self._auth(self.credentials)
+        authenticate = self.useFixture(mockpatch.PatchObject(
+            other_provider, '_authenticate')).mock
+        self.assertEqual(token, other_provider.get_token())
+        self.assertFalse(authenticate.called)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(1, cache.hits)
+
     def test_token_not_expired(self):
         expiry_data = datetime.datetime.utcnow() + datetime.timedelta(days=1)
         auth_data = self._auth_data_with_expiry(
@@ -0,0 +1,101 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo.config import cfg
+
+from tempest import clients
+from tempest.common import http
+from tempest.common import rest_client
+from tempest import config
+from tempest import exceptions
+from tempest.services.compute.json import servers_client as json_servers
+from tempest.services.compute.xml import servers_client as xml_servers
+from tempest.services.identity.json import identity_client as json_identity
+from tempest.tests import base
+from tempest.tests import fake_config
+from tempest.tests import fake_credentials
+
+
+class TestManager(base.TestCase):
+
+    def setUp(self):
+        super(TestManager, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.credentials = fake_credentials.FakeKeystoneV2Credentials()
+
+    def _manager(self, **kwargs):
+        return clients.Manager(credentials=self.credentials, **kwargs)
+
+    def test_lazy_clients(self):
+        manager = self._manager()
+        self.assertNotIn('servers_client', vars(manager))
+        servers_client = manager.servers_client
+        self.assertIsInstance(servers_client, json_servers.ServersClientJSON)
+        self.assertIs(manager.auth_provider, servers_client.auth_provider)
+        self.assertIs(servers_client, manager.servers_client)
+        self.assertIn('servers_client', vars(manager))
+
+    def test_interface(self):
+        manager = self._manager(interface='xml')
+        self.assertIsInstance(manager.servers_client,
+                              xml_servers.ServersClientXML)
+        self.assertRaises(AttributeError, getattr, manager,
+                          'servers_v3_client')
+
+    def test_unsupported_interface(self):
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          self._manager, interface='yaml')
+
+    def test_unknown_client(self):
+        self.assertRaises(AttributeError, getattr, self._manager(),
+                          'fake_client')
+
+    def test_service_not_available(self):
+        cfg.CONF.set_default('glance', False, group='service_available')
+        manager = self._manager()
+        self.assertNotIn('image_client', manager.client_names)
+        self.assertRaises(AttributeError, getattr, manager, 'image_client')
+
+    def test_token_client(self):
+        self.assertIsInstance(self._manager().token_client,
+                              json_identity.TokenClientJSON)
+
+    def test_negative_client(self):
+        manager = self._manager(service='compute')
+        self.assertIsInstance(manager.negative_client,
+                              rest_client.NegativeRestClient)
+        self.assertEqual('compute', manager.negative_client.service)
+
+    def test_client_paths(self):
+        tables = [clients.XML_CLIENTS, clients.JSON_CLIENTS,
+                  clients.COMMON_CLIENTS, clients.EC2_CLIENTS]
+        tables.extend(clients.TOKEN_CLIENTS.values())
+        for table in tables:
+            for module, class_name in table.values():
+                self.assertTrue(callable(clients.import_client(module,
+                                                               class_name)))
+        self.assertIn('tempest.services.compute.json.servers_client',
+                      clients.client_modules())
+
+    def test_http_pool(self):
+        cfg.CONF.set_default('http_keep_alive', True,
+                             group='service-clients')
+        manager = self._manager()
+        self.assertIsNotNone(manager.http_pool)
+        self.assertIs(manager.http_pool, manager.servers_client.http_pool)
+        # The counters of all the pools are reported at the end of the run
+        self.assertIs(http.pool_stats, manager.http_pool.stats)
+        self.assertIs(http.pool_stats, self._manager().http_pool.stats)
@@ -0,0 +1,92 @@
+# Copyright 2014 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import urlparse
+
+from oslotest import mockpatch
+
+from tempest import config
+from tempest.services.object_storage import account_client
+from tempest.services.object_storage import container_client
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+
+# Listing limit of the fake cluster
+SERVER_LIMIT = 10
+
+
+class TestListingIterators(base.TestCase):
+
+    names = [u'object-%02d' % i for i in range(25)] + [u'object-\xe9']
+
+    def setUp(self):
+        super(TestListingIterators, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.requests = []
+
+    def _fake_get(self, url, headers=None):
+        """Lists the names like swift, following marker and limit"""
+        query = dict((key, values[-1].decode('utf-8')) for key, values
+                     in urlparse.parse_qs(url.partition('?')[2]).items())
+        self.requests.append(query)
+        names = [name for name in self.names
+                 if name > query.get('marker', u'') and
+                 name.startswith(query.get('prefix', u'')) and
+                 ('end_marker' not in query or name < query['end_marker'])]
+        limit = min(int(query.get('limit', SERVER_LIMIT)), SERVER_LIMIT)
+        return {}, json.dumps([{'name': name} for name in names[:limit]])
+
+    def _client(self, client_class):
+        client = client_class(fake_auth_provider.FakeAuthProvider())
+        self.useFixture(mockpatch.PatchObject(client, 'get',
+                                              side_effect=self._fake_get))
+        return client
+
+    def test_container_objects(self):
+        client = self._client(container_client.ContainerClient)
+        objects = client.iter_container_objects('container')
+        self.assertEqual({'name': self.names[0]}, next(objects))
+        # Lazily, a page at a time
+        self.assertEqual(1, len(self.requests))
+        self.assertEqual(self.names[1:], [obj['name'] for obj in objects])
+        # Three full pages, then an empty one
+        self.assertEqual(4, len(self.requests))
+        self.assertEqual(u'object-\xe9', self.requests[-1]['marker'])
+
+    def test_container_objects_limit(self):
+        client = self._client(container_client.ContainerClient)
+        objects = list(client.iter_container_objects(
+            'container', params={'limit': 4, 'prefix': 'object-1',
+                                 'end_marker': 'object-19'}))
+        self.assertEqual(self.names[10:19], [obj['name'] for obj in objects])
+        # The last page is not full
+        self.assertEqual(3, len(self.requests))
+
+    def test_list_all_container_objects(self):
+        client = self._client(container_client.ContainerClient)
+        self.assertEqual(self.names,
+                         [obj['name'] for obj
+                          in client.list_all_container_objects('container')])
+
+    def test_account_containers(self):
+        client = self._client(account_client.AccountClient)
+        containers = list(client.iter_account_containers(
+            params={'limit': 5}))
+        self.assertEqual(self.names,
+                         [container['name'] for container in containers])
+        self.assertEqual(6, len(self.requests))
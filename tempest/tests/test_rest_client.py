@@ -15,8 +15,11 @@
 import json
 
 import httplib2
+import jsonschema
+from oslo.config import cfg
 from oslotest import mockpatch
 
+from tempest.common import http
 from tempest.common import rest_client
 from tempest.common import xml_utils as xml
 from tempest import config
@@ -588,3 +591,154 @@ class TestExpectedSuccess(BaseRestClientTestClass):
         read_code = 202
         self.assertRaises(AssertionError, self.rest_client.expected_success,
                           expected_code, read_code)
+
+
+class TestRestClientKeepAlive(BaseRestClientTestClass):
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientKeepAlive, self).setUp()
+        self.useFixture(mockpatch.PatchObject(self.rest_client,
+                                              '_error_checker'))
+        self.rest_client.service = 'compute'
+        self.rest_client.http_pool = http.HttpConnectionPool()
+
+    def test_no_pool(self):
+        self.rest_client.http_pool = None
+        self.assertIs(self.rest_client.http_obj, self.rest_client._get_http())
+
+    def test_pool_all_services(self):
+        self.assertIs(self.rest_client.http_pool,
+                      self.rest_client._get_http())
+
+    def test_pool_selected_service(self):
+        cfg.CONF.set_default('http_keep_alive_services', ['compute'],
+                             group='service-clients')
+        self.assertIs(self.rest_client.http_pool,
+                      self.rest_client._get_http())
+
+    def test_pool_other_service(self):
+        cfg.CONF.set_default('http_keep_alive_services', ['volume'],
+                             group='service-clients')
+        self.assertIs(self.rest_client.http_obj,
+                      self.rest_client._get_http())
+
+    def test_request_through_pool(self):
+        __, return_dict = self.rest_client.get(self.url)
+        self.assertEqual('GET', return_dict['method'])
+        self.assertNotIn('connection', return_dict['headers'])
+
+
+class TestRestClientRequestMany(BaseRestClientTestClass):
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientRequestMany, self).setUp()
+        self.useFixture(mockpatch.PatchObject(self.rest_client,
+                                              '_error_checker'))
+
+    def test_request_many(self):
+        requests = [('GET', 'servers/%d' % i, None) for i in range(5)]
+        requests.append(('POST', 'servers', '{}'))
+        results = self.rest_client.request_many(requests)
+        self.assertEqual(len(requests), len(results))
+        for (method, url, body), (__, return_dict) in zip(requests, results):
+            self.assertEqual(method, return_dict['method'])
+            self.assertTrue(return_dict['uri'].endswith(url))
+            self.assertEqual(body, return_dict['body'])
+
+    def test_request_many_error(self):
+        self.rest_client._error_checker.side_effect = [
+            None, exceptions.NotFound(), None]
+        requests = [('DELETE', 'servers/%d' % i, None) for i in range(3)]
+        self.assertRaises(exceptions.NotFound,
+                          self.rest_client.request_many, requests)
+
+    def test_request_many_return_errors(self):
+        self.rest_client._error_checker.side_effect = [
+            None, exceptions.NotFound(), None]
+        requests = [('DELETE', 'servers/%d' % i, None) for i in range(3)]
+        results = self.rest_client.request_many(requests,
+                                                raise_on_error=False)
+        errors = [r for r in results if isinstance(r, exceptions.NotFound)]
+        self.assertEqual(1, len(errors))
+
+
+class TestRestClientValidateResponse(BaseRestClientTestClass):
+
+    schema = {
+        'status_code': [200],
+        'response_body': {
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'string'}
+            },
+            'required': ['id']
+        },
+        'response_header': {
+            'type': 'object',
+            'properties': {
+                'x-fake-header': {'type': 'string'}
+            },
+            'required': ['x-fake-header']
+        }
+    }
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientValidateResponse, self).setUp()
+        self.resp = httplib2.Response({'status': 200,
+                                       'x-fake-header': 'fake_value'})
+        self.stubs.Set(rest_client.RestClient, 'validation_stats',
+                       rest_client.ValidationStats())
+
+    def test_validate_response(self):
+        self.rest_client.validate_response(self.schema, self.resp,
+                                           {'id': 'fake_id'})
+        self.assertEqual(1, self.rest_client.validation_stats.validated)
+
+    def test_invalid_body(self):
+        self.assertRaises(exceptions.InvalidHTTPResponseBody,
+                          self.rest_client.validate_response,
+                          self.schema, self.resp, {'id': 1})
+
+    def test_invalid_header(self):
+        resp = httplib2.Response({'status': 200})
+        self.assertRaises(exceptions.InvalidHTTPResponseHeader,
+                          self.rest_client.validate_response,
+                          self.schema, resp, {'id': 'fake_id'})
+
+    def test_validator_cached(self):
+        body_schema = self.schema['response_body']
+        validator = self.rest_client._get_validator(body_schema)
+        self.assertIs(validator,
+                      self.rest_client._get_validator(body_schema))
+        self.assertIsNot(validator,
+                         self.rest_client._get_validator(dict(body_schema)))
+
+    def test_invalid_schema(self):
+        self.assertRaises(jsonschema.SchemaError,
+                          self.rest_client._get_validator,
+                          {'type': 'fake_type'})
+
+    def test_validation_disabled(self):
+        cfg.CONF.set_default('response_validation', 'disabled',
+                             group='service-clients')
+        self.rest_client.validate_response(self.schema, self.resp,
+                                           {'id': 1})
+        self.assertEqual(1, self.rest_client.validation_stats.skipped)
+        self.assertRaises(exceptions.InvalidHttpSuccessCode,
+                          self.rest_client.validate_response,
+                          self.schema, httplib2.Response({'status': 202}),
+                          {'id': 1})
+
+    def test_validation_sampled(self):
+        cfg.CONF.set_default('response_validation', 'sampled',
+                             group='service-clients')
+        self.patch('random.random', side_effect=[0.05, 0.5])
+        self.assertRaises(exceptions.InvalidHTTPResponseBody,
+                          self.rest_client.validate_response,
+                          self.schema, self.resp, {'id': 1})
+        self.rest_client.validate_response(self.schema, self.resp,
+                                           {'id': 1})
+        self.assertEqual(1, self.rest_client.validation_stats.skipped)
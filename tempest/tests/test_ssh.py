@@ -187,3 +187,23 @@ class TestSshClient(base.TestCase):
         chan_mock.recv_stderr.assert_called_once_with(1024)
         chan_mock.recv_exit_status.assert_called_once_with()
         closed_prop.assert_called_once_with()
+
+    def test_keep_connection(self):
+        gsc_mock = self.patch('tempest.common.ssh.Client._get_ssh_connection')
+        connection = gsc_mock.return_value
+        connection.get_transport.return_value.is_active.return_value = True
+
+        client = ssh.Client('localhost', 'root', keep_connection=True)
+        self.assertIs(connection, client._get_command_connection())
+        self.assertIs(connection, client._get_command_connection())
+        self.assertEqual(1, gsc_mock.call_count)
+
+        # Reconnects when the connection was lost
+        connection.get_transport.return_value.is_active.return_value = False
+        client._get_command_connection()
+        self.assertEqual(2, gsc_mock.call_count)
+        connection.close.assert_called_once_with()
+
+        client.close()
+        self.assertEqual(2, connection.close.call_count)
+        self.assertIsNone(client._connection)
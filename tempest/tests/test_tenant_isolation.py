@@ -41,6 +41,7 @@ class TestTenantIsolation(base.TestCase):
                        fake_identity._fake_v2_response)
         cfg.CONF.set_default('operator_role', 'FakeRole',
                              group='object-storage')
+        self.patch('tempest.common.isolated_creds._cidr_index', new=None)
 
     def test_tempest_client(self):
         iso_creds = isolated_creds.IsolatedCreds('test class')
@@ -107,6 +108,7 @@ class TestTenantIsolation(base.TestCase):
         return net_fix
 
     def _mock_subnet_create(self, iso_creds, id, name):
+        self._mock_list_subnets(iso_creds)
         subnet_fix = self.useFixture(mockpatch.PatchObject(
             iso_creds.network_admin_client,
             'create_subnet',
@@ -114,6 +116,13 @@ class TestTenantIsolation(base.TestCase):
                           {'subnet': {'id': id, 'name': name}})))
         return subnet_fix
 
+    def _mock_list_subnets(self, iso_creds, cidrs=()):
+        subnets = [{'cidr': cidr} for cidr in cidrs]
+        return self.useFixture(mockpatch.PatchObject(
+            iso_creds.network_admin_client,
+            'list_subnets',
+            return_value=({'status': 200}, {'subnets': subnets})))
+
     def _mock_router_create(self, id, name):
         router_fix = self.useFixture(mockpatch.PatchObject(
             json_network_client.NetworkClientJSON,
@@ -514,3 +523,82 @@ class TestTenantIsolation(base.TestCase):
         self._mock_tenant_create('1234', 'fake_prim_tenant')
         self.assertRaises(exceptions.InvalidConfiguration,
                           iso_creds.get_primary_creds)
+
+    @mock.patch('tempest.common.rest_client.RestClient')
+    def test_prepare_credentials(self, MockRestClient):
+        iso_creds = isolated_creds.IsolatedCreds('test class',
+                                                 password='fake_password')
+        self._mock_assign_user_role()
+        self._mock_list_roles('123456', 'admin')
+        self._mock_user_create('1234', 'fake_user')
+        self._mock_tenant_create('1234', 'fake_tenant')
+        self._mock_list_subnets(iso_creds, ['10.100.0.0/28'])
+        networks = [{'id': 'net-%d' % i, 'name': 'fake_net'}
+                    for i in range(3)]
+        net_mock = self.useFixture(mockpatch.PatchObject(
+            iso_creds.network_admin_client, 'create_bulk_network',
+            return_value=({'status': 201}, {'networks': networks}))).mock
+        subnets = [{'id': 'subnet-%d' % i, 'name': 'fake_subnet'}
+                   for i in range(3)]
+        subnet_mock = self.useFixture(mockpatch.PatchObject(
+            iso_creds.network_admin_client, 'create_bulk_subnet',
+            return_value=({'status': 201}, {'subnets': subnets}))).mock
+        router_fix = self._mock_router_create('1234', 'fake_router')
+        self.patch(
+            'tempest.services.network.json.network_client.NetworkClientJSON.'
+            'add_router_interface_with_subnet_id')
+        iso_creds.prepare_credentials(['primary', 'alt', 'admin', 'alt'])
+        self.assertEqual(['primary', 'alt', 'admin'],
+                         [name for name in ('primary', 'alt', 'admin')
+                          if name in iso_creds.isolated_creds])
+        # Networks and subnets are created with a single request
+        net_mock.assert_called_once_with(mock.ANY,
+                                         tenant_ids=['1234'] * 3)
+        self.assertEqual(1, subnet_mock.call_count)
+        subnet_list = subnet_mock.call_args[0][0]
+        self.assertEqual(['net-0', 'net-1', 'net-2'],
+                         [subnet['network_id'] for subnet in subnet_list])
+        # The CIDR in use is skipped
+        self.assertEqual(['10.100.0.16/28', '10.100.0.32/28',
+                          '10.100.0.48/28'],
+                         [subnet['cidr'] for subnet in subnet_list])
+        self.assertEqual(3, router_fix.mock.call_count)
+        self.assertEqual('net-2', iso_creds.get_admin_network()['id'])
+        self.assertEqual('subnet-1', iso_creds.get_alt_subnet()['id'])
+        # Already created
+        iso_creds.prepare_credentials(['primary'])
+        self.assertEqual(1, net_mock.call_count)
+
+    @mock.patch('tempest.common.rest_client.RestClient')
+    def test_subnet_cidr_conflict(self, MockRestClient):
+        iso_creds = isolated_creds.IsolatedCreds('test class',
+                                                 password='fake_password')
+        list_fix = self._mock_list_subnets(iso_creds)
+        conflict = exceptions.BadRequest('10.100.0.0/28 overlaps with '
+                                         'another subnet')
+        subnet_mock = self.useFixture(mockpatch.PatchObject(
+            iso_creds.network_admin_client, 'create_subnet',
+            side_effect=[conflict, ({'status': 201},
+                                    {'subnet': {'id': '1234'}})])).mock
+        subnet = iso_creds._create_subnet('fake_subnet', '1234', 'net')
+        self.assertEqual('1234', subnet['id'])
+        cidrs = [call[1]['cidr'] for call in subnet_mock.call_args_list]
+        self.assertEqual(['10.100.0.0/28', '10.100.0.16/28'], cidrs)
+        # Listed once to build the index, once after the conflict
+        self.assertEqual(2, list_fix.mock.call_count)
+
+    def test_cidr_index(self):
+        cfg.CONF.set_default('tenant_network_cidr', '10.100.0.0/26',
+                             group='network')
+        client = mock.Mock()
+        client.list_subnets.return_value = (
+            {'status': 200}, {'subnets': [{'cidr': '10.100.0.0/27'}]})
+        index = isolated_creds.CidrIndex()
+        cidrs = index.allocate(client)
+        self.assertEqual(['10.100.0.32/28'], map(str, cidrs))
+        self.assertRaises(exceptions.BuildErrorException,
+                          index.allocate, client, 2)
+        index.release(cidrs)
+        self.assertEqual(['10.100.0.32/28', '10.100.0.48/28'],
+                         map(str, index.allocate(client, 2)))
+        self.assertEqual(1, client.list_subnets.call_count)
@@ -47,3 +47,55 @@ class TestImageWaiters(base.TestCase):
         self.assertRaises(exceptions.AddImageException,
                           waiters.wait_for_image_status,
                           self.client, 'fake_image_id', 'active')
+
+
+class TestServersWaiter(base.TestCase):
+    def setUp(self):
+        super(TestServersWaiter, self).setUp()
+        self.client = mock.MagicMock()
+        self.client.service = 'compute'
+        self.client.build_timeout = 1
+        self.client.build_interval = 0
+        self.patch('time.sleep')
+
+    def _servers(self, *states):
+        servers = []
+        for i, (status, task_state) in enumerate(states):
+            servers.append({'id': 'server%d' % i, 'status': status,
+                            'OS-EXT-STS:task_state': task_state})
+        return None, {'servers': servers}
+
+    def test_wait_for_servers_status(self):
+        self.client.list_servers_with_detail.side_effect = [
+            self._servers(('BUILD', 'spawning'), ('BUILD', 'spawning')),
+            self._servers(('ACTIVE', None), ('BUILD', 'spawning')),
+            self._servers(('ACTIVE', None), ('ACTIVE', None))]
+        waiters.wait_for_servers_status(self.client, ['server0', 'server1'],
+                                        'ACTIVE', name_prefix='fake.1')
+        self.assertEqual(3, self.client.list_servers_with_detail.call_count)
+        self.client.list_servers_with_detail.assert_called_with(
+            {'name': '^fake\\.1'})
+        self.assertFalse(self.client.get_server.called)
+
+    def test_wait_for_servers_status_ignores_others(self):
+        self.client.list_servers_with_detail.return_value = self._servers(
+            ('ACTIVE', None), ('ERROR', None))
+        waiters.wait_for_servers_status(self.client, ['server0'], 'ACTIVE')
+        self.client.list_servers_with_detail.assert_called_once_with(None)
+
+    def test_wait_for_servers_status_error(self):
+        self.client.list_servers_with_detail.return_value = self._servers(
+            ('BUILD', 'spawning'), ('ERROR', None))
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_servers_status,
+                          self.client, ['server0', 'server1'], 'ACTIVE')
+
+    def test_wait_for_servers_status_timeout(self):
+        self.client.build_timeout = 0
+        self.client.list_servers_with_detail.return_value = self._servers(
+            ('ACTIVE', None), ('ACTIVE', 'rebooting'))
+        exc = self.assertRaises(exceptions.TimeoutException,
+                                waiters.wait_for_servers_status,
+                                self.client, ['server0', 'server1'], 'ACTIVE')
+        self.assertIn('server1', str(exc))
+        self.assertNotIn('server0', str(exc))
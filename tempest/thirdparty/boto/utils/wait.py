@@ -14,11 +14,11 @@
 #    under the License.
 
 import re
-import time
 
 import boto.exception
 import testtools
 
+from tempest.common import polling
 from tempest import config
 from tempest.openstack.common import log as logging
 
@@ -32,53 +32,60 @@ def state_wait(lfunction, final_set=set(), valid_set=None):
         final_set = set((final_set,))
     if not isinstance(valid_set, set) and valid_set is not None:
         valid_set = set((valid_set,))
-    start_time = time.time()
+    poller = polling.Poller(CONF.boto.build_interval,
+                            CONF.boto.build_timeout, 'ec2 resource',
+                            '/'.join(sorted(str(s) for s in final_set)))
     old_status = status = lfunction()
     while True:
         if status != old_status:
             LOG.info('State transition "%s" ==> "%s" %d second', old_status,
-                     status, time.time() - start_time)
+                     status, poller.elapsed())
         if status in final_set:
+            poller.done()
             return status
         if valid_set is not None and status not in valid_set:
+            poller.done(success=False)
             return status
-        dtime = time.time() - start_time
-        if dtime > CONF.boto.build_timeout:
+        if poller.timed_out():
+            poller.done(success=False)
             raise testtools.TestCase\
                 .failureException("State change timeout exceeded!"
                                   '(%ds) While waiting'
                                   'for %s at "%s"' %
-                                  (dtime, final_set, status))
-        time.sleep(CONF.boto.build_interval)
+                                  (poller.elapsed(), final_set, status))
+        poller.sleep()
         old_status = status
         status = lfunction()
 
 
 def re_search_wait(lfunction, regexp):
     """Stops waiting on success."""
-    start_time = time.time()
+    poller = polling.Poller(CONF.boto.build_interval,
+                            CONF.boto.build_timeout, 'ec2 output', regexp)
     while True:
         text = lfunction()
         result = re.search(regexp, text)
         if result is not None:
             LOG.info('Pattern "%s" found in %d second in "%s"',
                      regexp,
-                     time.time() - start_time,
+                     poller.elapsed(),
                      text)
+            poller.done()
             return result
-        dtime = time.time() - start_time
-        if dtime > CONF.boto.build_timeout:
+        if poller.timed_out():
+            poller.done(success=False)
             raise testtools.TestCase\
                 .failureException('Pattern find timeout exceeded!'
                                   '(%ds) While waiting for'
                                   '"%s" pattern in "%s"' %
-                                  (dtime, regexp, text))
-        time.sleep(CONF.boto.build_interval)
+                                  (poller.elapsed(), regexp, text))
+        poller.sleep()
 
 
 def wait_no_exception(lfunction, exc_class=None, exc_matcher=None):
     """Stops waiting on success."""
-    start_time = time.time()
+    poller = polling.Poller(CONF.boto.build_interval,
+                            CONF.boto.build_timeout, 'ec2 call', 'success')
     if exc_matcher is not None:
         exc_class = boto.exception.BotoServerError
 
@@ -89,37 +96,43 @@ def wait_no_exception(lfunction, exc_class=None, exc_matcher=None):
         try:
             result = lfunction()
             LOG.info('No Exception in %d second',
-                     time.time() - start_time)
+                     poller.elapsed())
+            poller.done()
             return result
         except exc_class as exc:
             if exc_matcher is not None:
                 res = exc_matcher.match(exc)
                 if res is not None:
                     LOG.info(res)
+                    poller.done(success=False)
                     raise exc
         # Let the other exceptions propagate
-        dtime = time.time() - start_time
-        if dtime > CONF.boto.build_timeout:
+        if poller.timed_out():
+            poller.done(success=False)
             raise testtools.TestCase\
-                .failureException("Wait timeout exceeded! (%ds)" % dtime)
-        time.sleep(CONF.boto.build_interval)
+                .failureException("Wait timeout exceeded! (%ds)" %
+                                  poller.elapsed())
+        poller.sleep()
 
 
 # NOTE(afazekas): EC2/boto normally raise exception instead of empty list
 def wait_exception(lfunction):
     """Returns with the exception or raises one."""
-    start_time = time.time()
+    poller = polling.Poller(CONF.boto.build_interval,
+                            CONF.boto.build_timeout, 'ec2 call', 'exception')
     while True:
         try:
             lfunction()
         except BaseException as exc:
             LOG.info('Exception in %d second',
-                     time.time() - start_time)
+                     poller.elapsed())
+            poller.done()
             return exc
-        dtime = time.time() - start_time
-        if dtime > CONF.boto.build_timeout:
+        if poller.timed_out():
+            poller.done(success=False)
             raise testtools.TestCase\
-                .failureException("Wait timeout exceeded! (%ds)" % dtime)
-        time.sleep(CONF.boto.build_interval)
+                .failureException("Wait timeout exceeded! (%ds)" %
+                                  poller.elapsed())
+        poller.sleep()
 
 # TODO(afazekas): consider strategy design pattern..